@@ -0,0 +1,102 @@
+"""
+Bulk approval of book requests.
+
+All requests of a batch are handled in one transaction with a fixed number
+of queries: the requests, the copies already on loan, the holds on those
+copies and the books are each read once (rows locked), availability is
+checked per book in memory, oldest request first, and the results are
+written with bulk inserts/updates.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .catalog_cache import bump_catalog_version
+from .models import Book, BookRequest, BookReservation, BorrowRecord
+from .reminders import enqueue_reminders
+
+MAX_BATCH = 500
+
+
+def bulk_handle_book_requests(ids, action, comment=""):
+    """
+    Approve or reject the given requests. Returns one result per id:
+    {"id", "status": "approved" | "rejected" | "skipped", "error"?}.
+    """
+    ids = list(dict.fromkeys(ids))
+    results = {request_id: {"id": request_id, "status": "skipped", "error": "Request not found."} for request_id in ids}
+
+    with transaction.atomic():
+        rows = list(
+            BookRequest.objects.select_for_update(of=("self",))
+            .filter(id__in=ids)
+            .order_by("request_date", "id")
+            .values_list("id", "status", "student_id", "book_copy_id", "book_copy__book_id")
+        )
+        pending = []
+        for row in rows:
+            if row[1] != "PENDING":
+                results[row[0]]["error"] = "This request has already been processed."
+            else:
+                pending.append(row)
+
+        if action == "reject":
+            BookRequest.objects.filter(id__in=[row[0] for row in pending]).update(
+                status="REJECTED", admin_comment=comment
+            )
+            for row in pending:
+                results[row[0]] = {"id": row[0], "status": "rejected"}
+            return [results[request_id] for request_id in ids]
+
+        copy_ids = {row[3] for row in pending}
+        book_ids = {row[4] for row in pending}
+        on_loan = set(
+            BorrowRecord.objects.filter(book_copy_id__in=copy_ids, returned=False).values_list("book_copy_id", flat=True)
+        )
+        holds = {
+            copy_id: (hold_id, holder_id)
+            for copy_id, hold_id, holder_id in BookReservation.objects.select_for_update()
+            .filter(book_copy_id__in=copy_ids, status=BookReservation.STATUS_HELD)
+            .values_list("book_copy_id", "id", "student_id")
+        }
+        available = dict(Book.objects.select_for_update().filter(id__in=book_ids).values_list("id", "available_copies"))
+
+        approved = []
+        fulfilled = []
+        for request_id, _, student_id, copy_id, book_id in pending:
+            hold_id, holder_id = holds.get(copy_id, (None, None))
+            if copy_id in on_loan:
+                results[request_id]["error"] = "This copy is already borrowed."
+                continue
+            if hold_id and holder_id != student_id:
+                results[request_id]["error"] = "This copy is on hold for another student."
+                continue
+            if hold_id:
+                # The copy was taken off the shelf when the hold was placed
+                fulfilled.append(hold_id)
+            elif available[book_id] < 1:
+                results[request_id]["error"] = "No available copies to borrow."
+                continue
+            else:
+                available[book_id] -= 1
+
+            on_loan.add(copy_id)
+            approved.append((request_id, student_id, copy_id, book_id))
+            results[request_id] = {"id": request_id, "status": "approved"}
+
+        records = BorrowRecord.objects.bulk_create(
+            [BorrowRecord(student_id=student_id, book_copy_id=copy_id) for _, student_id, copy_id, _ in approved]
+        )
+        enqueue_reminders(records)  # bulk_create sends no post_save
+        BookRequest.objects.filter(id__in=[row[0] for row in approved]).update(status="APPROVED", admin_comment=comment)
+        BookReservation.objects.filter(id__in=fulfilled).update(
+            status=BookReservation.STATUS_FULFILLED, updated_at=timezone.now()
+        )
+        changed_books = {book_id for *_, book_id in approved}
+        Book.objects.bulk_update(
+            [Book(id=book_id, available_copies=available[book_id]) for book_id in changed_books],
+            ["available_copies"],
+        )
+        if approved:
+            bump_catalog_version()
+
+    return [results[request_id] for request_id in ids]
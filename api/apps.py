@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import signals  # noqa: F401
+        # @periodic_job fills scheduler.registry on import; lazy views may never import it
+        from . import tasks  # noqa: F401
+        if settings.REQUEST_METRICS_ENABLED:
+            from .metrics import install_serializer_timing
+            install_serializer_timing()
+        if settings.NPLUSONE_GUARD in ("log", "raise"):
+            from .nplusone import install_field_tracking
+            install_field_tracking()
@@ -0,0 +1,108 @@
+"""
+Cold storage for returned loans.
+
+Returned BorrowRecords older than BORROW_ARCHIVE_AFTER_DAYS are moved to
+ArchivedBorrowRecord in batches, so the hot table (fines task, scanner
+checks, student loans) only grows with active and recent loans. History
+readers go through student_borrow_history / student_borrow_dates, which
+read both tables.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedBorrowRecord, BorrowRecord, LoanReminder
+
+BATCH_SIZE = 1000
+
+
+def archive_returned_borrow_records(older_than_days=None, batch_size=BATCH_SIZE, max_batches=None):
+    """Move old returned loans to the archive table. Returns the number moved."""
+    days = settings.BORROW_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = timezone.localdate() - timedelta(days=days)
+    eligible = BorrowRecord.objects.filter(returned=True, return_date__lt=cutoff).order_by("id")
+
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            rows = list(
+                eligible.select_for_update(skip_locked=True, of=("self",))
+                .values_list(
+                    "id", "student_id", "book_copy_id", "book_copy__book__title",
+                    "book_copy__accession_no", "borrow_date", "return_date", "fine",
+                )[:batch_size]
+            )
+            if not rows:
+                break
+
+            ArchivedBorrowRecord.objects.bulk_create(
+                [
+                    ArchivedBorrowRecord(
+                        original_id=record_id,
+                        student_id=student_id,
+                        book_copy_id=book_copy_id,
+                        book_title=title,
+                        accession_no=accession_no,
+                        borrow_date=borrow_date,
+                        return_date=return_date,
+                        fine=fine,
+                    )
+                    for record_id, student_id, book_copy_id, title, accession_no, borrow_date, return_date, fine in rows
+                ],
+                ignore_conflicts=True,
+            )
+            record_ids = [row[0] for row in rows]
+            # _raw_delete does not cascade; drop the loans' reminder history first
+            LoanReminder.objects.filter(borrow_record_id__in=record_ids)._raw_delete(LoanReminder.objects.db)
+            BorrowRecord.objects.filter(id__in=record_ids)._raw_delete(BorrowRecord.objects.db)
+
+        moved += len(rows)
+        batches += 1
+    return moved
+
+
+def student_borrow_history(student, include_archived=True):
+    """
+    All loans of a student as dicts with the StudentBorrowRecordSerializer
+    fields, oldest first; archived rows carry their original id.
+    """
+    hot = [
+        {
+            "id": record.id,
+            "book_title": record.book_copy.book.title,
+            "accession_no": record.book_copy.accession_no,
+            "borrow_date": record.borrow_date,
+            "return_date": record.return_date,
+            "returned": record.returned,
+            "fine": record.fine,
+        }
+        for record in BorrowRecord.objects.filter(student=student).select_related("book_copy", "book_copy__book")
+    ]
+    if not include_archived:
+        return hot
+
+    cold = [
+        {
+            "id": row["original_id"],
+            "book_title": row["book_title"],
+            "accession_no": row["accession_no"],
+            "borrow_date": row["borrow_date"],
+            "return_date": row["return_date"],
+            "returned": True,
+            "fine": row["fine"],
+        }
+        for row in ArchivedBorrowRecord.objects.filter(student=student).values(
+            "original_id", "book_title", "accession_no", "borrow_date", "return_date", "fine"
+        )
+    ]
+    return sorted(hot + cold, key=lambda row: (row["borrow_date"], row["id"]))
+
+
+def student_borrow_dates(student):
+    """Borrow dates across hot and archived loans (for streaks/analytics)."""
+    hot = BorrowRecord.objects.filter(student=student).values_list("borrow_date", flat=True)
+    cold = ArchivedBorrowRecord.objects.filter(student=student).values_list("borrow_date", flat=True)
+    return list(hot.union(cold, all=True))
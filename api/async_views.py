@@ -0,0 +1,121 @@
+"""
+Async ports of the read-heavy endpoints for the ASGI profile.
+
+Under uvicorn (lms_backend/asgi.py, ASYNC_VIEWS on) these replace the DRF
+views for the catalog, search, notifications and e-book list. They await
+Django's async ORM, so a worker keeps serving other requests while a query
+or cache lookup is in flight. Responses are byte-identical to the DRF views:
+same serializers (the catalog and notification lists through
+aserialize_list() in api/fast_lists.py), renderer and error bodies; the
+catalog cache and replica routing apply as they do for the sync views.
+
+DRF views cannot be async, so AsyncReadView does the small part of APIView
+these endpoints need: JWT authentication, IsAuthenticated, rendering.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+
+from .authentication import StatelessJWTAuthentication
+from .catalog_cache import acached_response
+from .db_routing import ais_pinned, use_replica
+from .fast_lists import FastJSONRenderer, aserialize_list
+from .models import Book, EBook, Notification
+from .serializers import BookSerializer, EBookSerializer, NotificationSerializer
+
+
+class AsyncReadView(View):
+    http_method_names = ["get", "head", "options"]
+    authentication = StatelessJWTAuthentication()
+    renderer = FastJSONRenderer()
+    require_authentication = False
+    # Read from the replica like ReplicaReadMixin views
+    replica_reads = False
+    # catalog_cache endpoint name; None = not cached
+    cache_endpoint = None
+
+    def render(self, data, status_code=status.HTTP_200_OK, headers=None):
+        body = b"" if data is None else self.renderer.render(data)
+        response = HttpResponse(body, status=status_code, content_type=self.renderer.media_type, headers=headers)
+        response["Allow"] = ", ".join(self._allowed_methods())
+        response["Vary"] = "Accept"
+        return response
+
+    def render_error(self, exc):
+        # Same body and headers as DRF's exception handler
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        headers = None
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            headers = {"WWW-Authenticate": self.authentication.authenticate_header(None)}
+        return self.render(data, exc.status_code, headers)
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            # Token checks may refresh the revocation list from the DB
+            result = await sync_to_async(self.authentication.authenticate)(request)
+            request.user = result[0] if result else AnonymousUser()
+            if self.require_authentication and not request.user.is_authenticated:
+                # DRF answers 401 here because the authenticator sends WWW-Authenticate
+                raise NotAuthenticated()
+        except APIException as exc:
+            return self.render_error(exc)
+
+        if self.replica_reads and not await ais_pinned(request.user):
+            use_replica()
+
+        if self.cache_endpoint:
+            return await acached_response(
+                self.cache_endpoint, request, lambda: self.get_data(request), self.render
+            )
+        return self.render(await self.get_data(request))
+
+    async def get_data(self, request):
+        raise NotImplementedError
+
+
+class AvailableBooksView(AsyncReadView):
+    replica_reads = True
+    cache_endpoint = "available_books"
+
+    async def get_data(self, request):
+        books = BookSerializer.prefetch(Book.objects.filter(is_archived=False))
+        return await aserialize_list(BookSerializer, books, {"request": request})
+
+
+class BookSearchView(AsyncReadView):
+    replica_reads = True
+    cache_endpoint = "book_search"
+
+    async def get_data(self, request):
+        queryset = Book.objects.filter(available_copies__gt=0, is_archived=False)
+        query = request.GET.get("q", None)
+        if query:
+            queryset = (
+                queryset.filter(title__icontains=query)
+                | queryset.filter(author__icontains=query)
+                | queryset.filter(category__icontains=query)
+                | queryset.filter(isbn__icontains=query)
+                | queryset.filter(publisher__icontains=query)
+            )
+        return await aserialize_list(BookSerializer, BookSerializer.prefetch(queryset), {"request": request})
+
+
+class MyNotificationsView(AsyncReadView):
+    require_authentication = True
+
+    async def get_data(self, request):
+        notifications = Notification.objects.filter(student=request.user).order_by("-created_at")
+        return await aserialize_list(NotificationSerializer, notifications, {"request": request})
+
+
+class EBookListView(AsyncReadView):
+    require_authentication = True
+    replica_reads = True
+    cache_endpoint = "ebook_list"
+
+    async def get_data(self, request):
+        ebooks = [ebook async for ebook in EBook.objects.filter(is_active=True)]
+        return EBookSerializer(ebooks, many=True, context={"request": request}).data
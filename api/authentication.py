@@ -0,0 +1,130 @@
+"""
+Stateless JWT authentication.
+
+Access tokens carry the user's username, role and active flag as claims, so
+an authenticated request can be served without loading the CustomUser row.
+request.user is a CustomUser instance built from the claims with every other
+field deferred (it is only fetched if a view actually reads one).
+
+Revocation: a token is only accepted while the account's current
+(is_active, role) is (True, <role claim>). That state is read from the user
+table and memoised in process for AUTH_USER_CACHE_TTL seconds; with a shared
+cache (Redis) it is also kept there, and every save, delete and bulk
+deactivation publishes the new state (signals.py, deletion.py) so other
+workers see it at once. With the per-process LocMem cache a change made in
+another worker takes effect within AUTH_USER_CACHE_TTL. A deleted account
+has no row and is rejected. Individually revoked tokens (logout) are checked
+against the in-memory list in revocation.py.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import CustomUser
+from .revocation import revocation_list
+from .utils import cache_is_shared
+
+# State of an account without a row
+_DELETED = (False, None)
+_state_memo = {}
+_MEMO_MAX_SIZE = 50_000
+
+
+class LibraryRefreshToken(RefreshToken):
+    """Refresh token whose derived access tokens carry username, role and is_active claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["username"] = user.username
+        token["role"] = user.role
+        token["is_active"] = user.is_active
+        return token
+
+
+def _state_key(user_id):
+    return f"auth:user_state:{user_id}"
+
+
+def publish_user_state(user_id, is_active, role):
+    """Record the current account state so outstanding tokens can be checked against it."""
+    if cache_is_shared():
+        lifetime = int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        cache.set(_state_key(user_id), (is_active, role), lifetime)
+    _state_memo.pop(user_id, None)
+
+
+def _load_user_state(user_id):
+    row = CustomUser.objects.filter(pk=user_id).values_list("is_active", "role").first()
+    return _DELETED if row is None else tuple(row)
+
+
+def _user_state(user_id):
+    now = time.monotonic()
+    memo = _state_memo.get(user_id)
+    if memo and memo[0] > now:
+        return memo[1]
+
+    if cache_is_shared():
+        state = cache.get(_state_key(user_id))
+        if state is None:
+            # Missing (evicted, or never published): the table decides, never the claims
+            state = _load_user_state(user_id)
+            lifetime = int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+            cache.add(_state_key(user_id), state, lifetime)
+    else:
+        # A LocMem entry would only reflect changes made in this process
+        state = _load_user_state(user_id)
+    state = tuple(state)
+    if len(_state_memo) >= _MEMO_MAX_SIZE:
+        _state_memo.clear()
+    _state_memo[user_id] = (now + settings.AUTH_USER_CACHE_TTL, state)
+    return state
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that builds request.user from the token claims instead
+    of loading the user row; only the memoised account state is checked.
+    Tokens issued before the claims existed, or any token when
+    JWT_STATELESS_AUTH is off, fall back to the full DB lookup.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_list.is_revoked(validated_token.get(jwt_settings.JTI_CLAIM)):
+            raise InvalidToken("Token has been revoked")
+        return validated_token
+
+    def get_user(self, validated_token):
+        if not settings.JWT_STATELESS_AUTH or "role" not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            # simplejwt stores the id as a string claim
+            user_id = CustomUser._meta.pk.to_python(validated_token[jwt_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError):
+            raise AuthenticationFailed("Token contained no recognizable user identification")
+
+        role = validated_token["role"]
+        if not validated_token.get("is_active", True):
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if _user_state(user_id) != (True, role):
+            raise AuthenticationFailed("Token is no longer valid for this account", code="user_inactive")
+
+        claims = {
+            "id": user_id,
+            "username": validated_token.get("username", ""),
+            "role": role,
+            "is_active": True,
+        }
+        # from_db expects values in concrete field order; missing fields are deferred
+        field_names = [f.attname for f in CustomUser._meta.concrete_fields if f.attname in claims]
+        return CustomUser.from_db(DEFAULT_DB_ALIAS, field_names, [claims[name] for name in field_names])
@@ -0,0 +1,206 @@
+"""
+Response cache for the catalog endpoints.
+
+Serialized catalog responses are cached under (endpoint, host, query
+params, catalog version). Any write to Book, BookCopy or EBook, or a loan
+being created/returned, bumps the catalog version (signals.py; bulk paths
+call bump_catalog_version themselves), so stale entries are never read
+again and simply expire.
+
+Every cached response carries an ETag derived from the same key; a request
+whose If-None-Match matches gets 304 without touching the cache entry.
+
+While a read replica may still lag behind the latest bump
+(REPLICA_PIN_SECONDS), responses are served uncached.
+
+The cache alias is CATALOG_CACHE_ALIAS. With a shared backend (REDIS_URL)
+a version bump in one worker is seen by all and responses are kept for
+CATALOG_CACHE_TTL. With the default per-process LocMem cache a bump in
+another worker is invisible, so the version and the responses only live
+for CATALOG_CACHE_LOCAL_TTL seconds, which bounds how stale a worker's
+catalog can be.
+"""
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .db_routing import within_replica_lag
+from .utils import cache_is_shared
+
+VERSION_KEY = "catalog:version"
+
+
+def _cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def _ttl(shared_ttl=None):
+    """Lifetime of cache entries; short unless every worker shares the cache."""
+    if cache_is_shared(settings.CATALOG_CACHE_ALIAS):
+        return shared_ttl
+    return settings.CATALOG_CACHE_LOCAL_TTL
+
+
+def catalog_version():
+    version = _cache().get(VERSION_KEY)
+    if version is None:
+        version = str(time.time_ns())
+        if not _cache().add(VERSION_KEY, version, _ttl()):
+            version = _cache().get(VERSION_KEY, version)
+    return version
+
+
+async def acatalog_version():
+    version = await _cache().aget(VERSION_KEY)
+    if version is None:
+        version = str(time.time_ns())
+        if not await _cache().aadd(VERSION_KEY, version, _ttl()):
+            version = await _cache().aget(VERSION_KEY, version)
+    return version
+
+
+def _set_new_version():
+    _cache().set(VERSION_KEY, str(time.time_ns()), _ttl())
+
+
+def bump_catalog_version(**kwargs):
+    """
+    Invalidate every cached catalog response once the current transaction
+    commits (a reader must not cache pre-commit rows under the new version).
+    Usable as a signal receiver.
+    """
+    transaction.on_commit(_set_new_version)
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def incr(self, endpoint, outcome):
+        with self._lock:
+            key = (endpoint, outcome)
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def hit_rate(self, endpoint):
+        hits = self.counts.get((endpoint, "hit"), 0) + self.counts.get((endpoint, "not_modified"), 0)
+        total = hits + self.counts.get((endpoint, "miss"), 0)
+        return hits / total if total else None
+
+    def render_prometheus(self):
+        with self._lock:
+            counts = sorted(self.counts.items())
+        endpoints = sorted({endpoint for (endpoint, _), _ in counts})
+        lines = [
+            "# HELP lms_catalog_cache_requests_total Catalog cache lookups by outcome.",
+            "# TYPE lms_catalog_cache_requests_total counter",
+        ]
+        lines += [
+            f'lms_catalog_cache_requests_total{{endpoint="{endpoint}",outcome="{outcome}"}} {count}'
+            for (endpoint, outcome), count in counts
+        ]
+        lines += [
+            "# HELP lms_catalog_cache_hit_ratio Share of requests served from cache or with 304.",
+            "# TYPE lms_catalog_cache_hit_ratio gauge",
+        ]
+        rates = ((endpoint, self.hit_rate(endpoint)) for endpoint in endpoints)
+        # No ratio for endpoints whose requests all bypassed the cache
+        lines += [
+            f'lms_catalog_cache_hit_ratio{{endpoint="{endpoint}"}} {rate:.4f}' for endpoint, rate in rates if rate is not None
+        ]
+        return "\n".join(lines) + "\n"
+
+
+stats = CacheStats()
+
+
+def _cache_key(endpoint, request, version):
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.GET.lists()))
+    raw = f"{endpoint}|{request.get_host()}|{request.scheme}|{params}|{version}"
+    return f"catalog:resp:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def _not_modified(request, etag):
+    """Whether If-None-Match lists this ETag (weak comparison) or is "*"."""
+    tags = parse_etags(request.headers.get("If-None-Match", ""))
+    return tags == ["*"] or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def _with_validators(response, etag):
+    response["ETag"] = etag
+    # Clients may keep the body but must revalidate it every time
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def catalog_cached(endpoint):
+    """Decorator for a view's get() returning catalog data that is the same for every user."""
+    def decorator(get):
+        @wraps(get)
+        def wrapper(view, request, *args, **kwargs):
+            if not settings.CATALOG_CACHE_ENABLED:
+                return get(view, request, *args, **kwargs)
+
+            version = catalog_version()
+            if within_replica_lag(int(version) / 1e9):
+                # The replica may not have the write behind this version yet;
+                # caching what it returns would pin stale data to the new version
+                stats.incr(endpoint, "bypass")
+                return get(view, request, *args, **kwargs)
+
+            key = _cache_key(endpoint, request, version)
+            etag = f'"{key.rsplit(":", 1)[1]}"'
+            if _not_modified(request, etag):
+                stats.incr(endpoint, "not_modified")
+                return _with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+            data = _cache().get(key)
+            if data is not None:
+                stats.incr(endpoint, "hit")
+                return _with_validators(Response(data), etag)
+
+            stats.incr(endpoint, "miss")
+            response = get(view, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                _cache().set(key, response.data, _ttl(settings.CATALOG_CACHE_TTL))
+                _with_validators(response, etag)
+            return response
+        return wrapper
+    return decorator
+
+
+async def acached_response(endpoint, request, compute, render):
+    """
+    catalog_cached for async views: `compute()` is awaited for the data on a
+    miss and `render(data, status)` builds the response.
+    """
+    if not settings.CATALOG_CACHE_ENABLED:
+        return render(await compute(), status.HTTP_200_OK)
+
+    version = await acatalog_version()
+    if within_replica_lag(int(version) / 1e9):
+        stats.incr(endpoint, "bypass")
+        return render(await compute(), status.HTTP_200_OK)
+
+    key = _cache_key(endpoint, request, version)
+    etag = f'"{key.rsplit(":", 1)[1]}"'
+    if _not_modified(request, etag):
+        stats.incr(endpoint, "not_modified")
+        return _with_validators(render(None, status.HTTP_304_NOT_MODIFIED), etag)
+
+    data = await _cache().aget(key)
+    if data is not None:
+        stats.incr(endpoint, "hit")
+    else:
+        stats.incr(endpoint, "miss")
+        data = await compute()
+        await _cache().aset(key, data, _ttl(settings.CATALOG_CACHE_TTL))
+    return _with_validators(render(data, status.HTTP_200_OK), etag)
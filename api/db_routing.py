@@ -0,0 +1,173 @@
+"""
+Primary / read-replica routing and connection pool metrics.
+
+Views that only read (catalog, search, history, analytics) mix in
+ReplicaReadMixin. For safe methods their queries go to the
+DATABASE_REPLICA_ALIAS database when one is configured; everything else,
+including background tasks and commands, uses the primary ("default").
+
+Read-your-writes: as soon as a request writes, the rest of it reads from
+the primary, and the user is pinned to the primary for REPLICA_PIN_SECONDS
+(an upper bound on replication lag) so their next requests see the write.
+Pins live in the default cache, so use a shared cache with several workers.
+
+With DATABASE_POOL enabled each Postgres alias keeps a psycopg pool per
+process; render_pool_prometheus() exports its stats.
+"""
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .middleware import HybridMiddleware
+
+PRIMARY = "default"
+
+_use_replica = ContextVar("use_replica", default=False)
+_wrote = ContextVar("wrote", default=False)
+
+
+def replica_alias():
+    alias = settings.DATABASE_REPLICA_ALIAS
+    return alias if alias in settings.DATABASES else None
+
+
+def _pin_key(user_id):
+    return f"db:pin:{user_id}"
+
+
+def pin_to_primary(user):
+    cache.set(_pin_key(user.pk), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    return bool(user and user.is_authenticated and cache.get(_pin_key(user.pk)))
+
+
+async def ais_pinned(user):
+    return bool(user and user.is_authenticated and await cache.aget(_pin_key(user.pk)))
+
+
+def use_replica():
+    """Route the rest of this request's reads to the replica (until it writes)."""
+    _use_replica.set(True)
+
+
+def within_replica_lag(timestamp):
+    """True if a write at `timestamp` (epoch seconds) may not have reached the replica yet."""
+    return replica_alias() is not None and time.time() - timestamp < settings.REPLICA_PIN_SECONDS
+
+
+class RoutingStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def incr(self, alias, kind):
+        with self._lock:
+            key = (alias, kind)
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+
+stats = RoutingStats()
+
+
+class PrimaryReplicaRouter:
+    """Send reads to the replica only inside ReplicaReadMixin views that have not written."""
+
+    def db_for_read(self, model, **hints):
+        alias = PRIMARY
+        if _use_replica.get() and not _wrote.get() and not connections[PRIMARY].in_atomic_block:
+            alias = replica_alias() or PRIMARY
+        stats.incr(alias, "read")
+        return alias
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        stats.incr(PRIMARY, "write")
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaReadMixin:
+    """Serve safe-method requests of this view from the read replica."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned(request.user):
+            use_replica()
+
+
+class DatabaseRoutingMiddleware(HybridMiddleware):
+    """Scope routing state to the request and pin users who wrote to the primary."""
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        replica_token = _use_replica.set(False)
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if self._should_pin(request):
+                pin_to_primary(request.user)
+            return response
+        finally:
+            _use_replica.reset(replica_token)
+            _wrote.reset(wrote_token)
+
+    async def __acall__(self, request):
+        replica_token = _use_replica.set(False)
+        wrote_token = _wrote.set(False)
+        try:
+            response = await self.get_response(request)
+            if self._should_pin(request):
+                await cache.aset(_pin_key(request.user.pk), 1, settings.REPLICA_PIN_SECONDS)
+            return response
+        finally:
+            _use_replica.reset(replica_token)
+            _wrote.reset(wrote_token)
+
+    def _should_pin(self, request):
+        user = getattr(request, "user", None)
+        return _wrote.get() and replica_alias() and user is not None and user.is_authenticated
+
+
+POOL_STATS = ("pool_min", "pool_max", "pool_size", "pool_available", "requests_waiting")
+POOL_COUNTERS = ("requests_num", "requests_queued", "requests_wait_ms", "requests_errors",
+                 "connections_num", "connections_ms", "connections_errors", "connections_lost")
+
+
+def render_pool_prometheus():
+    """Routing counters and psycopg pool stats (pools exist only with DATABASE_POOL on Postgres)."""
+    with stats._lock:
+        counts = sorted(stats.counts.items())
+    lines = [
+        "# HELP lms_db_routed_total Queries routed per database alias.",
+        "# TYPE lms_db_routed_total counter",
+    ]
+    lines += [f'lms_db_routed_total{{alias="{alias}",kind="{kind}"}} {count}' for (alias, kind), count in counts]
+
+    pools = {}
+    for alias in settings.DATABASES:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            # get_stats() keeps the counters cumulative (pop_stats() would reset them)
+            pools[alias] = pool.get_stats()
+    for name in POOL_STATS + POOL_COUNTERS:
+        if not pools:
+            break
+        kind = "gauge" if name in POOL_STATS else "counter"
+        metric = f"lms_db_pool_{name}" + ("_total" if kind == "counter" else "")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines += [f'{metric}{{alias="{alias}"}} {values.get(name, 0)}' for alias, values in pools.items()]
+    return "\n".join(lines) + "\n"
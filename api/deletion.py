@@ -0,0 +1,225 @@
+"""
+Batched, set-based deletion of books and users.
+
+Django's cascade collector loads every related row into memory and deletes
+them object by object. Here the cascade is derived from model metadata
+once, then each table is cleared leaves-first with DELETE ... WHERE pk IN
+(batch) statements, so memory stays flat. No per-object signals are sent.
+
+Inline deletions run in one transaction: all or nothing. That holds its
+locks until the end, so they are refused when the cascade would touch more
+than INLINE_DELETE_MAX_ROWS rows. DeletionJobs commit batch by batch so
+locks stay brief, and record each finished step
+of the plan in job.progress; every step is idempotent, so when
+django-background-tasks retries a failed job it continues from the last
+finished step instead of leaving a partial delete behind.
+
+"archive" mode keeps circulation history instead: books are hidden from the
+catalog and users are deactivated.
+"""
+from django.conf import settings
+from django.db import models, router, transaction
+from django.utils import timezone
+
+from .authentication import publish_user_state
+from .catalog_cache import bump_catalog_version
+from .models import Book, BookNotificationRequest, BookRequest, BookReservation, CustomUser, DeletionJob
+from .reservations import cancel_reservations_of
+
+BATCH_SIZE = 1000
+
+
+class DeletionBlocked(Exception):
+    pass
+
+
+class DeletionTooLarge(Exception):
+    pass
+
+
+def _reverse_relations(model):
+    for field in model._meta.get_fields(include_hidden=True):
+        if field.auto_created and not field.concrete and (field.one_to_many or field.one_to_one):
+            yield field
+
+
+def cascade_plan(model, lookup="pk", seen=None):
+    """
+    Ordered steps (action, model, lookup) to delete rows of `model` matching
+    `lookup__in=root_ids`, dependents first. Mirrors each FK's on_delete.
+    """
+    seen = seen or set()
+    if model in seen:
+        raise DeletionBlocked(f"Cyclic relation through {model._meta.label}")
+    seen = seen | {model}
+
+    steps = []
+    for rel in _reverse_relations(model):
+        related_lookup = rel.field.name if lookup == "pk" else f"{rel.field.name}__{lookup}"
+        on_delete = rel.on_delete
+
+        if on_delete is models.CASCADE:
+            steps += cascade_plan(rel.related_model, related_lookup, seen)
+        elif on_delete is models.SET_NULL:
+            steps.append(("set_null", rel.related_model, related_lookup, rel.field.name))
+        elif on_delete in (models.PROTECT, models.RESTRICT):
+            steps.append(("protect", rel.related_model, related_lookup, None))
+        # DO_NOTHING / SET_DEFAULT / SET(): left to the database
+
+    steps.append(("delete", model, lookup, None))
+    return steps
+
+
+def cascade_size(model, root_ids, limit):
+    """Rows delete_cascade() would delete or update, counted up to limit + 1."""
+    db = router.db_for_write(model)
+    total = 0
+    for action, related_model, lookup, _ in cascade_plan(model):
+        if action == "protect":
+            continue
+        matching = related_model._base_manager.using(db).filter(**{f"{lookup}__in": root_ids})
+        total += matching.values("pk")[:limit + 1 - total].count()
+        if total > limit:
+            break
+    return total
+
+
+def _delete_in_batches(db, model, lookup, root_ids, batch_size):
+    """DELETE matching rows batch by batch; returns the number deleted."""
+    matching = model._base_manager.using(db).filter(**{f"{lookup}__in": root_ids})
+    total = 0
+    while True:
+        with transaction.atomic(using=db):
+            batch = list(matching.values_list("pk", flat=True)[:batch_size])
+            if not batch:
+                return total
+            # Plain DELETE ... WHERE pk IN (...): no collector, no signals
+            total += model._base_manager.using(db).filter(pk__in=batch)._raw_delete(db)
+
+
+def delete_cascade(model, root_ids, batch_size=BATCH_SIZE, progress=None, completed=0, counts=None):
+    """
+    Delete rows of `model` with pk in root_ids and everything that cascades
+    from them. progress(label, completed, counts) is called after each
+    step; pass the last completed/counts back in to resume a failed run.
+    Returns {model label: rows deleted}.
+    """
+    root_ids = list(root_ids)
+    plan = cascade_plan(model)
+    db = router.db_for_write(model)
+
+    for action, related_model, lookup, _ in plan:
+        if action == "protect" and related_model._base_manager.using(db).filter(
+            **{f"{lookup}__in": root_ids}
+        ).exists():
+            raise DeletionBlocked(f"Protected {related_model._meta.verbose_name_plural} still reference these rows")
+
+    counts = dict(counts or {})
+    for step, (action, related_model, lookup, field_name) in enumerate(plan):
+        if step < completed or action == "protect":
+            continue
+        label = related_model._meta.label
+        if action == "set_null":
+            counts[label] = counts.get(label, 0) + related_model._base_manager.using(db).filter(
+                **{f"{lookup}__in": root_ids}
+            ).update(**{field_name: None})
+        else:
+            counts[label] = counts.get(label, 0) + _delete_in_batches(db, related_model, lookup, root_ids, batch_size)
+        if progress:
+            progress(label, step + 1, counts)
+    return counts
+
+
+def archive_books(book_ids):
+    """Withdraw books from the catalog but keep copies and borrow history."""
+    with transaction.atomic():
+        archived = Book.objects.filter(id__in=book_ids, is_archived=False).update(is_archived=True)
+        BookRequest.objects.filter(book_copy__book_id__in=book_ids, status="PENDING").update(
+            status="REJECTED",
+            admin_comment="Book withdrawn from the library.",
+        )
+        BookNotificationRequest.objects.filter(book_id__in=book_ids).delete()
+        BookReservation.objects.filter(
+            book_id__in=book_ids, status__in=BookReservation.ACTIVE_STATUSES
+        ).update(status=BookReservation.STATUS_CANCELLED)
+    return {Book._meta.label: archived}
+
+
+def archive_users(user_ids):
+    """Deactivate accounts; their loans, fines and attendance stay."""
+    users = list(CustomUser.objects.filter(id__in=user_ids, is_active=True).values_list("id", "role"))
+    CustomUser.objects.filter(id__in=[user_id for user_id, _ in users]).update(is_active=False)
+    for user_id, role in users:
+        publish_user_state(user_id, False, role)
+    return {CustomUser._meta.label: len(users)}
+
+
+TARGETS = {
+    DeletionJob.KIND_BOOK: (Book, archive_books),
+    DeletionJob.KIND_USER: (CustomUser, archive_users),
+}
+
+
+def _delete(kind, model, ids, **resume):
+    if kind == DeletionJob.KIND_USER:
+        # The cascade raw-deletes reservations: pass held copies on to the queue or shelf first
+        cancel_reservations_of(ids)
+    return delete_cascade(model, ids, **resume)
+
+
+def run_deletion(kind, ids, mode, progress=None, completed=0, counts=None):
+    """
+    Inline (no progress callback) deletes are one transaction and raise
+    DeletionTooLarge above INLINE_DELETE_MAX_ROWS; see delete_cascade() for the rest.
+    """
+    model, archive = TARGETS[kind]
+    if mode == DeletionJob.MODE_ARCHIVE:
+        counts = archive(ids)
+    elif progress:
+        counts = _delete(kind, model, ids, progress=progress, completed=completed, counts=counts)
+    else:
+        with transaction.atomic(using=router.db_for_write(model)):
+            limit = settings.INLINE_DELETE_MAX_ROWS
+            if cascade_size(model, ids, limit) > limit:
+                raise DeletionTooLarge(f"This would delete more than {limit} rows in one transaction.")
+            counts = _delete(kind, model, ids)
+    if kind == DeletionJob.KIND_BOOK:
+        bump_catalog_version()
+    elif mode == DeletionJob.MODE_DELETE:
+        # Deleted rows bypass signals; revoke outstanding tokens explicitly
+        for user_id in ids:
+            publish_user_state(user_id, False, None)
+    return counts
+
+
+def run_deletion_job(job_id):
+    """Run a DeletionJob, continuing from its recorded progress if an earlier attempt failed."""
+    job = DeletionJob.objects.get(id=job_id)
+    if job.status == DeletionJob.STATUS_DONE:
+        return job.progress.get("deleted", {})
+    DeletionJob.objects.filter(id=job.id).update(
+        status=DeletionJob.STATUS_RUNNING, started_at=job.started_at or timezone.now(), error=None
+    )
+
+    def progress(label, completed, counts):
+        DeletionJob.objects.filter(id=job.id).update(
+            progress={"step": label, "completed": completed, "deleted": counts}
+        )
+
+    try:
+        counts = run_deletion(
+            job.kind, job.target_ids, job.mode, progress=progress,
+            completed=job.progress.get("completed", 0), counts=job.progress.get("deleted"),
+        )
+    except Exception as e:
+        DeletionJob.objects.filter(id=job.id).update(
+            status=DeletionJob.STATUS_FAILED, error=str(e), finished_at=timezone.now()
+        )
+        raise
+
+    DeletionJob.objects.filter(id=job.id).update(
+        status=DeletionJob.STATUS_DONE,
+        progress={"step": None, "deleted": counts},
+        finished_at=timezone.now(),
+    )
+    return counts
@@ -0,0 +1,264 @@
+"""
+Fast serialization for large read-only lists.
+
+A ModelSerializer with many=True builds every row through get_attribute()
+and to_representation() per field, on model instances the ORM had to
+construct first. For the catalog, borrow record and notification lists,
+serialize_list() instead fetches tuples with values_list() and turns each
+into a dict with a row builder made once per serializer from its own
+fields: same keys in the same order, None kept as None, and the field's own
+to_representation() for dates, datetimes and decimals. Char, integer,
+boolean and primary key fields represent a database value as the value
+itself, so they are copied as is. Fields that are not plain columns
+(BookSerializer's image, copies and available_copy_ids) are registered with
+compact() below. aserialize_list() is the same for async views, fetching
+through the async ORM.
+
+FastJSONRenderer writes the same bytes as JSONRenderer, with orjson when it
+is installed and the data has no floats. Responses stay byte-identical to the serializers';
+`manage.py benchmark_serialization` checks that and measures the speedup.
+FAST_LIST_SERIALIZATION=False turns the fast path off.
+"""
+from collections import defaultdict
+from functools import cache
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .metrics import serializer_timing
+from .models import BookCopy
+from .serializers import BookCopySerializer, BookSerializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Fields whose representation of a database value is the value itself
+_PLAIN_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.IntegerField, serializers.PrimaryKeyRelatedField,
+)
+
+# serializer class -> {field name: (columns, function(context, *values))} / (prepare, aprepare)
+_COMPUTED = {}
+_PREPARE = {}
+
+
+def compact(serializer_class, computed, prepare=None, aprepare=None):
+    """
+    Register the non-column fields of a serializer. `computed` maps a field
+    name to (columns, function) called as function(context, *column values)
+    per row; `prepare(rows, columns, context)` runs once per list before the
+    rows are built, e.g. to fetch related rows for every row in one query,
+    and returns entries to add to the context. `aprepare` is its coroutine
+    version for aserialize_list().
+    """
+    _COMPUTED[serializer_class] = computed
+    if prepare:
+        _PREPARE[serializer_class] = (prepare, aprepare)
+
+
+def _column_value(index):
+    return lambda row, context: row[index]
+
+
+def _represented_value(index, to_representation):
+    def value(row, context):
+        column = row[index]
+        return None if column is None else to_representation(column)
+    return value
+
+
+def _computed_value(indexes, function):
+    return lambda row, context: function(context, *[row[index] for index in indexes])
+
+
+class RowBuilder:
+    """The values_list() columns for a serializer and, per field, how to get its value from one row."""
+
+    def __init__(self, serializer_class):
+        computed = _COMPUTED.get(serializer_class, {})
+        self.columns = []
+        self.prepare, self.aprepare = _PREPARE.get(serializer_class, (None, None))
+        self.fields = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if name in computed:
+                columns, function = computed[name]
+                value = _computed_value([self._column(column) for column in columns], function)
+            elif isinstance(field, _PLAIN_FIELDS):
+                value = _column_value(self._column(field.source.replace(".", "__")))
+            elif isinstance(field, (serializers.DateField, serializers.DateTimeField, serializers.DecimalField)):
+                value = _represented_value(self._column(field.source.replace(".", "__")), field.to_representation)
+            else:
+                raise TypeError(
+                    f"{serializer_class.__name__}.{name} ({type(field).__name__}) needs a compact() entry"
+                )
+            self.fields.append((name, value))
+
+    def _column(self, column):
+        if column not in self.columns:
+            self.columns.append(column)
+        return self.columns.index(column)
+
+    def build(self, row, context):
+        return {name: value(row, context) for name, value in self.fields}
+
+
+@cache
+def row_builder(serializer_class):
+    return RowBuilder(serializer_class)
+
+
+def _rows(builder, queryset):
+    # Prefetches are for model instances; compact() prepare functions do their own
+    return queryset.prefetch_related(None).values_list(*builder.columns)
+
+
+def compact_rows(serializer_class, queryset, context=None):
+    """serializer_class(queryset, many=True, context=context).data, without the serializer."""
+    builder = row_builder(serializer_class)
+    context = context or {}
+    rows = list(_rows(builder, queryset))
+    if builder.prepare:
+        context = {**context, **builder.prepare(rows, builder.columns, context)}
+    build = builder.build
+    return [build(row, context) for row in rows]
+
+
+async def acompact_rows(serializer_class, queryset, context=None):
+    """compact_rows() with the rows fetched through the async ORM."""
+    builder = row_builder(serializer_class)
+    context = context or {}
+    rows = [row async for row in _rows(builder, queryset)]
+    if builder.aprepare:
+        context = {**context, **await builder.aprepare(rows, builder.columns, context)}
+    build = builder.build
+    return [build(row, context) for row in rows]
+
+
+def serialize_list(serializer_class, queryset, context=None):
+    """List data for a read-only endpoint, through the fast path when FAST_LIST_SERIALIZATION is on."""
+    if not settings.FAST_LIST_SERIALIZATION:
+        return serializer_class(queryset, many=True, context=context or {}).data
+    with serializer_timing():
+        return compact_rows(serializer_class, queryset, context)
+
+
+async def aserialize_list(serializer_class, queryset, context=None):
+    """serialize_list() for async views; instances or rows are fetched with the async ORM."""
+    if not settings.FAST_LIST_SERIALIZATION:
+        objects = [obj async for obj in queryset]
+        return serializer_class(objects, many=True, context=context or {}).data
+    with serializer_timing():
+        return await acompact_rows(serializer_class, queryset, context)
+
+
+def _contains_float(data):
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            return True
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer through orjson for compact, non-ASCII-escaped output (the
+    DRF defaults). Anything orjson would encode differently from the stdlib
+    encoder (datetimes, Decimals, str subclasses like ErrorDetail, non-str
+    keys, huge integers) makes orjson raise, and the stdlib path renders
+    it. Floats do not raise but some are formatted differently (1e-7 vs
+    1e-07), so data containing a float is rendered by the stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+            or _contains_float(data)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS
+                | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # As JSONRenderer: keep the output valid JavaScript
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+class FastListMixin:
+    """
+    For read-only list views: renders JSON with FastJSONRenderer and, on
+    ListAPIViews without pagination, lists through serialize_list().
+    """
+    renderer_classes = [
+        FastJSONRenderer if renderer is JSONRenderer else renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+    ]
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_LIST_SERIALIZATION or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(serialize_list(self.get_serializer_class(), queryset, self.get_serializer_context()))
+
+
+def _book_image(context, image):
+    # BookSerializer.to_representation
+    request = context.get("request")
+    if image and hasattr(image, "url"):
+        return request.build_absolute_uri(image.url) if request else image.url
+    return None
+
+
+def _book_copy_rows(rows, columns):
+    # BookSerializer.prefetch: every listed book's copies, in one query
+    book_ids = [row[columns.index("id")] for row in rows]
+    return BookCopy.objects.filter(book__in=book_ids).order_by("id").values_list(
+        "book", *row_builder(BookCopySerializer).columns
+    )
+
+
+def _group_book_copies(copy_rows, context):
+    builder = row_builder(BookCopySerializer)
+    copies = defaultdict(list)
+    for row in copy_rows:
+        copies[row[0]].append(builder.build(row[1:], context))
+    return {"book_copies": copies}
+
+
+def _book_copies(rows, columns, context):
+    return _group_book_copies(_book_copy_rows(rows, columns) if rows else [], context)
+
+
+async def _abook_copies(rows, columns, context):
+    copy_rows = [row async for row in _book_copy_rows(rows, columns)] if rows else []
+    return _group_book_copies(copy_rows, context)
+
+
+compact(
+    BookSerializer,
+    {
+        "image": (("image",), _book_image),
+        "available_copy_ids": (
+            ("id", "available_copies"),
+            lambda context, id, available: [copy["id"] for copy in context["book_copies"].get(id, [])[:available]],
+        ),
+        "copies": (("id",), lambda context, id: context["book_copies"].get(id, [])),
+    },
+    prepare=_book_copies,
+    aprepare=_abook_copies,
+)
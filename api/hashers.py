@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from settings.PBKDF2_ITERATIONS.
+    Same algorithm name as Django's hasher, so existing hashes keep verifying
+    and are rehashed at the configured cost on the next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS
@@ -0,0 +1,104 @@
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from rest_framework import permissions
+
+from .models import LibraryAttendance, UsedKioskToken
+from .utils import mark_students_present
+
+KIOSK_TOKEN_SALT = "api.kiosk.checkin"
+
+
+class InvalidKioskToken(Exception):
+    pass
+
+
+def issue_checkin_token(student):
+    """
+    Signed, timestamped, single-use token a student shows as a QR code at
+    the gate. Only issue it to active members: the kiosk does not look the
+    student up again.
+    """
+    return signing.dumps({"s": student.id, "n": secrets.token_urlsafe(12)}, salt=KIOSK_TOKEN_SALT, compress=True)
+
+
+def read_checkin_token(token):
+    """
+    Validate a QR token's signature and age, without queries, and return
+    (student_id, nonce). kiosk_check_in/kiosk_check_out spend the nonce
+    once they succeed, so a photographed QR code cannot be replayed.
+    """
+    try:
+        payload = signing.loads(
+            token,
+            salt=KIOSK_TOKEN_SALT,
+            max_age=settings.KIOSK_TOKEN_MAX_AGE,
+        )
+    except signing.SignatureExpired:
+        raise InvalidKioskToken("Token expired, please refresh your QR code.")
+    except signing.BadSignature:
+        raise InvalidKioskToken("Invalid token.")
+    if "n" not in payload:
+        raise InvalidKioskToken("Invalid token.")
+    return payload["s"], payload["n"]
+
+
+def _spend(nonce):
+    """Record a nonce as used; called inside the check-in/out transaction so a replay rolls it back."""
+    try:
+        with transaction.atomic():
+            UsedKioskToken.objects.create(
+                nonce=nonce,
+                expires_at=timezone.now() + timedelta(seconds=settings.KIOSK_TOKEN_MAX_AGE),
+            )
+    except IntegrityError:
+        raise InvalidKioskToken("Token already used, please refresh your QR code.")
+
+
+def kiosk_check_in(student_id, nonce):
+    """Upsert today's attendance row as PRESENT in one statement and spend the token."""
+    now = timezone.now()
+    with transaction.atomic():
+        mark_students_present([student_id], check_in_time=now)
+        _spend(nonce)
+    return now
+
+
+def kiosk_check_out(student_id, nonce):
+    """
+    Stamp check_out_time on the student's latest open attendance row in one
+    UPDATE, whatever its date (visits can run past midnight), and spend the
+    token. Returns None, leaving the token unspent, if not inside.
+    """
+    now = timezone.now()
+    latest_open = LibraryAttendance.objects.filter(
+        student_id=student_id,
+        status="PRESENT",
+        check_out_time__isnull=True,
+    ).order_by("-date").values("id")[:1]
+    with transaction.atomic():
+        if not LibraryAttendance.objects.filter(id__in=latest_open).update(check_out_time=now):
+            return None
+        _spend(nonce)
+    return now
+
+
+def purge_used_kiosk_tokens():
+    """Delete used nonces whose tokens have expired anyway."""
+    deleted, _ = UsedKioskToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+class IsKioskDevice(permissions.BasePermission):
+    """Gate kiosks authenticate with the shared X-Kiosk-Key header; admins are also allowed."""
+
+    def has_permission(self, request, view):
+        key = request.headers.get("X-Kiosk-Key")
+        if key and settings.KIOSK_API_KEY:
+            return constant_time_compare(key, settings.KIOSK_API_KEY)
+        return request.user.is_authenticated and request.user.role == "ADMIN"
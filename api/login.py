@@ -0,0 +1,100 @@
+"""
+Login throughput helpers.
+
+- At most LOGIN_HASH_WORKERS password checks run at once and callers wait
+  at most LOGIN_HASH_QUEUE_TIMEOUT seconds for a slot, so a login storm
+  gets fast 503s instead of timing out workers. The check still runs on
+  the request's own thread: the slots bound CPU spent hashing, they do not
+  free the worker while it hashes.
+- Per-username and per-IP token buckets reject abusive attempts before any
+  hashing happens.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+
+
+class LoginBusy(Exception):
+    pass
+
+
+class TokenBucketLimiter:
+    """
+    In-memory token buckets: each key may spend `capacity` attempts,
+    refilled continuously at capacity / period per second.
+    """
+    max_keys = 100_000
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        """Spend one token for key. Returns 0 if allowed, else seconds until the next token."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / self.rate
+
+            if len(self._buckets) >= self.max_keys:
+                self._evict(now)
+            self._buckets[key] = (tokens - 1, now)
+            return 0
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def _evict(self, now):
+        # Buckets that have refilled completely carry no state
+        self._buckets = {
+            key: (tokens, last)
+            for key, (tokens, last) in self._buckets.items()
+            if tokens + (now - last) * self.rate < self.capacity
+        }
+
+
+def _parse_rate(rate):
+    """'10/60' -> (10, 60): 10 attempts per 60 seconds."""
+    count, period = rate.split("/")
+    return int(count), int(period)
+
+
+username_limiter = TokenBucketLimiter(*_parse_rate(settings.LOGIN_RATE_LIMIT_USERNAME))
+ip_limiter = TokenBucketLimiter(*_parse_rate(settings.LOGIN_RATE_LIMIT_IP))
+
+_hash_slots = threading.BoundedSemaphore(settings.LOGIN_HASH_WORKERS)
+
+
+def client_ip(request):
+    if settings.LOGIN_TRUST_X_FORWARDED_FOR:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def check_login_rate(username, ip):
+    """Seconds the caller must wait, or 0 if the attempt may proceed."""
+    return max(ip_limiter.allow(f"ip:{ip}"), username_limiter.allow(f"user:{username.lower()}"))
+
+
+def authenticate_credentials(request, username, password):
+    """
+    authenticate() in one of the LOGIN_HASH_WORKERS hashing slots. Raises
+    LoginBusy if no slot frees up within LOGIN_HASH_QUEUE_TIMEOUT seconds.
+    Outdated hashes are replaced by the auth backend on success.
+    """
+    if not _hash_slots.acquire(timeout=settings.LOGIN_HASH_QUEUE_TIMEOUT):
+        raise LoginBusy("Too many logins in progress, please retry.")
+    try:
+        return authenticate(request, username=username, password=password)
+    finally:
+        _hash_slots.release()
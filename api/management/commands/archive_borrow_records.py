@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.archive import BATCH_SIZE, archive_returned_borrow_records
+
+
+class Command(BaseCommand):
+    help = "Move returned borrow records older than BORROW_ARCHIVE_AFTER_DAYS to the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Override BORROW_ARCHIVE_AFTER_DAYS.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, help="Stop after this many batches.")
+
+    def handle(self, *args, **options):
+        moved = archive_returned_borrow_records(
+            older_than_days=options["days"],
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} borrow record(s)."))
@@ -0,0 +1,169 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from api.metrics import QueryMetrics
+from api.models import BookCopy, BorrowRecord, CustomUser
+from api.synthetic import WORDS, seed_library
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "api_baseline.json"
+# Latency regressions smaller than this are treated as noise
+NOISE_FLOOR_MS = 5.0
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic library on a throwaway test database, drive the hot API endpoints through "
+        "the test client and compare latency and query counts against a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--books", type=int, default=2000)
+        parser.add_argument("--copies-per-book", type=int, default=3)
+        parser.add_argument("--years", type=int, default=2, help="Years of borrow history.")
+        parser.add_argument("--loans-per-user-year", type=int, default=12)
+        parser.add_argument("--attendance-days", type=int, default=60)
+        parser.add_argument("--notifications-per-user", type=int, default=20)
+        parser.add_argument("--requests", type=int, default=50, help="Measured requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--only", nargs="*", help="Endpoint names to run.")
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+        parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25,
+            help="Allowed p95 latency growth over the baseline (0.25 = 25%%). Query counts must not grow.",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            started = time.perf_counter()
+            counts = seed_library(
+                users=options["users"],
+                books=options["books"],
+                copies_per_book=options["copies_per_book"],
+                years=options["years"],
+                loans_per_user_year=options["loans_per_user_year"],
+                attendance_days=options["attendance_days"],
+                notifications_per_user=options["notifications_per_user"],
+            )
+            self.stdout.write(
+                "Seeded " + ", ".join(f"{count} {label}" for label, count in counts.items())
+                + f" in {time.perf_counter() - started:.1f}s"
+            )
+            # Measure the views themselves; catalog cache hits would hide their queries
+            with override_settings(CATALOG_CACHE_ENABLED=False):
+                results = self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self._report(results)
+        baseline_path = Path(options["baseline"])
+        if options["save_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(f"Baseline written to {baseline_path}")
+        elif baseline_path.exists():
+            self._compare(results, json.loads(baseline_path.read_text()), options["tolerance"])
+        else:
+            self.stdout.write(f"No baseline at {baseline_path}; run with --save-baseline to create one.")
+
+    def _endpoints(self):
+        admin = CustomUser.objects.create_user("bench-admin", "x", role="ADMIN")
+        student = CustomUser.objects.filter(role="MEMBER").order_by("id").first()
+        on_loan = BorrowRecord.objects.filter(returned=False).values("book_copy_id")
+        free_copies = list(
+            BookCopy.objects.filter(book__available_copies__gt=0).exclude(id__in=on_loan)
+            .order_by("id").values_list("accession_no", flat=True)
+        )
+        borrowers = list(CustomUser.objects.filter(role="MEMBER").order_by("id").values_list("username", flat=True))
+
+        def scanner_borrow(i):
+            return {"accession_no": free_copies[i], "student_username": borrowers[i % len(borrowers)]}
+
+        return [
+            ("available_books", "get", lambda i: "/api/books/available/", None, student),
+            ("book_search", "get", lambda i: f"/api/books/search/?q={WORDS[i % len(WORDS)]}", None, student),
+            ("my_notifications", "get", lambda i: "/api/my-notifications/", None, student),
+            ("admin_borrow_records", "get", lambda i: "/api/borrow-records/", None, admin),
+            ("scanner_borrow", "post", lambda i: "/api/scanner-borrow/", scanner_borrow, admin),
+        ], len(free_copies)
+
+    def _run(self, options):
+        endpoints, free_copies = self._endpoints()
+        results = {}
+        for name, method, path, data, user in endpoints:
+            if options["only"] and name not in options["only"]:
+                continue
+            total = options["warmup"] + options["requests"]
+            if data is not None and total > free_copies:
+                raise CommandError(f"{name} needs {total} free copies, only {free_copies} seeded.")
+
+            client = APIClient()
+            client.force_authenticate(user)
+            latencies = []
+            queries = []
+            wall = 0.0
+            for i in range(total):
+                metrics = QueryMetrics()
+                with connection.execute_wrapper(metrics):
+                    started = time.perf_counter()
+                    response = getattr(client, method)(path(i), data(i) if data else None, format="json")
+                    elapsed = time.perf_counter() - started
+                if response.status_code >= 400:
+                    raise CommandError(f"{name}: HTTP {response.status_code} {getattr(response, 'data', '')}")
+                if i >= options["warmup"]:
+                    wall += elapsed
+                    latencies.append(elapsed * 1000)
+                    queries.append(metrics.count)
+
+            results[name] = {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / wall, 1),
+                "p50_ms": round(_percentile(latencies, 0.50), 2),
+                "p95_ms": round(_percentile(latencies, 0.95), 2),
+                "p99_ms": round(_percentile(latencies, 0.99), 2),
+                "mean_ms": round(statistics.fmean(latencies), 2),
+                "queries_avg": round(statistics.fmean(queries), 1),
+                "queries_max": max(queries),
+            }
+        return results
+
+    def _report(self, results):
+        self.stdout.write(f"{'endpoint':<22}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}")
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<22}{row['throughput_rps']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}"
+                f"{row['p99_ms']:>9}{row['queries_max']:>9}"
+            )
+
+    def _compare(self, results, baseline, tolerance):
+        failures = []
+        for name, row in results.items():
+            base = baseline.get(name)
+            if not base:
+                continue
+            if row["queries_max"] > base["queries_max"]:
+                failures.append(f"{name}: {row['queries_max']} queries, baseline {base['queries_max']}")
+            limit = base["p95_ms"] * (1 + tolerance)
+            if row["p95_ms"] > limit and row["p95_ms"] - base["p95_ms"] > NOISE_FLOOR_MS:
+                failures.append(f"{name}: p95 {row['p95_ms']}ms, baseline {base['p95_ms']}ms")
+
+        if failures:
+            raise CommandError("Performance regression:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+ENDPOINTS = ("/api/books/available/", "/api/books/search/?q=river", "/api/my-notifications/", "/api/ebooks/")
+PROFILES = ("wsgi", "asgi")
+
+
+def _install_db_latency():
+    """Sleep before every query, standing in for SSL round trips to a remote Postgres."""
+    from django.db.backends.signals import connection_created
+
+    delay = float(os.environ.get("BENCH_DB_LATENCY_MS", "0")) / 1000
+
+    def add_delay(sender, connection, **kwargs):
+        def delayed(execute, sql, params, many, context):
+            time.sleep(delay)
+            return execute(sql, params, many, context)
+        # First in the list: execute_wrapper() context managers pop from the end
+        connection.execute_wrappers.insert(0, delayed)
+
+    if delay:
+        connection_created.connect(add_delay, weak=False)
+
+
+def wsgi_application():
+    from lms_backend.wsgi import application
+    _install_db_latency()
+    return application
+
+
+def asgi_application():
+    # uvicorn factory, imported in every (spawned) worker
+    from lms_backend.asgi import application
+    _install_db_latency()
+    return application
+
+
+def _rss_kb(pid):
+    """Resident memory of a process and all its descendants."""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            status = Path(f"/proc/{current}/status").read_text()
+            total += int(next(line.split()[1] for line in status.splitlines() if line.startswith("VmRSS:")))
+            for task in Path(f"/proc/{current}/task").iterdir():
+                pending += [int(child) for child in (task / "children").read_text().split()]
+        except (FileNotFoundError, ProcessLookupError, StopIteration):
+            continue
+    return total
+
+
+async def _request(port, path, token):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer {token}\r\n"
+        "Connection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def _load(port, token, concurrency, total, timeout):
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                code = await asyncio.wait_for(_request(port, ENDPOINTS[i % len(ENDPOINTS)], token), timeout)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                code = None
+            if code == 200:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the WSGI (gunicorn sync workers) and ASGI (uvicorn, async views) profiles at the same "
+        "worker count, i.e. roughly the same memory, under rising client concurrency. Every query is "
+        "delayed by --db-latency-ms to stand in for a remote database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Worker processes per profile.")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+        parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level.")
+        parser.add_argument("--db-latency-ms", type=float, default=20.0)
+        parser.add_argument("--books", type=int, default=50)
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds.")
+        parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+        parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+        parser.add_argument("--serve", choices=PROFILES, help=argparse.SUPPRESS)
+        parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["prepare"]:
+            return self._prepare(options)
+        if options["serve"]:
+            return self._serve(options)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{tmp}/bench.sqlite3",
+                "DATABASE_SSL_REQUIRE": "False",
+                "DATABASE_REPLICA_URL": "",
+                "DEBUG": "False",
+                "NPLUSONE_GUARD": "off",
+                "SLOW_REQUEST_MS": "600000",
+                # Measure the views and the database, not the response cache
+                "CATALOG_CACHE_ENABLED": "False",
+                "BENCH_DB_LATENCY_MS": str(options["db_latency_ms"]),
+            }
+            env.pop("SERVER_PROFILE", None)
+            env.pop("ASYNC_VIEWS", None)
+            prepared = subprocess.run(
+                self._manage("--prepare", "--books", str(options["books"]), "--users", str(options["users"])),
+                env=env, capture_output=True, text=True,
+            )
+            if prepared.returncode:
+                raise CommandError(f"Seeding failed:\n{prepared.stderr}")
+            token = json.loads(prepared.stdout.strip().splitlines()[-1])["token"]
+
+            rows = []
+            for profile in options["profiles"]:
+                rows += self._bench_profile(profile, token, env, options)
+        self._report(rows, options)
+
+    def _manage(self, *args):
+        return [sys.executable, str(Path(settings.BASE_DIR) / "manage.py"), "benchmark_asgi", *args]
+
+    def _prepare(self, options):
+        from api.authentication import LibraryRefreshToken
+        from api.models import CustomUser
+        from api.synthetic import seed_library
+
+        call_command("migrate", run_syncdb=True, verbosity=0)
+        seed_library(
+            users=options["users"], books=options["books"], copies_per_book=2, years=1,
+            loans_per_user_year=2, attendance_days=0, notifications_per_user=20,
+        )
+        student = CustomUser.objects.filter(role="MEMBER").order_by("id").first()
+        self.stdout.write(json.dumps({"token": str(LibraryRefreshToken.for_user(student).access_token)}))
+
+    def _serve(self, options):
+        if options["serve"] == "asgi":
+            import uvicorn
+
+            os.environ["SERVER_PROFILE"] = "asgi"
+            uvicorn.run(
+                "api.management.commands.benchmark_asgi:asgi_application", factory=True,
+                host="127.0.0.1", port=options["port"], workers=options["workers"],
+                lifespan="off", log_level="warning", backlog=4096,
+            )
+        else:
+            from gunicorn.app.base import BaseApplication
+
+            class Server(BaseApplication):
+                def load_config(self):
+                    self.cfg.set("bind", f"127.0.0.1:{options['port']}")
+                    self.cfg.set("workers", options["workers"])
+                    self.cfg.set("backlog", 4096)
+                    self.cfg.set("timeout", 120)
+                    self.cfg.set("loglevel", "warning")
+
+                def load(self):
+                    return wsgi_application()
+
+            Server().run()
+
+    def _bench_profile(self, profile, token, env, options):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        server = subprocess.Popen(
+            self._manage("--serve", profile, "--port", str(port), "--workers", str(options["workers"])), env=env,
+        )
+        try:
+            self._wait_until_up(server, port, token)
+            rows = []
+            for concurrency in options["concurrency"]:
+                latencies, errors, wall = asyncio.run(
+                    _load(port, token, concurrency, options["requests"], options["timeout"])
+                )
+                latencies.sort()
+                rows.append({
+                    "profile": profile,
+                    "concurrency": concurrency,
+                    "rps": len(latencies) / wall,
+                    "p50": latencies[len(latencies) // 2] if latencies else 0,
+                    "p95": latencies[int(len(latencies) * 0.95)] if latencies else 0,
+                    "errors": errors,
+                    "rss_mb": _rss_kb(server.pid) / 1024,
+                })
+            return rows
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    def _wait_until_up(self, server, port, token, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"Server exited with {server.returncode}")
+            try:
+                asyncio.run(_request(port, ENDPOINTS[0], token))
+                # Warm every worker's imports and connection
+                asyncio.run(_load(port, token, 4, 4 * len(ENDPOINTS), 60))
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Server on port {port} did not start")
+
+    def _report(self, rows, options):
+        self.stdout.write(
+            f"{options['workers']} workers per profile, {options['db_latency_ms']:g}ms per query, "
+            f"{options['requests']} requests per level"
+        )
+        self.stdout.write(f"{'profile':<9}{'clients':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}{'RSS MB':>9}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['profile']:<9}{row['concurrency']:>8}{row['rps']:>9.1f}{row['p50']:>9.0f}"
+                f"{row['p95']:>9.0f}{row['errors']:>8}{row['rss_mb']:>9.0f}"
+            )
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment
+
+from api.authentication import LibraryRefreshToken
+from api.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests/second of an authenticated endpoint with stateless JWT auth "
+        "on and off. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--path", default="/api/reading-streak/")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            student = CustomUser.objects.create_user("bench-student", "bench-password")
+            token = str(LibraryRefreshToken.for_user(student).access_token)
+            client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+            for label, stateless in (("db user lookup", False), ("stateless", True)):
+                with override_settings(JWT_STATELESS_AUTH=stateless):
+                    self._run(label, client, options["path"], options["requests"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _run(self, label, client, path, total):
+        client.get(path)  # warm up
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(total):
+                response = client.get(path)
+            elapsed = time.perf_counter() - started
+
+        if response.status_code != 200:
+            self.stderr.write(f"{label}: unexpected status {response.status_code}")
+        self.stdout.write(
+            f"{label:>15}: {total / elapsed:8.1f} req/s, "
+            f"{len(queries) / total:.2f} queries/request"
+        )
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from api.models import CustomUser
+from api.onboarding import bulk_register_students
+
+
+class Command(BaseCommand):
+    help = "Time bulk student registration (single process vs process pool) on a throwaway test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--workers", type=int, help="Pool size for the parallel run (default: CPU count).")
+        parser.add_argument(
+            "--iterations", type=int,
+            help="Override PBKDF2_ITERATIONS for the run (the production cost makes 10k users take a long time).",
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            overrides = {"PBKDF2_ITERATIONS": options["iterations"]} if options["iterations"] else {}
+            with override_settings(**overrides):
+                for label, workers in (("1 process", 1), ("process pool", options["workers"])):
+                    CustomUser.objects.all().delete()
+                    rows = [
+                        {"username": f"BENCH{i:06d}", "password": f"pw-{i}"}
+                        for i in range(options["users"])
+                    ]
+                    started = time.perf_counter()
+                    result = bulk_register_students(rows, workers=workers)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{label:>12}: {result['summary'].get('created', 0)} users in {elapsed:.2f}s "
+                        f"({options['users'] / elapsed:.0f} users/s)"
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
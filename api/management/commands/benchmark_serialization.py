@@ -0,0 +1,107 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from api.metrics import QueryMetrics
+from api.models import CustomUser, Notification
+from api.synthetic import seed_library
+
+MODES = (("drf", False), ("fast", True))
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic library on a throwaway test database and time the large read-only lists with "
+        "DRF serializers and with the fast path (FAST_LIST_SERIALIZATION), checking that both return "
+        "byte-identical responses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=300)
+        parser.add_argument("--books", type=int, default=2000)
+        parser.add_argument("--copies-per-book", type=int, default=3)
+        parser.add_argument("--loans-per-user-year", type=int, default=12)
+        parser.add_argument(
+            "--student-notifications", type=int, default=2000, help="Notifications of the student whose list is read."
+        )
+        parser.add_argument("--requests", type=int, default=10, help="Measured requests per endpoint and mode.")
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--only", nargs="*", help="Endpoint names to run.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            seed_library(
+                users=options["users"], books=options["books"], copies_per_book=options["copies_per_book"], years=1,
+                loans_per_user_year=options["loans_per_user_year"], attendance_days=0, notifications_per_user=0,
+            )
+            admin = CustomUser.objects.create_user("bench-admin", "x", role="ADMIN")
+            student = CustomUser.objects.filter(role="MEMBER").order_by("id").first()
+            Notification.objects.bulk_create(
+                [Notification(student=student, message=f"Notification {i}: “{i % 7}” due ✓", read=i % 3 == 0)
+                 for i in range(options["student_notifications"])],
+                batch_size=1000,
+            )
+            endpoints = [
+                ("available_books", "/api/books/available/", student),
+                ("book_search", "/api/books/search/?q=a", student),
+                ("admin_book_list", "/api/admin/books/", admin),
+                ("admin_borrow_records", "/api/borrow-records/", admin),
+                ("my_notifications", "/api/my-notifications/", student),
+            ]
+            # Time the views, not the catalog response cache; DRF mode is slow on purpose
+            with override_settings(CATALOG_CACHE_ENABLED=False, SLOW_REQUEST_MS=600000):
+                results = [
+                    self._run(name, path, user, options)
+                    for name, path, user in endpoints
+                    if not options["only"] or name in options["only"]
+                ]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        self._report(results)
+
+    def _run(self, name, path, user, options):
+        client = APIClient()
+        client.force_authenticate(user)
+        row = {"endpoint": name}
+        bodies = {}
+        for mode, fast in MODES:
+            latencies = []
+            with override_settings(FAST_LIST_SERIALIZATION=fast):
+                for i in range(options["warmup"] + options["requests"]):
+                    metrics = QueryMetrics()
+                    with connection.execute_wrapper(metrics):
+                        started = time.perf_counter()
+                        response = client.get(path)
+                        elapsed = time.perf_counter() - started
+                    if response.status_code != 200:
+                        raise CommandError(f"{name} ({mode}): HTTP {response.status_code}")
+                    if i >= options["warmup"]:
+                        latencies.append(elapsed * 1000)
+            bodies[mode] = response.content
+            row[f"{mode}_ms"] = statistics.median(latencies)
+            row[f"{mode}_queries"] = metrics.count
+        if bodies["fast"] != bodies["drf"]:
+            raise CommandError(f"{name}: the fast path response differs from the serializer's")
+        row["rows"] = len(json.loads(bodies["drf"]))
+        row["bytes"] = len(bodies["drf"])
+        return row
+
+    def _report(self, results):
+        self.stdout.write(
+            f"{'endpoint':<22}{'rows':>8}{'KB':>8}{'drf ms':>9}{'fast ms':>9}{'speedup':>9}{'queries':>9}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['endpoint']:<22}{row['rows']:>8}{row['bytes'] / 1024:>8.0f}{row['drf_ms']:>9.1f}"
+                f"{row['fast_ms']:>9.1f}{row['drf_ms'] / row['fast_ms']:>8.1f}x"
+                f"{row['drf_queries']:>4}/{row['fast_queries']}"
+            )
+        self.stdout.write(self.style.SUCCESS("Responses byte-identical in both modes."))
@@ -0,0 +1,60 @@
+import tempfile
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.models import Book, BookCopy, BorrowRecord, CustomUser, Notification, ShardCheckpoint
+from api.sharding import run_sharded
+from api.tasks import apply_fines
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the sharded fine job (1 worker vs a process pool) on a throwaway test database. "
+        "Speedup needs several cores and a server database; SQLite serialises writers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--records", type=int, default=50_000)
+        parser.add_argument("--workers", type=int, default=4)
+
+    def _seed(self, records):
+        student = CustomUser.objects.create_user("bench-student", "x")
+        book = Book.objects.create(title="Benchmark", author="-", isbn="0", category="-")
+        copies = BookCopy.objects.bulk_create(
+            [BookCopy(book=book, accession_no=f"BENCH-{i}") for i in range(records)], batch_size=1000
+        )
+        BorrowRecord.objects.bulk_create(
+            [
+                BorrowRecord(student=student, book_copy=copy, return_date=date.today() - timedelta(days=1 + i % 30))
+                for i, copy in enumerate(copies)
+            ],
+            batch_size=1000,
+        )
+
+    def handle(self, *args, **options):
+        test_settings = connection.settings_dict["TEST"]
+        if connection.vendor == "sqlite" and not test_settings.get("NAME"):
+            # Worker processes cannot see an in-memory database
+            test_settings["NAME"] = tempfile.mktemp(suffix=".sqlite3")
+            # Let concurrent writers wait for the lock instead of failing
+            connection.settings_dict["OPTIONS"].update(timeout=60, transaction_mode="IMMEDIATE")
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self._seed(options["records"])
+            for label, workers in (("1 worker", 1), (f"{options['workers']} workers", options["workers"])):
+                BorrowRecord.objects.update(fine=0)
+                Notification.objects.all().delete()
+                ShardCheckpoint.objects.all().delete()
+
+                started = time.perf_counter()
+                touched = run_sharded("benchmark_fines", BorrowRecord.objects.filter(returned=False), apply_fines, workers=workers)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label:>10}: {touched} fines in {elapsed:.2f}s ({options['records'] / elapsed:.0f} rows/s)"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
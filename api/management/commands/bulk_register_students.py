@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.onboarding import bulk_register_students, parse_student_rows
+
+
+class Command(BaseCommand):
+    help = "Register students from a CSV (username/roll_no, password) or JSON roll-number list."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--default-password", help="Password for rows that do not have one.")
+        parser.add_argument("--workers", type=int, help="Hashing processes (default: CPU count).")
+        parser.add_argument("--report", help="Write the per-row report to this JSON file.")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+
+        fmt = "json" if path.suffix.lower() == ".json" else "csv"
+        rows = parse_student_rows(path.read_text(encoding="utf-8-sig"), fmt)
+        result = bulk_register_students(
+            rows,
+            default_password=options["default_password"],
+            workers=options["workers"],
+        )
+
+        if options["report"]:
+            Path(options["report"]).write_text(json.dumps(result, indent=2))
+        else:
+            for entry in result["rows"]:
+                if entry["status"] != "created":
+                    self.stdout.write(f"row {entry['row']} {entry['username']!r}: {entry['status']} - {entry['error']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            ", ".join(f"{count} {status}" for status, count in result["summary"].items()) or "Nothing to do"
+        ))
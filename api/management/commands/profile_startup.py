@@ -0,0 +1,121 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Boots the WSGI application in a fresh interpreter and serves one request
+# without the test client, whose imports would skew the numbers
+BOOT_SCRIPT = """
+import io, json, sys, time
+started = time.perf_counter()
+from lms_backend.wsgi import application
+loaded = time.perf_counter()
+statuses = []
+environ = {
+    "REQUEST_METHOD": "GET", "PATH_INFO": sys.argv[1], "QUERY_STRING": "", "SERVER_NAME": "localhost",
+    "SERVER_PORT": "80", "HTTP_HOST": "localhost", "SERVER_PROTOCOL": "HTTP/1.1", "REMOTE_ADDR": "127.0.0.1",
+    "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr, "wsgi.url_scheme": "http",
+    "wsgi.version": (1, 0), "wsgi.multithread": False, "wsgi.multiprocess": True, "wsgi.run_once": False,
+}
+b"".join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+served = time.perf_counter()
+print(json.dumps({"load_ms": (loaded - started) * 1000, "first_request_ms": (served - loaded) * 1000,
+                  "status": statuses[0]}))
+"""
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start: time to load the WSGI application and to serve a first request in a fresh "
+        "interpreter, plus import time per module (python -X importtime)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Boots to take the median of.")
+        parser.add_argument("--path", default="/api/library/occupancy/", help="First request (no DB needed by default).")
+        parser.add_argument("--top", type=int, default=15, help="Modules / packages to list.")
+        parser.add_argument(
+            "--env", action="append", default=[], metavar="KEY=VALUE",
+            help="Extra environment for the booted process, e.g. --env ADMIN_ENABLED=False.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the result as JSON.")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        for pair in options["env"]:
+            key, sep, value = pair.partition("=")
+            if not sep:
+                raise CommandError(f"--env expects KEY=VALUE, got {pair!r}")
+            env[key] = value
+
+        boots = []
+        imports = None
+        for run in range(options["runs"]):
+            # Only the first boot records import times (-X importtime itself adds overhead)
+            flags = ["-X", "importtime"] if run == 0 else []
+            proc = subprocess.run(
+                [sys.executable, *flags, "-c", BOOT_SCRIPT, options["path"]],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if proc.returncode:
+                raise CommandError(f"Boot failed:\n{proc.stderr[-3000:]}")
+            boots.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+            if run == 0:
+                imports = self._parse_imports(proc.stderr)
+
+        result = {
+            "runs": len(boots),
+            "path": options["path"],
+            "status": boots[-1]["status"],
+            "load_ms": round(statistics.median(b["load_ms"] for b in boots), 1),
+            "first_request_ms": round(statistics.median(b["first_request_ms"] for b in boots), 1),
+            "modules": imports["modules"][: options["top"]],
+            "packages": imports["packages"][: options["top"]],
+        }
+        result["time_to_first_request_ms"] = round(result["load_ms"] + result["first_request_ms"], 1)
+        if options["json"]:
+            self.stdout.write(json.dumps(result, indent=2))
+        else:
+            self._report(result)
+
+    def _parse_imports(self, stderr):
+        """Project modules by cumulative time and third-party packages by self time."""
+        modules = []
+        packages = Counter()
+        project = {path.name for path in Path(settings.BASE_DIR).iterdir() if path.is_dir()}
+        for line in stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if not match:
+                continue
+            self_us, cumulative_us, _, name = match.groups()
+            top = name.split(".")[0]
+            packages[top] += int(self_us)
+            if top in project:
+                modules.append((name, int(cumulative_us) / 1000, int(self_us) / 1000))
+        modules.sort(key=lambda row: row[1], reverse=True)
+        return {
+            "modules": [{"module": name, "cumulative_ms": round(cum, 1), "self_ms": round(own, 1)}
+                        for name, cum, own in modules],
+            "packages": [{"package": name, "self_ms": round(us / 1000, 1)} for name, us in packages.most_common()],
+        }
+
+    def _report(self, result):
+        self.stdout.write(
+            f"Median of {result['runs']} boots: load {result['load_ms']}ms + first request "
+            f"({result['path']} -> {result['status']}) {result['first_request_ms']}ms "
+            f"= {result['time_to_first_request_ms']}ms"
+        )
+        self.stdout.write("\nProject modules by cumulative import time (ms):")
+        for row in result["modules"]:
+            self.stdout.write(f"  {row['cumulative_ms']:>8}  {row['self_ms']:>7}  {row['module']}")
+        self.stdout.write("\nPackages by own import time (ms):")
+        for row in result["packages"]:
+            self.stdout.write(f"  {row['self_ms']:>8}  {row['package']}")
@@ -0,0 +1,30 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import tasks  # noqa: F401  (registers the periodic jobs)
+from api.scheduler import ensure_job_states, registry, run_due_jobs
+
+
+class Command(BaseCommand):
+    help = "Run the periodic job scheduler (fines, reminders, notifications, maintenance)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run due jobs inline once and exit.")
+
+    def handle(self, *args, **options):
+        ensure_job_states()
+        self.stdout.write(f"Scheduler started with {len(registry)} job(s): {', '.join(registry)}")
+
+        if options["once"]:
+            started = run_due_jobs()
+            self.stdout.write(f"Ran: {', '.join(started) or 'nothing due'}")
+            return
+
+        with ThreadPoolExecutor(max_workers=settings.SCHEDULER_WORKERS, thread_name_prefix="scheduler") as executor:
+            while True:
+                for name in run_due_jobs(executor):
+                    self.stdout.write(f"Started {name}")
+                time.sleep(settings.SCHEDULER_TICK_SECONDS)
@@ -0,0 +1,276 @@
+"""
+Per-route request metrics.
+
+RequestMetricsMiddleware times every request and records, per
+(method, URL route): latency, DB query count and time, and time spent in DRF
+serializers. Each route keeps fixed-bucket histograms: a cumulative one for
+Prometheus, plus two rotating windows of METRICS_WINDOW_SECONDS from which
+recent p50/p95/p99 are estimated. Memory is constant per route.
+
+Requests slower than SLOW_REQUEST_MS are logged with their most repeated
+query fingerprints (SQL with literals replaced), which points at N+1 loops.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# Upper bounds in seconds; the last bucket is +Inf
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+_FINGERPRINT_RULES = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\bIN \((?:\s*(?:\?|%s)\s*,?)+\)", re.IGNORECASE), "IN (...)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def fingerprint(sql):
+    """SQL with literals and IN lists collapsed, so repeated queries group together."""
+    for pattern, replacement in _FINGERPRINT_RULES:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+@contextmanager
+def execute_wrapper_all(wrapper):
+    """Install an execute_wrapper on every database alias (primary and replica)."""
+    with ExitStack() as stack:
+        for alias in settings.DATABASES:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        yield wrapper
+
+
+class QueryMetrics:
+    """execute_wrapper counting queries and DB time on this thread's connections."""
+
+    def __init__(self, fingerprints=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter() if fingerprints else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+            if self.fingerprints is not None:
+                self.fingerprints[sql] += 1
+
+    def top_queries(self, limit=5):
+        grouped = Counter()
+        for sql, count in (self.fingerprints or {}).items():
+            grouped[fingerprint(sql)] += count
+        return grouped.most_common(limit)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def merged(self, other):
+        result = Histogram()
+        result.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        result.total = self.total + other.total
+        result.count = self.count + other.count
+        return result
+
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return BUCKETS[-1]
+
+
+class WindowedHistogram:
+    """Cumulative histogram plus the current and previous time window."""
+
+    __slots__ = ("cumulative", "current", "previous", "window_started")
+
+    def __init__(self, now):
+        self.cumulative = Histogram()
+        self.current = Histogram()
+        self.previous = Histogram()
+        self.window_started = now
+
+    def observe(self, value, now):
+        window = settings.METRICS_WINDOW_SECONDS
+        if now - self.window_started >= window:
+            # Skip straight to an empty window if more than one has passed
+            self.previous = self.current if now - self.window_started < 2 * window else Histogram()
+            self.current = Histogram()
+            self.window_started = now
+        self.cumulative.observe(value)
+        self.current.observe(value)
+
+    def recent(self):
+        return self.current.merged(self.previous)
+
+
+class RouteStats:
+    __slots__ = ("latency", "db_time", "serializer_time", "queries", "max_queries")
+
+    def __init__(self, now):
+        self.latency = WindowedHistogram(now)
+        self.db_time = WindowedHistogram(now)
+        self.serializer_time = WindowedHistogram(now)
+        self.queries = 0
+        self.max_queries = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes = {}
+
+    def record(self, method, route, latency, queries, db_seconds, serializer_seconds):
+        now = time.monotonic()
+        with self._lock:
+            stats = self.routes.get((method, route))
+            if stats is None:
+                stats = self.routes[(method, route)] = RouteStats(now)
+            stats.latency.observe(latency, now)
+            stats.db_time.observe(db_seconds, now)
+            stats.serializer_time.observe(serializer_seconds, now)
+            stats.queries += queries
+            stats.max_queries = max(stats.max_queries, queries)
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+
+    def render_prometheus(self):
+        """All routes in the Prometheus text exposition format."""
+        with self._lock:
+            routes = sorted(self.routes.items())
+            lines = []
+            for name, help_text, attr in (
+                ("lms_http_request_duration_seconds", "Request latency.", "latency"),
+                ("lms_db_query_duration_seconds", "DB time per request.", "db_time"),
+                ("lms_serializer_duration_seconds", "DRF serializer time per request.", "serializer_time"),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (method, route), stats in routes:
+                    labels = f'method="{method}",route="{_escape(route)}"'
+                    histogram = getattr(stats, attr).cumulative
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+            name = "lms_http_request_duration_recent_seconds"
+            lines += [
+                f"# HELP {name} Estimated latency quantiles over the last {settings.METRICS_WINDOW_SECONDS}-"
+                f"{2 * settings.METRICS_WINDOW_SECONDS}s.",
+                f"# TYPE {name} gauge",
+            ]
+            for (method, route), stats in routes:
+                recent = stats.latency.recent()
+                for q in QUANTILES:
+                    value = recent.quantile(q)
+                    if value is not None:
+                        lines.append(f'{name}{{method="{method}",route="{_escape(route)}",quantile="{q}"}} {value:.6f}')
+
+            for name, help_text, kind, attr in (
+                ("lms_db_queries_total", "DB queries issued.", "counter", "queries"),
+                ("lms_db_queries_max", "Most DB queries issued by one request.", "gauge", "max_queries"),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for (method, route), stats in routes:
+                    lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {getattr(stats, attr)}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+registry = MetricsRegistry()
+
+# Serializer time of the request being handled, and the nesting depth of
+# to_representation calls so only the outermost one is timed
+_serializer_time = ContextVar("serializer_time", default=None)
+_serializer_depth = ContextVar("serializer_depth", default=0)
+
+
+def _timed(to_representation):
+    def wrapper(self, *args, **kwargs):
+        depth = _serializer_depth.get()
+        if depth or _serializer_time.get() is None:
+            token = _serializer_depth.set(depth + 1)
+            try:
+                return to_representation(self, *args, **kwargs)
+            finally:
+                _serializer_depth.reset(token)
+
+        token = _serializer_depth.set(1)
+        started = time.perf_counter()
+        try:
+            return to_representation(self, *args, **kwargs)
+        finally:
+            _serializer_depth.reset(token)
+            _serializer_time.get()[0] += time.perf_counter() - started
+
+    wrapper.__wrapped__ = to_representation
+    return wrapper
+
+
+def install_serializer_timing():
+    """Time Serializer/ListSerializer.to_representation (idempotent)."""
+    from rest_framework.serializers import ListSerializer, Serializer
+
+    for cls in (Serializer, ListSerializer):
+        if not hasattr(cls.to_representation, "__wrapped__"):
+            cls.to_representation = _timed(cls.to_representation)
+
+
+@contextmanager
+def serializer_timing():
+    """Count the block as serializer time (code building representations without DRF serializers)."""
+    cell = _serializer_time.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if cell is not None:
+            cell[0] += time.perf_counter() - started
+
+
+def start_serializer_timer():
+    cell = [0.0]
+    return cell, _serializer_time.set(cell)
+
+
+def stop_serializer_timer(token):
+    _serializer_time.reset(token)
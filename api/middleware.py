@@ -0,0 +1,114 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from .metrics import QueryMetrics, execute_wrapper_all, registry, start_serializer_timer, stop_serializer_timer
+from .nplusone import QueryRepeatCounter, report
+
+logger = logging.getLogger("api.metrics")
+
+
+class HybridMiddleware:
+    """
+    Base for middleware that runs natively under both WSGI and ASGI, so the
+    ASGI profile does not push every request through a thread.
+    Subclasses check self.async_mode in __call__ and implement __acall__.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+async def _aexecute_wrapper_all(stack, wrapper):
+    # Connections are per thread: install the wrapper in the thread that runs
+    # this request's ORM calls (one per request under ASGI)
+    await sync_to_async(stack.enter_context)(execute_wrapper_all(wrapper))
+
+
+class RequestMetricsMiddleware(HybridMiddleware):
+    """Record latency, DB queries and serializer time per route (see api/metrics.py)."""
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        queries = QueryMetrics(fingerprints=True)
+        serializer_time, token = start_serializer_timer()
+        started = time.perf_counter()
+        try:
+            with execute_wrapper_all(queries):
+                response = self.get_response(request)
+        finally:
+            stop_serializer_timer(token)
+        self._record(request, time.perf_counter() - started, queries, serializer_time[0])
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return await self.get_response(request)
+
+        queries = QueryMetrics(fingerprints=True)
+        serializer_time, token = start_serializer_timer()
+        started = time.perf_counter()
+        stack = ExitStack()
+        try:
+            await _aexecute_wrapper_all(stack, queries)
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            stop_serializer_timer(token)
+        self._record(request, time.perf_counter() - started, queries, serializer_time[0])
+        return response
+
+    def _record(self, request, elapsed, queries, serializer_seconds):
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match else "<unmatched>"
+        registry.record(request.method, route, elapsed, queries.count, queries.seconds, serializer_seconds)
+
+        if elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow request %s %s (route %s): %.0fms, %d queries in %.0fms, serializers %.0fms. Top queries:\n%s",
+                request.method, request.path, route, elapsed * 1000, queries.count,
+                queries.seconds * 1000, serializer_seconds * 1000,
+                "\n".join(f"  {count}x {sql}" for sql, count in queries.top_queries()),
+            )
+
+
+class NPlusOneGuardMiddleware(HybridMiddleware):
+    """Report statements repeated within one request (see api/nplusone.py)."""
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if settings.NPLUSONE_GUARD not in ("log", "raise"):
+            return self.get_response(request)
+
+        counter = QueryRepeatCounter()
+        with execute_wrapper_all(counter):
+            response = self.get_response(request)
+        report(counter, f"{request.method} {request.path}")
+        return response
+
+    async def __acall__(self, request):
+        if settings.NPLUSONE_GUARD not in ("log", "raise"):
+            return await self.get_response(request)
+
+        counter = QueryRepeatCounter()
+        stack = ExitStack()
+        try:
+            await _aexecute_wrapper_all(stack, counter)
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        report(counter, f"{request.method} {request.path}")
+        return response
@@ -44,6 +44,12 @@ class CustomUser(AbstractUser):
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = []
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Admin user directory filters
+            models.Index(fields=["role", "is_active"], name="user_role_active_idx"),
+        ]
+
     def _str_(self):
         return f"{self.username} ({self.role})"
 
@@ -57,6 +63,7 @@ class Book(models.Model):
     image = CloudinaryField('book image', blank=True, null=True)
     total_copies = models.PositiveIntegerField(default=1)       # default 1
     available_copies = models.PositiveIntegerField(default=1)   # default 1
+    is_archived = models.BooleanField(default=False, db_index=True)  # withdrawn, history kept
 
     def _str_(self):
         return f"{self.title} by {self.author}"
@@ -84,6 +91,12 @@ class BookRequest(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
     admin_comment = models.TextField(blank=True, null=True)  # Optional note by admin
 
+    class Meta:
+        indexes = [
+            # Admin pending queue, oldest first
+            models.Index(fields=["status", "request_date"], name="book_req_status_date_idx"),
+        ]
+
     def _str_(self):
         return f"{self.student.username} requested {self.book_copy.accession_no} ({self.status})"
 
@@ -111,6 +124,12 @@ class BorrowRecord(models.Model):
     FINE_PER_DAY = 5  # You can change the amount
     due_soon_notified = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Per-student open loans / outstanding fines
+            models.Index(fields=["student", "returned"], name="borrow_student_returned_idx"),
+        ]
+
     def calculate_fine(self):
         """Calculate and update fine based on overdue days."""
         if self.returned:
@@ -130,6 +149,30 @@ class BorrowRecord(models.Model):
 
 
 
+class ArchivedBorrowRecord(models.Model):
+    """
+    Returned loan moved out of BorrowRecord by api.archive. Book title and
+    accession number are copied so history survives later catalog changes.
+    """
+    original_id = models.BigIntegerField(unique=True)  # BorrowRecord.id it came from
+    student = models.ForeignKey(CustomUser, on_delete=models.CASCADE, limit_choices_to={'role': 'MEMBER'})
+    book_copy = models.ForeignKey(BookCopy, on_delete=models.SET_NULL, null=True, blank=True)
+    book_title = models.CharField(max_length=200)
+    accession_no = models.CharField(max_length=30)
+    borrow_date = models.DateField()
+    return_date = models.DateField()
+    fine = models.DecimalField(max_digits=6, decimal_places=2, default=0.00)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["student", "borrow_date"], name="archived_borrow_student_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} borrowed {self.accession_no} (archived)"
+
+
 class BookNotificationRequest(models.Model):
     student = models.ForeignKey(CustomUser, on_delete=models.CASCADE, limit_choices_to={'role': 'MEMBER'})
     book = models.ForeignKey("Book", on_delete=models.CASCADE)
@@ -208,6 +251,11 @@ class EBookBookmark(models.Model):
 
     class Meta:
         unique_together = ("student", "ebook", "page_number")
+        indexes = [
+            # Covers the per-student bookmark listing and the grouped
+            # "my library" aggregation (filter student, group ebook, max created_at)
+            models.Index(fields=["student", "ebook", "created_at"], name="bookmark_student_ebook_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student.username} bookmark @ {self.page_number}"
@@ -237,6 +285,12 @@ class LibraryEntryRequest(models.Model):
 
     admin_comment = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Pending approval queue (status=PENDING ordered by request_date)
+            models.Index(fields=["status", "request_date"], name="entry_req_status_date_idx"),
+        ]
+
     def __str__(self):
         return f"{self.student.username} - {self.status}"
     
@@ -251,6 +305,7 @@ class LibraryAttendance(models.Model):
 
     date = models.DateField(auto_now_add=True)
     check_in_time = models.DateTimeField(null=True, blank=True)
+    check_out_time = models.DateTimeField(null=True, blank=True)
 
     status = models.CharField(
         max_length=10,
@@ -265,4 +320,200 @@ class LibraryAttendance(models.Model):
         unique_together = ('student', 'date')
 
     def __str__(self):
-        return f"{self.student.username} - {self.date} ({self.status})"
\ No newline at end of file
+        return f"{self.student.username} - {self.date} ({self.status})"
+
+
+class LibraryAttendanceHourlyRollup(models.Model):
+    """Headcount of students checked in per hour of a day, refreshed from LibraryAttendance."""
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()  # 0-23
+    headcount = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("date", "hour")
+
+    def __str__(self):
+        return f"{self.date} {self.hour:02d}:00 - {self.headcount}"
+
+
+
+class RevokedToken(models.Model):
+    """JWT revoked before its expiry (logout). Loaded into memory by api.revocation."""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.jti} (revoked {self.revoked_at})"
+
+
+class UsedKioskToken(models.Model):
+    """Nonce of a kiosk QR token that was used, kept until the token would have expired anyway."""
+    nonce = models.CharField(max_length=32, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.nonce
+
+
+
+class DeletionJob(models.Model):
+    """Background bulk delete/archive of books or users, with progress."""
+    KIND_BOOK = "BOOK"
+    KIND_USER = "USER"
+    MODE_DELETE = "DELETE"
+    MODE_ARCHIVE = "ARCHIVE"
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_DONE = "DONE"
+    STATUS_FAILED = "FAILED"
+
+    kind = models.CharField(max_length=10, choices=((KIND_BOOK, "Book"), (KIND_USER, "User")))
+    mode = models.CharField(max_length=10, choices=((MODE_DELETE, "Delete"), (MODE_ARCHIVE, "Archive")))
+    target_ids = models.JSONField()
+    status = models.CharField(
+        max_length=10,
+        choices=(
+            (STATUS_PENDING, "Pending"),
+            (STATUS_RUNNING, "Running"),
+            (STATUS_DONE, "Done"),
+            (STATUS_FAILED, "Failed"),
+        ),
+        default=STATUS_PENDING,
+    )
+    progress = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, null=True)
+    requested_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.mode} {len(self.target_ids)} {self.kind.lower()}(s) - {self.status}"
+
+
+
+class PeriodicJobState(models.Model):
+    """Schedule and concurrency bookkeeping for one api.scheduler job."""
+    name = models.CharField(max_length=100, unique=True)
+    next_run_at = models.DateTimeField()
+    running = models.PositiveIntegerField(default=0)  # runs in progress
+    lease_expires_at = models.DateTimeField(null=True, blank=True)  # running runs presumed dead after this
+    generation = models.PositiveIntegerField(default=0)  # bumped when stale runs are written off
+
+    def __str__(self):
+        return f"{self.name} (next {self.next_run_at}, running {self.running})"
+
+
+class JobRun(models.Model):
+    """Metrics of one execution of a scheduled job."""
+    STATUS_CHOICES = (
+        ('SUCCESS', 'Success'),
+        ('FAILED', 'Failed'),
+    )
+
+    job_name = models.CharField(max_length=100)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration_ms = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    rows_touched = models.PositiveIntegerField(default=0)
+    query_count = models.PositiveIntegerField(default=0)
+    query_time_ms = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["job_name", "-started_at"], name="jobrun_name_started_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.job_name} @ {self.started_at} ({self.status}, {self.duration_ms} ms)"
+
+
+
+class ShardCheckpoint(models.Model):
+    """Progress of one primary-key shard of a sharded job run (api.sharding)."""
+    run_key = models.CharField(max_length=150)  # "<job name>:<start timestamp>"
+    shard = models.PositiveIntegerField()
+    lo = models.BigIntegerField()  # first pk of the shard (inclusive)
+    hi = models.BigIntegerField()  # last pk of the shard (inclusive)
+    last_pk = models.BigIntegerField()  # last pk processed; resume after it
+    rows_touched = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)  # invocations that started this shard
+    done = models.BooleanField(default=False)
+    failed = models.BooleanField(default=False)  # given up after SHARD_MAX_ATTEMPTS (done is set too)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("run_key", "shard")
+
+    def __str__(self):
+        return f"{self.run_key} shard {self.shard} [{self.lo}, {self.hi}] at {self.last_pk}"
+
+
+class LoanReminder(models.Model):
+    """A scheduled due-date reminder for a loan; one row per reminder stage (api.reminders)."""
+    borrow_record = models.ForeignKey(BorrowRecord, on_delete=models.CASCADE, related_name="reminders")
+    stage = models.CharField(max_length=30)  # key of settings.DUE_REMINDER_STAGES
+    due_at = models.DateTimeField()
+    sent_at = models.DateTimeField(null=True, blank=True)  # also set when superseded by a later stage
+
+    class Meta:
+        unique_together = ("borrow_record", "stage")
+        indexes = [
+            # The queue: unsent reminders in due order
+            models.Index(fields=["sent_at", "due_at"], name="loan_reminder_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.stage} reminder for loan {self.borrow_record_id} at {self.due_at}"
+
+
+class BookReservation(models.Model):
+    """
+    A student's place in the FIFO waitlist of a Book. When a copy comes back
+    it is held for the first WAITING reservation until hold_expires_at
+    (api.reservations).
+    """
+    STATUS_WAITING = "WAITING"
+    STATUS_HELD = "HELD"
+    STATUS_FULFILLED = "FULFILLED"
+    STATUS_EXPIRED = "EXPIRED"
+    STATUS_CANCELLED = "CANCELLED"
+    STATUS_CHOICES = (
+        (STATUS_WAITING, "Waiting"),
+        (STATUS_HELD, "On hold"),
+        (STATUS_FULFILLED, "Fulfilled"),
+        (STATUS_EXPIRED, "Expired"),
+        (STATUS_CANCELLED, "Cancelled"),
+    )
+    ACTIVE_STATUSES = (STATUS_WAITING, STATUS_HELD)
+
+    student = models.ForeignKey(CustomUser, on_delete=models.CASCADE, limit_choices_to={'role': 'MEMBER'})
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="reservations")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_WAITING)
+    book_copy = models.ForeignKey(BookCopy, on_delete=models.SET_NULL, null=True, blank=True)  # held copy
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # One place in the queue per student and book
+            models.UniqueConstraint(
+                fields=["student", "book"],
+                condition=models.Q(status__in=["WAITING", "HELD"]),
+                name="one_active_reservation_per_book",
+            ),
+        ]
+        indexes = [
+            # Queue head per book
+            models.Index(fields=["book", "status", "created_at"], name="reservation_queue_idx"),
+            # Expiry sweep
+            models.Index(fields=["status", "hold_expires_at"], name="reservation_hold_expiry_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} reserved book {self.book_id} ({self.status})"
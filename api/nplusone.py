@@ -0,0 +1,100 @@
+"""
+N+1 query guard.
+
+NPlusOneGuardMiddleware counts identical SQL statements (same text, any
+parameters) issued during a request. When one repeats NPLUSONE_THRESHOLD
+times or more, it is reported together with the serializer field that was
+being read when the queries ran, e.g. "BookRequestSerializer.book_title".
+
+NPLUSONE_GUARD selects the reaction: "raise" (default under `manage.py
+test`), "log" (default with DEBUG) or "off". Tests can also wrap code in
+assert_no_n_plus_one().
+"""
+import logging
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .metrics import execute_wrapper_all, fingerprint
+
+logger = logging.getLogger("api.nplusone")
+
+_current_field = ContextVar("serializer_field", default=None)
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+def _tracked(readable_fields):
+    def wrapper(self):
+        # The serializer reads and renders each field while it is yielded
+        for field in readable_fields(self):
+            token = _current_field.set(f"{type(self).__name__}.{field.field_name}")
+            try:
+                yield field
+            finally:
+                _current_field.reset(token)
+
+    wrapper.__wrapped__ = readable_fields
+    return wrapper
+
+
+def install_field_tracking():
+    """Record which serializer field is being rendered while queries run (idempotent)."""
+    from rest_framework.serializers import Serializer
+
+    readable_fields = Serializer._readable_fields.fget
+    if not hasattr(readable_fields, "__wrapped__"):
+        Serializer._readable_fields = property(_tracked(readable_fields))
+
+
+class QueryRepeatCounter:
+    """execute_wrapper counting statements and the serializer fields that issued them."""
+
+    def __init__(self):
+        self.statements = Counter()
+        self.fields = defaultdict(Counter)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.statements[sql] += 1
+        field = _current_field.get()
+        if field:
+            self.fields[sql][field] += 1
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        """[(count, fingerprint, serializer field or None)] for statements over the threshold."""
+        found = []
+        for sql, count in self.statements.most_common():
+            if count < threshold:
+                break
+            fields = self.fields.get(sql)
+            found.append((count, fingerprint(sql), fields.most_common(1)[0][0] if fields else None))
+        return found
+
+
+def report(counter, where, mode=None, threshold=None):
+    mode = mode or settings.NPLUSONE_GUARD
+    repeated = counter.repeated(threshold or settings.NPLUSONE_THRESHOLD)
+    if not repeated:
+        return
+    message = f"Possible N+1 queries in {where}:\n" + "\n".join(
+        f"  {count}x {sql}" + (f"  (from {field})" if field else "")
+        for count, sql, field in repeated
+    )
+    if mode == "raise":
+        raise NPlusOneError(message)
+    logger.warning(message)
+
+
+@contextmanager
+def assert_no_n_plus_one(threshold=None):
+    """Fail if any statement repeats `threshold` times inside the block."""
+    install_field_tracking()
+    counter = QueryRepeatCounter()
+    with execute_wrapper_all(counter):
+        yield counter
+    report(counter, "block", mode="raise", threshold=threshold)
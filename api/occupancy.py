@@ -0,0 +1,142 @@
+"""
+Live library occupancy.
+
+The number of students currently inside is kept in the Django cache so entry
+approval, kiosk check-in and the occupancy endpoint never run a COUNT query.
+A per-student marker (added with cache.add, removed with cache.delete) makes
+repeated check-ins/check-outs idempotent. The counter is rebuilt from
+LibraryAttendance whenever it is missing and periodically by
+reconcile_occupancy_task, which corrects any drift (evictions, crashes).
+
+The counter needs a cache every worker shares (REDIS_URL): with the default
+per-process LocMemCache each worker would enforce capacity on its own
+count, and the scheduler's reconcile would never reach the web workers.
+Without a shared cache each worker instead keeps a snapshot of who is
+inside, loaded from LibraryAttendance in one query at most every
+OCCUPANCY_LOCAL_TTL seconds and updated at once by its own check-ins and
+check-outs; other workers' changes show up within that TTL, which bounds
+how far capacity can be overshot.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import LibraryAttendance
+from .utils import cache_is_shared
+
+DAY_SECONDS = 60 * 60 * 24
+
+
+def _counter_key(day):
+    return f"occupancy:{day.isoformat()}:count"
+
+
+def _student_key(day, student_id):
+    return f"occupancy:{day.isoformat()}:student:{student_id}"
+
+
+def _inside(day):
+    return LibraryAttendance.objects.filter(date=day, status="PRESENT", check_out_time__isnull=True)
+
+
+class _LocalSnapshot:
+    """Students inside on one day, per process, reloaded after OCCUPANCY_LOCAL_TTL seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._day, self._inside, self._expires = None, set(), 0.0
+
+    def inside(self, day):
+        now = time.monotonic()
+        with self._lock:
+            if self._day != day or now >= self._expires:
+                self._inside = set(_inside(day).values_list("student_id", flat=True))
+                self._day, self._expires = day, now + settings.OCCUPANCY_LOCAL_TTL
+            return self._inside
+
+
+_local = _LocalSnapshot()
+
+
+def reconcile_occupancy(day=None):
+    """Rebuild the counter and per-student markers of a day from the attendance table."""
+    day = day or timezone.localdate()
+    if not cache_is_shared():
+        _local.reset()
+        return len(_local.inside(day))
+    inside = set(_inside(day).values_list("student_id", flat=True))
+    # Markers are only set for students with attendance that day; drop those no longer inside
+    left = set(LibraryAttendance.objects.filter(date=day).values_list("student_id", flat=True)) - inside
+    cache.delete_many([_student_key(day, student_id) for student_id in left])
+    cache.set_many({_student_key(day, student_id): 1 for student_id in inside}, DAY_SECONDS)
+    cache.set(_counter_key(day), len(inside), DAY_SECONDS)
+    return len(inside)
+
+
+def current_occupancy(day=None):
+    day = day or timezone.localdate()
+    if not cache_is_shared():
+        return len(_local.inside(day))
+    count = cache.get(_counter_key(day))
+    if count is None:
+        count = reconcile_occupancy(day)
+    return count
+
+
+def _adjust(day, delta):
+    try:
+        cache.incr(_counter_key(day), delta)
+    except ValueError:
+        # Counter not in cache yet: the attendance table already reflects this change
+        reconcile_occupancy(day)
+
+
+def is_inside(student_id, day=None):
+    day = day or timezone.localdate()
+    if not cache_is_shared():
+        return student_id in _local.inside(day)
+    return cache.get(_student_key(day, student_id)) is not None
+
+
+def students_inside(student_ids, day=None):
+    """Which of the given students are inside, read from the attendance table in one query."""
+    day = day or timezone.localdate()
+    return set(_inside(day).filter(student_id__in=student_ids).values_list("student_id", flat=True))
+
+
+def record_entries(student_ids, day=None):
+    """Call after students were marked PRESENT. Only students not already inside are counted."""
+    day = day or timezone.localdate()
+    if not cache_is_shared():
+        inside = _local.inside(day)
+        entered = set(student_ids) - inside
+        inside |= entered
+        return len(entered)
+    entered = sum(1 for student_id in set(student_ids) if cache.add(_student_key(day, student_id), 1, DAY_SECONDS))
+    if entered:
+        _adjust(day, entered)
+    return entered
+
+
+def record_exit(student_id, day=None):
+    """Call after a student's check_out_time was stamped."""
+    day = day or timezone.localdate()
+    if not cache_is_shared():
+        _local.inside(day).discard(student_id)
+        return
+    if cache.delete(_student_key(day, student_id)):
+        _adjust(day, -1)
+
+
+def remaining_capacity(day=None):
+    """Free places left, or None when LIBRARY_CAPACITY is not set."""
+    if not settings.LIBRARY_CAPACITY:
+        return None
+    return max(settings.LIBRARY_CAPACITY - current_occupancy(day), 0)
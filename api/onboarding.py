@@ -0,0 +1,175 @@
+"""
+Bulk student registration from a roll-number list.
+
+Passwords are hashed in parallel worker processes, existing usernames are
+found with one query, and users are inserted with bulk_create in chunks.
+`manage.py bulk_register_students` starts a pool per run; API requests
+share one pool of BULK_REGISTER_WORKERS processes, started on first use,
+so concurrent imports queue for the same CPUs instead of each taking all
+of them.
+"""
+import csv
+import io
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from .models import CustomUser
+from .process_pool import database_overrides, init_django_worker
+
+CHUNK_SIZE = 1000
+USERNAME_MAX_LENGTH = CustomUser._meta.get_field("username").max_length
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def _hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def _start_pool(workers):
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_django_worker, initargs=(database_overrides(),),
+    )
+
+
+def shared_pool():
+    """The hashing pool API requests share (BULK_REGISTER_WORKERS processes)."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = _start_pool(settings.BULK_REGISTER_WORKERS)
+        return _shared_pool
+
+
+def hash_passwords(passwords, workers=None, pool=None):
+    """
+    Hash passwords across a process pool, preserving order. Pass `pool`
+    (with `workers` processes) to use a running pool instead of starting one.
+    """
+    if not passwords:
+        return []
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return _hash_passwords(passwords)
+
+    size = max(1, len(passwords) // (workers * 4))
+    chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    if pool is not None:
+        return [hashed for chunk in pool.map(_hash_passwords, chunks) for hashed in chunk]
+    with _start_pool(workers) as pool:
+        return [hashed for chunk in pool.map(_hash_passwords, chunks) for hashed in chunk]
+
+
+def parse_student_rows(content, fmt):
+    """
+    CSV with a header row (username or roll_no, optional password) or a
+    JSON list of {"username": ..., "password": ...} objects / plain roll numbers.
+    """
+    if fmt == "json":
+        data = json.loads(content) if isinstance(content, str) else content
+        if isinstance(data, dict):
+            data = data.get("students", [])
+        if not isinstance(data, list):
+            raise ValueError("expected a list of students")
+        return [_json_row(index, item) for index, item in enumerate(data, start=1)]
+
+    reader = csv.DictReader(io.StringIO(content))
+    rows = []
+    for row in reader:
+        # Extra cells land under the None key as a list
+        row = {(key or "").strip().lower(): value.strip() for key, value in row.items() if isinstance(value, str)}
+        rows.append({
+            "username": row.get("username") or row.get("roll_no", ""),
+            "password": row.get("password", ""),
+        })
+    return rows
+
+
+def _json_row(index, item):
+    if _is_scalar(item):
+        return {"username": str(item)}
+    if isinstance(item, dict) and all(
+        item.get(key) is None or _is_scalar(item[key]) for key in ("username", "password")
+    ):
+        return {"username": item.get("username"), "password": item.get("password")}
+    raise ValueError(f"row {index} must be a roll number or a {{\"username\", \"password\"}} object")
+
+
+def _is_scalar(value):
+    # Roll numbers may come as JSON numbers; true/false are not roll numbers
+    return isinstance(value, (str, int)) and not isinstance(value, bool)
+
+
+def bulk_register_students(rows, default_password=None, workers=None, pool=None):
+    """
+    Create MEMBER accounts for rows of {"username", "password"}.
+    Returns a per-row report; rows without a password use default_password.
+    `workers` and `pool` are passed to hash_passwords().
+    """
+    report = []
+    to_create = []
+    seen = set()
+
+    for index, row in enumerate(rows, start=1):
+        username = str(row.get("username") or "").strip()
+        password = str(row.get("password") or default_password or "")
+        entry = {"row": index, "username": username}
+        report.append(entry)
+
+        if not username or len(username) > USERNAME_MAX_LENGTH:
+            entry.update(status="invalid", error="Roll number is required (max 150 characters).")
+        elif not password:
+            entry.update(status="invalid", error="Password is required.")
+        elif username in seen:
+            entry.update(status="duplicate", error="Roll number repeated in input.")
+        else:
+            seen.add(username)
+            to_create.append((entry, username, password))
+
+    existing = set(
+        CustomUser.objects.filter(username__in=seen).values_list("username", flat=True)
+    )
+    for entry, username, _ in to_create:
+        if username in existing:
+            entry.update(status="exists", error="User already exists.")
+    to_create = [item for item in to_create if item[1] not in existing]
+
+    hashes = hash_passwords([password for _, _, password in to_create], workers=workers, pool=pool)
+    pending = [
+        (entry, CustomUser(username=username, password=hashed, role="MEMBER"))
+        for (entry, username, _), hashed in zip(to_create, hashes)
+    ]
+    while pending:
+        try:
+            with transaction.atomic():
+                CustomUser.objects.bulk_create([user for _, user in pending], batch_size=CHUNK_SIZE)
+            break
+        except IntegrityError:
+            # Usernames registered since the check above: report those rows, insert the rest
+            taken = set(
+                CustomUser.objects.filter(username__in=[user.username for _, user in pending])
+                .values_list("username", flat=True)
+            )
+            if not taken:
+                raise
+            for entry, user in pending:
+                if user.username in taken:
+                    entry.update(status="exists", error="User already exists.")
+            pending = [(entry, user) for entry, user in pending if user.username not in taken]
+
+    for entry, _ in pending:
+        entry["status"] = "created"
+
+    summary = {}
+    for entry in report:
+        summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+    return {"summary": summary, "rows": report}
@@ -0,0 +1,42 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class BookmarkGroupCursorPagination(CursorPagination):
+    """
+    Cursor pagination for the grouped bookmark listing.
+    Ordered by the most recent bookmark so newly read e-books come first;
+    e-book id breaks ties so pages neither repeat nor skip groups.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-last_bookmarked_at", "ebook")
+
+
+class EntryRequestQueuePagination(CursorPagination):
+    """Pending library entry requests, oldest first (first come, first served)."""
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("request_date",)
+
+
+class AdminUserDirectoryPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class JobRunPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("-started_at",)
+
+
+class BookRequestQueuePagination(CursorPagination):
+    """Pending book requests, oldest first."""
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("request_date", "id")
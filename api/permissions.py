@@ -0,0 +1,8 @@
+from rest_framework import permissions
+
+
+class IsAdminUser(permissions.BasePermission):
+    """Only users with the ADMIN role."""
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.role == "ADMIN"
@@ -0,0 +1,28 @@
+"""
+Initializer for spawned worker processes that use Django.
+
+Spawned workers start a fresh interpreter and unpickle the initializer
+before Django is set up, so this module must not import models.
+"""
+import os
+
+import django
+
+
+def database_overrides():
+    """The parent's database names and options, e.g. a test database, for init_django_worker."""
+    from django.db import connections
+
+    return {
+        alias: {"NAME": connections[alias].settings_dict["NAME"], "OPTIONS": connections[alias].settings_dict["OPTIONS"]}
+        for alias in connections
+    }
+
+
+def init_django_worker(databases):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "lms_backend.settings")
+    django.setup()
+    from django.db import connections
+
+    for alias, overrides in databases.items():
+        connections.settings[alias].update(overrides)
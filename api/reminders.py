@@ -0,0 +1,105 @@
+"""
+Event-driven due-date reminders.
+
+When a loan is created, one LoanReminder per stage in DUE_REMINDER_STAGES
+is queued with the time it becomes due. process_due_reminders pops every
+unsent reminder whose due_at has passed, oldest first, so reminders missed
+while the worker was down are still sent on the next run. If several stages
+of the same loan are due at once only the latest one is sent. Returned
+loans have their pending reminders cancelled.
+
+Loans created without signals (bulk_create, imports) are picked up by
+backfill_reminders.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BorrowRecord, LoanReminder, Notification
+
+BATCH_SIZE = 1000
+
+
+def reminder_schedule(return_date):
+    """[(stage, due_at)] for a loan due on return_date."""
+    reminder_time = time(hour=settings.DUE_REMINDER_HOUR)
+    return [
+        (stage, timezone.make_aware(datetime.combine(return_date - timedelta(days=days), reminder_time)))
+        for stage, days in settings.DUE_REMINDER_STAGES.items()
+    ]
+
+
+def enqueue_reminders(records):
+    """Queue every stage for the given loans (objects with id and return_date)."""
+    LoanReminder.objects.bulk_create(
+        [
+            LoanReminder(borrow_record_id=record.id, stage=stage, due_at=due_at)
+            for record in records
+            for stage, due_at in reminder_schedule(record.return_date)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def cancel_reminders(record_ids):
+    return LoanReminder.objects.filter(borrow_record_id__in=record_ids, sent_at__isnull=True).delete()[0]
+
+
+def backfill_reminders():
+    """Queue reminders for open loans that have none yet. Returns the number of loans."""
+    records = list(BorrowRecord.objects.filter(returned=False, reminders__isnull=True).only("id", "return_date"))
+    enqueue_reminders(records)
+    return len(records)
+
+
+def _message(stage, title, return_date):
+    if settings.DUE_REMINDER_STAGES.get(stage, 0) > 0:
+        return (
+            f"Reminder: Your borrowed book "
+            f"'{title}' "
+            f"is due on {return_date}. "
+            f"Please return it on time to avoid fines."
+        )
+    return (
+        f"Your borrowed book '{title}' was due on {return_date} and is now overdue. "
+        f"Please return it as soon as possible to avoid further fines."
+    )
+
+
+def process_due_reminders(now=None, batch_size=BATCH_SIZE):
+    """Send every reminder due by `now`. Returns the number of notifications created."""
+    now = now or timezone.now()
+    queue = LoanReminder.objects.filter(sent_at__isnull=True, due_at__lte=now).order_by("due_at", "id")
+    sent = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queue.values_list(
+                    "id", "borrow_record_id", "stage", "borrow_record__returned",
+                    "borrow_record__student_id", "borrow_record__return_date",
+                    "borrow_record__book_copy__book__title",
+                )[:batch_size]
+            )
+            if not rows:
+                return sent
+
+            # Rows are in due order, so the last row of a loan is its latest due stage
+            latest = {}
+            for row in rows:
+                latest[row[1]] = row
+
+            notifications = []
+            notified_before_due = []
+            for _, record_id, stage, returned, student_id, return_date, title in latest.values():
+                if returned:
+                    continue
+                notifications.append(Notification(student_id=student_id, message=_message(stage, title, return_date)))
+                if settings.DUE_REMINDER_STAGES.get(stage, 0) > 0:
+                    notified_before_due.append(record_id)
+
+            Notification.objects.bulk_create(notifications)
+            LoanReminder.objects.filter(id__in=[row[0] for row in rows]).update(sent_at=now)
+            BorrowRecord.objects.filter(id__in=notified_before_due).update(due_soon_notified=True)
+            sent += len(notifications)
@@ -0,0 +1,170 @@
+"""
+Waitlist and holds.
+
+Students join a FIFO queue per Book. When a copy is returned, place_hold
+gives that copy to the first WAITING reservation for RESERVATION_HOLD_HOURS
+instead of putting it back on the shelf, so waiting students do not race for
+it. A held copy is not counted in Book.available_copies; only its holder can
+request or borrow it. expire_holds (run periodically) passes expired holds
+on to the next student, or releases the copy when the queue is empty.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .catalog_cache import bump_catalog_version
+from .models import Book, BookReservation, Notification
+
+BATCH_SIZE = 500
+
+
+class ReservationError(Exception):
+    pass
+
+
+def queue_position(reservation):
+    """1-based position of a WAITING reservation, None otherwise."""
+    if reservation.status != BookReservation.STATUS_WAITING:
+        return None
+    return BookReservation.objects.filter(
+        book_id=reservation.book_id,
+        status=BookReservation.STATUS_WAITING,
+        created_at__lte=reservation.created_at,
+        id__lte=reservation.id,
+    ).count()
+
+
+def reserve(student, book):
+    """Put the student at the end of the book's waitlist."""
+    if book.available_copies > 0:
+        raise ReservationError("Copies of this book are available; request one directly.")
+    if BookReservation.objects.filter(
+        student=student, book=book, status__in=BookReservation.ACTIVE_STATUSES
+    ).exists():
+        raise ReservationError("You are already in the waitlist for this book.")
+    try:
+        with transaction.atomic():
+            return BookReservation.objects.create(student=student, book=book)
+    except IntegrityError:
+        # A concurrent request got there first (one active reservation per student and book)
+        raise ReservationError("You are already in the waitlist for this book.")
+
+
+def hold_for(book_copy):
+    """The active hold on a copy, or None."""
+    return (
+        BookReservation.objects.filter(book_copy=book_copy, status=BookReservation.STATUS_HELD)
+        .only("id", "student_id")
+        .first()
+    )
+
+
+def fulfil_hold(reservation):
+    """The holder borrowed the copy."""
+    BookReservation.objects.filter(id=reservation.id).update(
+        status=BookReservation.STATUS_FULFILLED, updated_at=timezone.now()
+    )
+
+
+def place_hold(book_copy, now=None):
+    """
+    Hold a returned copy for the head of its book's queue.
+    Returns the reservation, or None if nobody is waiting (the caller then
+    puts the copy back in available_copies).
+    """
+    now = now or timezone.now()
+    waiting = BookReservation.objects.filter(book_id=book_copy.book_id, status=BookReservation.STATUS_WAITING)
+    with transaction.atomic():
+        while True:
+            # Wait for a locked head rather than skip it: the queue is FIFO
+            reservation = waiting.select_for_update().order_by("created_at", "id").first()
+            # A head that stopped waiting while we waited for its lock is dropped
+            # without the next row being returned; look again
+            if reservation is not None or not waiting.exists():
+                break
+        if reservation is None:
+            return None
+
+        reservation.status = BookReservation.STATUS_HELD
+        reservation.book_copy = book_copy
+        reservation.hold_expires_at = now + timedelta(hours=settings.RESERVATION_HOLD_HOURS)
+        reservation.save(update_fields=["status", "book_copy", "hold_expires_at", "updated_at"])
+        Notification.objects.create(
+            student_id=reservation.student_id,
+            message=f"The book '{book_copy.book.title}' (copy {book_copy.accession_no}) is on hold for you "
+                    f"until {timezone.localtime(reservation.hold_expires_at):%Y-%m-%d %H:%M}. "
+                    f"Please collect it before then."
+        )
+    return reservation
+
+
+def release_copy(book_copy, now=None):
+    """Pass a copy whose hold ended to the next student, or back to the shelf."""
+    if place_hold(book_copy, now) is None:
+        Book.objects.filter(id=book_copy.book_id).update(available_copies=F("available_copies") + 1)
+        bump_catalog_version()
+
+
+def cancel_reservation(reservation):
+    with transaction.atomic():
+        was_held = reservation.status == BookReservation.STATUS_HELD
+        reservation.status = BookReservation.STATUS_CANCELLED
+        reservation.save(update_fields=["status", "updated_at"])
+        if was_held and reservation.book_copy_id:
+            release_copy(reservation.book_copy)
+
+
+def cancel_reservations_of(student_ids, now=None):
+    """
+    Cancel every active reservation of these students (accounts being
+    deleted) and pass their held copies on. Waiting rows are cancelled
+    first so a copy is never handed to another of the same students.
+    Returns the number cancelled.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        active = list(
+            BookReservation.objects.select_for_update(of=("self",))
+            .filter(student_id__in=student_ids, status__in=BookReservation.ACTIVE_STATUSES)
+            .select_related("book_copy", "book_copy__book")
+        )
+        BookReservation.objects.filter(id__in=[reservation.id for reservation in active]).update(
+            status=BookReservation.STATUS_CANCELLED, updated_at=now
+        )
+        for reservation in active:
+            if reservation.status == BookReservation.STATUS_HELD and reservation.book_copy_id:
+                release_copy(reservation.book_copy, now)
+    return len(active)
+
+
+def expire_holds(now=None, batch_size=BATCH_SIZE):
+    """Expire overdue holds and advance their queues. Returns the number expired."""
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            held = list(
+                BookReservation.objects.select_for_update(skip_locked=True, of=("self",))
+                .filter(status=BookReservation.STATUS_HELD, hold_expires_at__lte=now)
+                .select_related("book", "book_copy", "book_copy__book")[:batch_size]
+            )
+            if not held:
+                return expired
+
+            BookReservation.objects.filter(id__in=[reservation.id for reservation in held]).update(
+                status=BookReservation.STATUS_EXPIRED, updated_at=now
+            )
+            Notification.objects.bulk_create([
+                Notification(
+                    student_id=reservation.student_id,
+                    message=f"Your hold on '{reservation.book.title}' has expired."
+                )
+                for reservation in held
+            ])
+            for reservation in held:
+                if reservation.book_copy_id:
+                    release_copy(reservation.book_copy, now)
+        expired += len(held)
@@ -0,0 +1,84 @@
+"""
+In-memory JWT revocation list keyed by jti.
+
+Every process keeps a dict of revoked jti -> expiry. It is filled from the
+RevokedToken table and refreshed incrementally (rows revoked since the last
+sync) at most every TOKEN_REVOCATION_REFRESH_SECONDS, so checking a token is
+a dict lookup and never a query per request. Expired entries are evicted on
+refresh since those tokens are rejected by their exp claim anyway.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import RevokedToken
+
+# Re-read rows revoked shortly before the last sync in case they committed late
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class RevocationList:
+
+    def __init__(self):
+        self._revoked = {}
+        self._synced_until = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti):
+        self._maybe_refresh()
+        return jti in self._revoked
+
+    def revoke(self, tokens):
+        """Persist and locally revoke simplejwt token objects."""
+        rows = [
+            RevokedToken(
+                jti=token["jti"],
+                expires_at=datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc),
+            )
+            for token in tokens
+        ]
+        RevokedToken.objects.bulk_create(rows, ignore_conflicts=True)
+        for row in rows:
+            self._revoked[row.jti] = row.expires_at.timestamp()
+
+    def reset(self):
+        with self._lock:
+            self._revoked = {}
+            self._synced_until = None
+            self._next_refresh = 0.0
+
+    def _maybe_refresh(self):
+        now = time.monotonic()
+        if now < self._next_refresh or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._refresh()
+            self._next_refresh = now + settings.TOKEN_REVOCATION_REFRESH_SECONDS
+        finally:
+            self._lock.release()
+
+    def _refresh(self):
+        rows = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        if self._synced_until is not None:
+            rows = rows.filter(revoked_at__gte=self._synced_until - SYNC_OVERLAP)
+
+        for jti, expires_at, revoked_at in rows.values_list("jti", "expires_at", "revoked_at"):
+            self._revoked[jti] = expires_at.timestamp()
+            if self._synced_until is None or revoked_at > self._synced_until:
+                self._synced_until = revoked_at
+
+        cutoff = time.time()
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > cutoff}
+
+
+revocation_list = RevocationList()
+
+
+def purge_expired_revocations():
+    """Delete revocations whose tokens have expired anyway."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
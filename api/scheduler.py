@@ -0,0 +1,149 @@
+"""
+Periodic job scheduler.
+
+Jobs register with @periodic_job(every=seconds). `manage.py run_scheduler`
+polls PeriodicJobState and starts due jobs on a thread pool. Starting a run
+is a single conditional UPDATE (due, and fewer than max_concurrency runs in
+progress), so several scheduler processes can run side by side without
+overlapping a job. Runs that outlive `lease` seconds are presumed dead and
+stop counting against the limit: the next start resets the count and bumps
+the job's generation, and a late release() of a run from an older
+generation changes nothing.
+
+Each run is recorded in JobRun: duration, rows touched (the job's return
+value), number of queries and time spent in the database.
+"""
+import logging
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .metrics import QueryMetrics
+from .models import JobRun, PeriodicJobState
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PeriodicJob:
+    name: str
+    func: callable
+    every: int  # seconds
+    max_concurrency: int = 1
+    lease: int = 3600  # seconds
+
+    @property
+    def interval(self):
+        return settings.SCHEDULER_INTERVALS.get(self.name, self.every)
+
+
+registry = {}
+
+
+def periodic_job(every, name=None, max_concurrency=1, lease=3600):
+    """Register a function as a periodic job. It may return the number of rows it touched."""
+    def decorator(func):
+        job_name = name or func.__name__
+        registry[job_name] = PeriodicJob(job_name, func, every, max_concurrency, lease)
+        return func
+    return decorator
+
+
+def ensure_job_states():
+    now = timezone.now()
+    PeriodicJobState.objects.bulk_create(
+        [PeriodicJobState(name=name, next_run_at=now) for name in registry],
+        ignore_conflicts=True,
+    )
+
+
+def try_acquire(job, now=None):
+    """
+    Claim a run of `job` if it is due and under its concurrency limit.
+    Returns the generation the run belongs to (pass it to release()), or
+    None.
+    """
+    now = now or timezone.now()
+    generation = PeriodicJobState.objects.filter(name=job.name).values_list("generation", flat=True).first()
+    if generation is None:
+        return None
+    due = PeriodicJobState.objects.filter(name=job.name, next_run_at__lte=now, generation=generation)
+    schedule = {
+        "next_run_at": now + timedelta(seconds=job.interval),
+        "lease_expires_at": now + timedelta(seconds=job.lease),
+    }
+    # Runs past their lease are written off: start a new generation with this run alone
+    if due.filter(lease_expires_at__lt=now).update(running=1, generation=generation + 1, **schedule):
+        return generation + 1
+    if due.filter(
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__gte=now), running__lt=job.max_concurrency,
+    ).update(running=F("running") + 1, **schedule):
+        return generation
+    return None
+
+
+def release(job, generation):
+    PeriodicJobState.objects.filter(name=job.name, generation=generation, running__gt=0).update(
+        running=F("running") - 1
+    )
+
+
+def run_job(job, generation):
+    """Execute one run of an acquired job (try_acquire() returned `generation`) and record its metrics."""
+    metrics = QueryMetrics()
+    started_at = timezone.now()
+    started = time.perf_counter()
+    status, error, rows = "SUCCESS", None, 0
+
+    try:
+        with connection.execute_wrapper(metrics):
+            rows = job.func() or 0
+    except Exception:
+        status, error = "FAILED", traceback.format_exc()
+        logger.exception("Scheduled job %s failed", job.name)
+    finally:
+        duration = time.perf_counter() - started
+        try:
+            JobRun.objects.create(
+                job_name=job.name,
+                started_at=started_at,
+                finished_at=timezone.now(),
+                duration_ms=int(duration * 1000),
+                status=status,
+                rows_touched=rows if isinstance(rows, int) else 0,
+                query_count=metrics.count,
+                query_time_ms=int(metrics.seconds * 1000),
+                error=error,
+            )
+        finally:
+            release(job, generation)
+    return status
+
+
+def run_due_jobs(executor=None):
+    """Start every due job. With an executor runs are submitted to it, otherwise run inline."""
+    started = []
+    now = timezone.now()
+    for job in registry.values():
+        generation = try_acquire(job, now)
+        if generation is None:
+            continue
+        started.append(job.name)
+        if executor:
+            executor.submit(_run_in_thread, job, generation)
+        else:
+            run_job(job, generation)
+    return started
+
+
+def _run_in_thread(job, generation):
+    try:
+        run_job(job, generation)
+    finally:
+        connection.close()
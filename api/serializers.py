@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.hashers import make_password
-from .models import CustomUser,Book,BookCopy,BookRequest,BorrowRecord,BookNotificationRequest,Notification,EBook,EBookBookmark,LibraryEntryRequest,LibraryAttendance
+from django.db.models import Prefetch
+from .models import CustomUser,Book,BookCopy,BookRequest,BorrowRecord,BookNotificationRequest,Notification,EBook,EBookBookmark,LibraryEntryRequest,LibraryAttendance,LibraryAttendanceHourlyRollup,DeletionJob,JobRun,PeriodicJobState,BookReservation
 from cloudinary.utils import cloudinary_url
 
 class UserRegisterSerializer(serializers.ModelSerializer):
@@ -42,6 +43,16 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
+class AdminUserDirectorySerializer(UserSerializer):
+    """UserSerializer plus per-user summary columns annotated by AdminUserListAPIView."""
+    open_loans = serializers.IntegerField(read_only=True)
+    outstanding_fine = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True)
+    last_attendance = serializers.DateField(read_only=True)
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ["open_loans", "outstanding_fine", "last_attendance"]
+
+
 class BookCopySerializer(serializers.ModelSerializer):
     class Meta:
         model = BookCopy
@@ -77,8 +88,14 @@ class BookSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    @staticmethod
+    def prefetch(queryset):
+        """Load every book's copies in one query (see get_available_copy_ids)."""
+        return queryset.prefetch_related(Prefetch("copies", queryset=BookCopy.objects.order_by("id")))
+
     def get_available_copy_ids(self, obj):
-        all_copies = obj.copies.all().order_by("id")
+        # Sorted in Python so prefetched copies are reused
+        all_copies = sorted(obj.copies.all(), key=lambda copy: copy.id)
         available_copies = all_copies[:obj.available_copies]
         return [copy.id for copy in available_copies]
     
@@ -165,6 +182,18 @@ class StudentBorrowRecordSerializer(serializers.ModelSerializer):
 
 
 
+class BorrowHistorySerializer(serializers.Serializer):
+    """Same output as StudentBorrowRecordSerializer, for hot + archived loan dicts."""
+    id = serializers.IntegerField()
+    book_title = serializers.CharField()
+    accession_no = serializers.CharField()
+    borrow_date = serializers.DateField()
+    return_date = serializers.DateField()
+    returned = serializers.BooleanField()
+    fine = serializers.DecimalField(max_digits=6, decimal_places=2)
+
+
+
 class BookNotificationRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = BookNotificationRequest
@@ -174,6 +203,25 @@ class BookNotificationRequestSerializer(serializers.ModelSerializer):
 
 
 
+class BookReservationSerializer(serializers.ModelSerializer):
+    book_title = serializers.CharField(source="book.title", read_only=True)
+    accession_no = serializers.CharField(source="book_copy.accession_no", read_only=True, default=None)
+    student_username = serializers.CharField(source="student.username", read_only=True)
+    position = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BookReservation
+        fields = ['id', 'student', 'student_username', 'book', 'book_title', 'status',
+                  'accession_no', 'hold_expires_at', 'position', 'created_at']
+        read_only_fields = fields
+
+    def get_position(self, obj):
+        # Annotated by the list views; computed for a single reservation
+        if hasattr(obj, "position"):
+            return obj.position
+        return self.context.get("position")
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
@@ -234,4 +282,46 @@ class LibraryAttendanceSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = LibraryAttendance
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+
+
+class LibraryAttendanceHourlyRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LibraryAttendanceHourlyRollup
+        fields = ["date", "hour", "headcount"]
+
+class EBookBookmarkGroupSerializer(serializers.Serializer):
+    """One row per e-book the student has bookmarked, built from an aggregated values() queryset."""
+    ebook = serializers.IntegerField()
+    ebook_title = serializers.CharField()
+    ebook_format = serializers.CharField()
+    bookmark_count = serializers.IntegerField()
+    last_bookmarked_at = serializers.DateTimeField()
+    latest_bookmark = serializers.SerializerMethodField()
+
+    def get_latest_bookmark(self, obj):
+        return {
+            "id": obj["latest_bookmark_id"],
+            "page_number": obj["latest_page_number"],
+            "location": obj["latest_location"],
+        }
+
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DeletionJob
+        fields = "__all__"
+
+
+
+class JobRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobRun
+        fields = "__all__"
+
+
+class PeriodicJobStateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PeriodicJobState
+        fields = ["name", "next_run_at", "running", "lease_expires_at"]
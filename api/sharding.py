@@ -0,0 +1,126 @@
+"""
+Sharded execution of circulation jobs.
+
+run_sharded splits the primary-key range of a queryset into shards and
+processes them across a process pool. Workers are spawned, not forked: the
+scheduler calls this from one of its threads, and a fork would copy its
+open DB connections and any lock held by another thread. Each worker sets
+up Django and opens its own connection. Rows are handled in chunks; the
+handler's writes and the shard's checkpoint are committed in the same
+transaction, so a crashed run is resumed where it left off by the job's
+next invocation, without re-processing a chunk. A run that has not
+finished after SHARD_MAX_ATTEMPTS invocations is marked failed, so the
+next invocation starts a new run instead of retrying it forever.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Max, Min
+from django.utils import timezone
+
+from .models import ShardCheckpoint
+from .process_pool import database_overrides, init_django_worker
+
+CHUNK_SIZE = 500
+CHECKPOINT_RETENTION = timedelta(days=7)
+
+
+class ShardRunFailed(Exception):
+    pass
+
+
+def plan_shards(run_key, queryset, shards):
+    """Create the checkpoints of a new run by splitting [min pk, max pk] evenly."""
+    bounds = queryset.aggregate(lo=Min("pk"), hi=Max("pk"))
+    if bounds["lo"] is None:
+        return
+    lo, hi = bounds["lo"], bounds["hi"]
+    step = max(1, -(-(hi - lo + 1) // shards))  # ceil division
+
+    ShardCheckpoint.objects.bulk_create(
+        [
+            ShardCheckpoint(run_key=run_key, shard=index, lo=start, hi=min(start + step - 1, hi), last_pk=start - 1)
+            for index, start in enumerate(range(lo, hi + 1, step))
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def run_shard(checkpoint_id, queryset, handler, chunk_size=CHUNK_SIZE):
+    """Process one shard from its checkpoint. handler(pks) returns rows touched."""
+    checkpoint = ShardCheckpoint.objects.get(id=checkpoint_id)
+    touched = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=checkpoint.last_pk, pk__lte=checkpoint.hi)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not pks:
+            break
+        with transaction.atomic():
+            rows = handler(pks) or 0
+            checkpoint.last_pk = pks[-1]
+            checkpoint.rows_touched += rows
+            checkpoint.save(update_fields=["last_pk", "rows_touched", "updated_at"])
+        touched += rows
+
+    checkpoint.done = True
+    checkpoint.save(update_fields=["done", "updated_at"])
+    return touched
+
+
+def _run_shard_in_worker(checkpoint_id, model, query, handler, chunk_size):
+    # Pickling a QuerySet evaluates it; ship the unevaluated query instead
+    queryset = model._base_manager.all()
+    queryset.query = query
+    try:
+        return run_shard(checkpoint_id, queryset, handler, chunk_size)
+    finally:
+        connections.close_all()
+
+
+def run_sharded(job_name, queryset, handler, run_key=None, workers=None, shards=None, chunk_size=CHUNK_SIZE):
+    """
+    Run handler over every row of queryset, sharded by primary key.
+    handler must be a module-level function (it is pickled to the workers).
+    Returns the total rows touched by this invocation.
+    """
+    workers = workers or settings.SHARD_WORKERS
+    shards = shards or workers * 2
+
+    ShardCheckpoint.objects.filter(done=True, created_at__lt=timezone.now() - CHECKPOINT_RETENTION).delete()
+    if run_key is None:
+        # Resume the job's unfinished run, if any, otherwise start a new one
+        run_key = (
+            ShardCheckpoint.objects.filter(run_key__startswith=f"{job_name}:", done=False)
+            .values_list("run_key", flat=True)
+            .first()
+        ) or f"{job_name}:{timezone.now().isoformat()}"
+    if not ShardCheckpoint.objects.filter(run_key=run_key).exists():
+        plan_shards(run_key, queryset, shards)
+
+    unfinished = ShardCheckpoint.objects.filter(run_key=run_key, done=False)
+    if unfinished.filter(attempts__gte=settings.SHARD_MAX_ATTEMPTS).exists():
+        unfinished.update(done=True, failed=True, updated_at=timezone.now())
+        raise ShardRunFailed(f"{run_key} did not finish in {settings.SHARD_MAX_ATTEMPTS} attempts; marked failed")
+    pending = list(unfinished.values_list("id", flat=True))
+    if not pending:
+        return 0
+    ShardCheckpoint.objects.filter(id__in=pending).update(attempts=F("attempts") + 1)
+
+    if workers == 1:
+        return sum(run_shard(checkpoint_id, queryset, handler, chunk_size) for checkpoint_id in pending)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_django_worker, initargs=(database_overrides(),),
+    ) as pool:
+        futures = [
+            pool.submit(_run_shard_in_worker, checkpoint_id, queryset.model, queryset.query, handler, chunk_size)
+            for checkpoint_id in pending
+        ]
+        return sum(future.result() for future in futures)
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import publish_user_state
+from .catalog_cache import bump_catalog_version
+from .models import Book, BookCopy, BorrowRecord, CustomUser, EBook
+from .reminders import cancel_reminders, enqueue_reminders
+
+
+@receiver(post_save, sender=CustomUser)
+def publish_account_state(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login; nothing the token claims depend on
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    publish_user_state(instance.pk, instance.is_active, instance.role)
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_deleted_account(sender, instance, **kwargs):
+    publish_user_state(instance.pk, False, None)
+
+
+@receiver(post_save, sender=BorrowRecord)
+def schedule_loan_reminders(sender, instance, created, **kwargs):
+    if created:
+        enqueue_reminders([instance])
+    elif instance.returned:
+        cancel_reminders([instance.id])
+
+
+# Catalog responses depend on books, copies, e-books and loans
+for _model in (Book, BookCopy, EBook, BorrowRecord):
+    post_save.connect(bump_catalog_version, sender=_model, dispatch_uid=f"catalog_version_save_{_model.__name__}")
+    post_delete.connect(bump_catalog_version, sender=_model, dispatch_uid=f"catalog_version_delete_{_model.__name__}")
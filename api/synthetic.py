@@ -0,0 +1,137 @@
+"""
+Synthetic library data for benchmarks (manage.py benchmark_api).
+
+Everything is inserted with bulk_create in chunks, with auto_now_add
+switched off so history can carry past dates. A fixed seed makes runs
+reproducible.
+"""
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Book, BookCopy, BorrowRecord, CustomUser, LibraryAttendance, Notification
+
+CHUNK_SIZE = 2000
+CATEGORIES = ("Fiction", "Science", "History", "Engineering", "Mathematics", "Poetry", "Biography", "Art")
+WORDS = (
+    "silent", "river", "quantum", "empire", "garden", "machine", "winter", "theory", "ocean", "shadow",
+    "golden", "signal", "forest", "atlas", "modern", "ancient", "light", "stone", "circuit", "voyage",
+)
+
+
+@contextmanager
+def _explicit_dates(*fields):
+    """Let bulk_create keep the given auto_now_add (model, field name) values."""
+    fields = [model._meta.get_field(name) for model, name in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def seed_library(**scale):
+    """Create a synthetic library. Returns {label: rows created}."""
+    with _explicit_dates(
+        (BorrowRecord, "borrow_date"), (LibraryAttendance, "date"), (Notification, "created_at")
+    ):
+        return _seed(**scale)
+
+
+def _seed(users=1000, books=2000, copies_per_book=3, years=2, loans_per_user_year=12,
+          attendance_days=60, notifications_per_user=20, open_loan_ratio=0.05, seed=42):
+    rng = random.Random(seed)
+    today = timezone.localdate()
+
+    students = CustomUser.objects.bulk_create(
+        [CustomUser(username=f"STU{i:06d}", password="!", role="MEMBER") for i in range(users)],
+        batch_size=CHUNK_SIZE,
+    )
+    book_rows = Book.objects.bulk_create(
+        [
+            Book(
+                title=" ".join(rng.choice(WORDS).title() for _ in range(3)),
+                author=f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+                isbn=f"{9780000000000 + i}",
+                category=rng.choice(CATEGORIES),
+                publisher=f"{rng.choice(WORDS).title()} Press",
+                total_copies=copies_per_book,
+                available_copies=copies_per_book,
+            )
+            for i in range(books)
+        ],
+        batch_size=CHUNK_SIZE,
+    )
+    copies = BookCopy.objects.bulk_create(
+        [
+            BookCopy(book=book, accession_no=f"ACC{book.id:07d}-{n}")
+            for book in book_rows
+            for n in range(copies_per_book)
+        ],
+        batch_size=CHUNK_SIZE,
+    )
+
+    # Returned history spread over `years`, plus a few open loans on distinct copies
+    history_days = max(1, 365 * years)
+    loans = []
+    for student in students:
+        for _ in range(loans_per_user_year * years):
+            borrowed = today - timedelta(days=rng.randrange(16, history_days + 16))
+            loans.append(BorrowRecord(
+                student=student, book_copy=rng.choice(copies), borrow_date=borrowed,
+                return_date=borrowed + timedelta(days=15), returned=True,
+            ))
+
+    open_copies = rng.sample(copies, min(len(copies), int(len(students) * open_loan_ratio)))
+    on_loan_per_book = defaultdict(int)
+    for copy in open_copies:
+        borrowed = today - timedelta(days=rng.randrange(0, 30))
+        loans.append(BorrowRecord(
+            student=rng.choice(students), book_copy=copy, borrow_date=borrowed,
+            return_date=borrowed + timedelta(days=15),
+        ))
+        on_loan_per_book[copy.book_id] += 1
+
+    loans = BorrowRecord.objects.bulk_create(loans, batch_size=CHUNK_SIZE)
+    Book.objects.bulk_update(
+        [Book(id=book_id, available_copies=copies_per_book - on_loan) for book_id, on_loan in on_loan_per_book.items()],
+        ["available_copies"],
+        batch_size=CHUNK_SIZE,
+    )
+
+    now = timezone.now()
+    attendance = LibraryAttendance.objects.bulk_create(
+        [
+            LibraryAttendance(student=student, date=today - timedelta(days=offset + 1), status="PRESENT")
+            for student in students
+            for offset in range(attendance_days)
+            if rng.random() < 0.4
+        ],
+        batch_size=CHUNK_SIZE,
+    )
+
+    notifications = Notification.objects.bulk_create(
+        [
+            Notification(
+                student=student, message=f"Synthetic notification {n}", read=rng.random() < 0.7,
+                created_at=now - timedelta(hours=rng.randrange(0, 24 * 90)),
+            )
+            for student in students
+            for n in range(notifications_per_user)
+        ],
+        batch_size=CHUNK_SIZE,
+    )
+
+    return {
+        "users": len(students),
+        "books": len(book_rows),
+        "copies": len(copies),
+        "loans": len(loans),
+        "attendance": len(attendance),
+        "notifications": len(notifications),
+    }
@@ -1,30 +1,66 @@
 # tasks.py
 from background_task import background
-from datetime import date,timedelta
+from datetime import date
 from .models import BorrowRecord, BookNotificationRequest, Notification, Book
+from .occupancy import reconcile_occupancy
+from .revocation import purge_expired_revocations
+from .kiosk import purge_used_kiosk_tokens
+from .deletion import run_deletion_job
+from .archive import archive_returned_borrow_records
+from .scheduler import periodic_job
+from .sharding import run_sharded
+from .reminders import backfill_reminders, process_due_reminders
+from .reservations import expire_holds
+from decimal import Decimal
 
-@background(schedule=60)  # runs every minute
+# Recurring jobs are registered with @periodic_job and run by
+# `manage.py run_scheduler`. They return the number of rows they touched,
+# which is recorded in JobRun. One-off jobs still use @background.
+
+def apply_fines(record_ids):
+    """
+    Shard handler: recalculate fines for a chunk of unreturned loans and
+    notify students whose fine increased. One read, one bulk update and
+    one bulk insert per chunk.
+    """
+    today = date.today()
+    rows = BorrowRecord.objects.filter(
+        id__in=record_ids, returned=False, return_date__lt=today
+    ).values_list("id", "student_id", "return_date", "fine", "book_copy__book__title")
+
+    updated = []
+    notifications = []
+    for record_id, student_id, return_date, previous_fine, title in rows:
+        fine = Decimal((today - return_date).days * BorrowRecord.FINE_PER_DAY)
+        # Only notify if fine increased
+        if fine != previous_fine:
+            updated.append(BorrowRecord(id=record_id, fine=fine))
+            notifications.append(Notification(
+                student_id=student_id,
+                message=f"Your borrowed book '{title}' is overdue. "
+                        f"Current fine: ₹{fine:.2f}"
+            ))
+
+    BorrowRecord.objects.bulk_update(updated, ["fine"])
+    Notification.objects.bulk_create(notifications)
+    return len(updated)
+
+
+@periodic_job(every=60 * 60)
 def update_fines_task():
     """
     Calculate fines for all unreturned books and notify students if they have fines.
+    Sharded by BorrowRecord id across SHARD_WORKERS processes; an interrupted
+    run is resumed on the next invocation.
     """
-    records = BorrowRecord.objects.filter(returned=False)
-    for record in records:
-        previous_fine = record.fine
-        record.calculate_fine()
-        # Only notify if fine increased
-        if record.fine > 0 and record.fine != previous_fine:
-            Notification.objects.create(
-                student=record.student,
-                message=f"Your borrowed book '{record.book_copy.book.title}' is overdue. "
-                        f"Current fine: ₹{record.fine:.2f}"
-            )
+    return run_sharded("update_fines", BorrowRecord.objects.filter(returned=False), apply_fines)
 
 
 def send_book_available_notifications():
     """
     Notify students when a requested book becomes available.
     """
+    touched = 0
     books_available = Book.objects.filter(available_copies__gt=0)
 
     for book in books_available:
@@ -37,37 +73,69 @@ def send_book_available_notifications():
             )
             req.notified = True
             req.save()
+            touched += 1
+    return touched
 
-@background(schedule=60)  # 60 seconds later for first run
+@periodic_job(every=5 * 60)
 def send_book_available_notifications_task():
-    send_book_available_notifications()
+    return send_book_available_notifications()
 
 
 
-@background(schedule=60)  # runs every minute
+@periodic_job(every=5 * 60)
 def due_date_reminder_task():
     """
-    Notify students when their borrowed book is near the return date.
+    Send due-date reminders whose time has come, including any missed while
+    the scheduler was down. Loans without queued reminders are enqueued first.
     """
-    today = date.today()
-    reminder_date = today + timedelta(days=2)  # 2 days before due
-
-    records = BorrowRecord.objects.filter(
-        returned=False,
-        return_date=reminder_date,
-        due_soon_notified=False
-    )
-
-    for record in records:
-        Notification.objects.create(
-            student=record.student,
-            message=(
-                f"Reminder: Your borrowed book "
-                f"'{record.book_copy.book.title}' "
-                f"is due on {record.return_date}. "
-                f"Please return it on time to avoid fines."
-            )
-        )
+    backfill_reminders()
+    return process_due_reminders()
+
+
+@periodic_job(every=5 * 60)
+def expire_holds_task():
+    """
+    Expire uncollected holds and pass the copies on to the next student in line.
+    """
+    return expire_holds()
+
 
-        record.due_soon_notified = True
-        record.save()
\ No newline at end of file
+@periodic_job(every=5 * 60)
+def reconcile_occupancy_task():
+    """
+    Rebuild the live occupancy counter from today's attendance rows.
+    """
+    return reconcile_occupancy()
+
+
+@periodic_job(every=60 * 60)
+def purge_expired_revocations_task():
+    """
+    Drop revoked-token rows whose tokens have expired.
+    """
+    return purge_expired_revocations()
+
+
+@periodic_job(every=60 * 60)
+def purge_used_kiosk_tokens_task():
+    """
+    Drop used kiosk QR nonces whose tokens have expired.
+    """
+    return purge_used_kiosk_tokens()
+
+
+@background(schedule=0)
+def run_deletion_job_task(job_id):
+    """
+    Run a queued DeletionJob (bulk delete/archive of books or users).
+    A failed attempt is retried by the runner and resumes where it stopped.
+    """
+    run_deletion_job(job_id)
+
+
+@periodic_job(every=60 * 60 * 24, lease=6 * 60 * 60)
+def archive_borrow_records_task():
+    """
+    Move old returned loans out of the hot BorrowRecord table.
+    """
+    return archive_returned_borrow_records()
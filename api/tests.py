@@ -1,3 +1,847 @@
-from django.test import TestCase
+import os
+import subprocess
+import sys
+from contextlib import nullcontext
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import async_views, occupancy, onboarding, scheduler
+from .authentication import LibraryRefreshToken, _state_memo
+from .archive import archive_returned_borrow_records
+from .catalog_cache import CacheStats
+from .deletion import run_deletion, run_deletion_job
+from .fast_lists import FastJSONRenderer
+from .kiosk import purge_used_kiosk_tokens
+from .login import ip_limiter, username_limiter
+from .models import (ArchivedBorrowRecord, Book, BookCopy, BookRequest, BookReservation, BorrowRecord, CustomUser,
+                     DeletionJob, EBook, EBookBookmark, JobRun, LibraryAttendance, LibraryEntryRequest,
+                     LoanReminder, Notification, PeriodicJobState, ShardCheckpoint, UsedKioskToken)
+from .nplusone import NPlusOneError, assert_no_n_plus_one
+from .reminders import backfill_reminders, process_due_reminders
+from .reservations import expire_holds
+from .revocation import revocation_list
+from .scheduler import PeriodicJob
+from .sharding import ShardRunFailed, run_sharded
+
+
+def make_book(title="Book", copies=1):
+    book = Book.objects.create(
+        title=title, author="Author", isbn="9780000000000", category="Fiction",
+        total_copies=copies, available_copies=copies,
+    )
+    for i in range(copies):
+        BookCopy.objects.create(book=book, accession_no=f"{title}-{book.id}-{i}")
+    return book
+
+
+class NPlusOneGuardTests(TestCase):
+    ROWS = 8  # above NPLUSONE_THRESHOLD
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user("admin", "pw", role="ADMIN")
+        cls.student = CustomUser.objects.create_user("student", "pw")
+        today = timezone.localdate()
+        for i in range(cls.ROWS):
+            book = make_book(f"Book {i}", copies=2)
+            BookRequest.objects.create(student=cls.student, book_copy=book.copies.first())
+            LibraryEntryRequest.objects.create(student=CustomUser.objects.create_user(f"member{i}", "pw"))
+        for i in range(cls.ROWS):
+            # date is auto_now_add: move each row to its own day
+            attendance = LibraryAttendance.objects.create(student=cls.student, status="PRESENT")
+            LibraryAttendance.objects.filter(id=attendance.id).update(date=today - timedelta(days=i + 1))
+
+    def test_repeated_statement_raises(self):
+        with self.assertRaises(NPlusOneError):
+            with assert_no_n_plus_one():
+                for user in CustomUser.objects.all():
+                    CustomUser.objects.filter(id=user.id).exists()
+
+    def test_statements_below_threshold_pass(self):
+        with assert_no_n_plus_one(threshold=3):
+            CustomUser.objects.filter(id=self.admin.id).exists()
+            CustomUser.objects.filter(id=self.student.id).exists()
+
+    def _assert_list_queries_constant(self, user, path):
+        client = APIClient()
+        client.force_authenticate(user)
+        with assert_no_n_plus_one():
+            response = client.get(path)
+        self.assertEqual(response.status_code, 200, path)
+
+    @override_settings(CATALOG_CACHE_ENABLED=False)
+    def test_fixed_list_views(self):
+        for fast in (True, False):
+            with self.subTest(fast_lists=fast), override_settings(FAST_LIST_SERIALIZATION=fast):
+                self._assert_list_queries_constant(self.student, "/api/books/available/")
+                self._assert_list_queries_constant(self.student, "/api/books/search/?q=Book")
+                self._assert_list_queries_constant(self.admin, "/api/admin/books/")
+        self._assert_list_queries_constant(self.student, "/api/my-book-requests/")
+        self._assert_list_queries_constant(self.admin, "/api/entry-requests/")
+        self._assert_list_queries_constant(self.student, "/api/my-attendance/")
+        self._assert_list_queries_constant(self.admin, f"/api/attendance/{self.student.id}/")
+
+
+class StatelessAuthRevocationTests(TestCase):
+
+    def setUp(self):
+        _state_memo.clear()
+        revocation_list.reset()
+        self.admin = CustomUser.objects.create_user("admin", "pw", role="ADMIN")
+        self.student = CustomUser.objects.create_user("student", "pw")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {LibraryRefreshToken.for_user(self.student).access_token}")
+        self.admin_client = APIClient()
+        self.admin_client.force_authenticate(self.admin)
+
+    def assertTokenAccepted(self, accepted):
+        response = self.client.get("/api/my-notifications/")
+        self.assertEqual(response.status_code, 200 if accepted else 401)
+
+    def test_token_accepted_for_active_account(self):
+        self.assertTokenAccepted(True)
+
+    def test_deactivation_revokes_token(self):
+        self.assertTokenAccepted(True)
+        self.student.is_active = False
+        self.student.save()
+        self.assertTokenAccepted(False)
+
+    def test_role_change_revokes_token(self):
+        self.assertTokenAccepted(True)
+        self.student.role = "ADMIN"
+        self.student.save()
+        self.assertTokenAccepted(False)
+
+    def test_archive_revokes_token(self):
+        self.assertTokenAccepted(True)
+        response = self.admin_client.delete(f"/api/users/{self.student.id}/?mode=archive")
+        self.assertEqual(response.status_code, 204)
+        self.assertTokenAccepted(False)
+
+    def test_delete_revokes_token(self):
+        self.assertTokenAccepted(True)
+        response = self.admin_client.delete(f"/api/users/{self.student.id}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertTokenAccepted(False)
+
+    def test_unpublished_bulk_update_is_read_from_table(self):
+        # Nothing published the change: once the memo lapses the table decides
+        CustomUser.objects.filter(id=self.student.id).update(is_active=False)
+        with override_settings(AUTH_USER_CACHE_TTL=0):
+            _state_memo.clear()
+            self.assertTokenAccepted(False)
+
+    def test_logout_revokes_access_token(self):
+        refresh = LibraryRefreshToken.for_user(self.student)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        self.assertEqual(self.client.post("/api/logout/", {"refresh": str(refresh)}, format="json").status_code, 205)
+        self.assertTokenAccepted(False)
+
+
+class WaitlistOrderTests(TestCase):
+
+    def test_holds_listed_first_then_fifo(self):
+        admin = CustomUser.objects.create_user("admin", "pw", role="ADMIN")
+        book = make_book(copies=1)
+        students = [CustomUser.objects.create_user(f"s{i}", "pw") for i in range(3)]
+        first = BookReservation.objects.create(student=students[0], book=book)
+        second = BookReservation.objects.create(student=students[1], book=book)
+        # The latest reservation holds the copy, e.g. after earlier holds expired
+        held = BookReservation.objects.create(
+            student=students[2], book=book, status=BookReservation.STATUS_HELD, book_copy=book.copies.first(),
+            hold_expires_at=timezone.now() + timedelta(hours=1),
+        )
+        BookReservation.objects.filter(id=held.id).update(created_at=timezone.now() + timedelta(minutes=1))
+
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.get(f"/api/books/{book.id}/waitlist/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.json()], [held.id, first.id, second.id])
+        self.assertEqual([row["position"] for row in response.json()], [None, 1, 2])
+
+    def test_reserving_twice_is_rejected(self):
+        student = CustomUser.objects.create_user("s", "pw")
+        book = make_book(copies=1)
+        BorrowRecord.objects.create(student=CustomUser.objects.create_user("other", "pw"), book_copy=book.copies.first())
+        Book.objects.filter(id=book.id).update(available_copies=0)
+        client = APIClient()
+        client.force_authenticate(student)
+        self.assertEqual(client.post(f"/api/books/{book.id}/reserve/").status_code, 201)
+        self.assertEqual(client.post(f"/api/books/{book.id}/reserve/").status_code, 400)
+
+
+class HoldTests(TestCase):
+
+    def setUp(self):
+        self.book = make_book(copies=1)
+        self.copy = self.book.copies.first()
+        borrower = CustomUser.objects.create_user("borrower", "pw")
+        self.loan = BorrowRecord.objects.create(student=borrower, book_copy=self.copy)
+        Book.objects.filter(id=self.book.id).update(available_copies=0)
+        self.students = [CustomUser.objects.create_user(f"s{i}", "pw") for i in range(2)]
+        self.reservations = [BookReservation.objects.create(student=s, book=self.book) for s in self.students]
+
+    def _statuses(self):
+        return list(
+            BookReservation.objects.filter(book=self.book).order_by("id").values_list("student_id", "status")
+        )
+
+    def _return_copy(self):
+        client = APIClient()
+        client.force_authenticate(self.loan.student)
+        self.assertEqual(client.patch(f"/api/borrow-record/{self.loan.id}/return/").status_code, 200)
+
+    def _available(self):
+        return Book.objects.get(id=self.book.id).available_copies
+
+    def test_returned_copy_held_for_head_of_queue(self):
+        self._return_copy()
+        self.assertEqual(self._statuses(), [(self.students[0].id, "HELD"), (self.students[1].id, "WAITING")])
+        self.assertEqual(self._available(), 0)
+
+    def test_expired_holds_pass_copy_on_then_to_shelf(self):
+        self._return_copy()
+        later = timezone.now() + timedelta(hours=settings.RESERVATION_HOLD_HOURS + 1)
+        self.assertEqual(expire_holds(later), 1)
+        self.assertEqual(self._statuses(), [(self.students[0].id, "EXPIRED"), (self.students[1].id, "HELD")])
+        self.assertEqual(expire_holds(later + timedelta(hours=settings.RESERVATION_HOLD_HOURS + 1)), 1)
+        self.assertEqual(self._available(), 1)
+
+    def test_deleting_holder_passes_copy_on(self):
+        self._return_copy()
+        for progress in (None, lambda label, completed, counts: None):
+            with self.subTest(queued=progress is not None):
+                holder = BookReservation.objects.get(book=self.book, status="HELD").student_id
+                run_deletion(DeletionJob.KIND_USER, [holder], DeletionJob.MODE_DELETE, progress=progress)
+        # Both holders are gone: the copy went back on the shelf
+        self.assertEqual(self._statuses(), [])
+        self.assertEqual(self._available(), 1)
+
+    def test_deleting_whole_queue_shelves_copy(self):
+        self._return_copy()
+        run_deletion(DeletionJob.KIND_USER, [s.id for s in self.students], DeletionJob.MODE_DELETE)
+        self.assertEqual(self._statuses(), [])
+        self.assertEqual(self._available(), 1)
+
+    def test_waitlist_admin_only(self):
+        client = APIClient()
+        client.force_authenticate(self.students[0])
+        self.assertEqual(client.get(f"/api/books/{self.book.id}/waitlist/").status_code, 403)
+
+
+class BookmarkGroupPaginationTests(TestCase):
+
+    def test_pages_walk_groups_with_equal_timestamps(self):
+        student = CustomUser.objects.create_user("s", "pw")
+        ebooks = [
+            EBook.objects.create(title=f"E{i}", author="A", category="C", format="PDF", ebook_file=f"ebooks/{i}.pdf")
+            for i in range(5)
+        ]
+        for ebook in reversed(ebooks):
+            EBookBookmark.objects.create(student=student, ebook=ebook, page_number=1)
+        EBookBookmark.objects.update(created_at=timezone.now())
+
+        client = APIClient()
+        client.force_authenticate(student)
+        seen = []
+        url = "/api/ebooks/bookmarks/grouped/?page_size=2"
+        while url:
+            page = client.get(url).json()
+            seen += [group["ebook"] for group in page["results"]]
+            url = page["next"]
+        self.assertEqual(seen, [ebook.id for ebook in ebooks])
+
+
+class DeletionTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user("admin", "pw", role="ADMIN"))
+        self.book = make_book(copies=2)
+        student = CustomUser.objects.create_user("s", "pw")
+        copy = self.book.copies.first()
+        BorrowRecord.objects.create(student=student, book_copy=copy, returned=True)
+        BookRequest.objects.create(student=student, book_copy=copy)
+
+    def _delete(self, **data):
+        return self.client.post("/api/books/bulk-delete/", {"ids": [self.book.id], **data}, format="json")
+
+    def test_cascade_deletes_dependents(self):
+        response = self._delete()
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()["rows"]
+        self.assertEqual((rows["api.Book"], rows["api.BookCopy"], rows["api.BorrowRecord"]), (1, 2, 1))
+        self.assertFalse(BookCopy.objects.exists() or BorrowRecord.objects.exists() or BookRequest.objects.exists())
+
+    @override_settings(INLINE_DELETE_MAX_ROWS=4)
+    def test_large_inline_delete_refused(self):
+        self.assertEqual(self._delete().status_code, 400)
+        self.assertTrue(Book.objects.filter(id=self.book.id).exists())
+        self.assertEqual(self._delete(**{"async": True}).status_code, 503)
+
+        with override_settings(BACKGROUND_TASKS_RUNNER=True):
+            response = self._delete(**{"async": True})
+        self.assertEqual(response.status_code, 202)
+        run_deletion_job(response.json()["id"])
+        self.assertEqual(DeletionJob.objects.get().status, DeletionJob.STATUS_DONE)
+        self.assertFalse(Book.objects.filter(id=self.book.id).exists())
+
+
+class BulkApprovalTests(TestCase):
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user("admin", "pw", role="ADMIN")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_book_requests_approved_while_copies_last(self):
+        book = make_book(copies=2)
+        copies = list(book.copies.order_by("id"))
+        students = [CustomUser.objects.create_user(f"s{i}", "pw") for i in range(3)]
+        requests = [
+            BookRequest.objects.create(student=student, book_copy=copy)
+            for student, copy in zip(students, copies + copies[:1])
+        ]
+        response = self.client.post(
+            "/api/admin/book-requests/bulk-action/",
+            {"action": "approve", "ids": [r.id for r in requests] + [999999]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        statuses = [result["status"] for result in response.json()["results"]]
+        self.assertEqual(statuses, ["approved", "approved", "skipped", "skipped"])
+        self.assertEqual(BorrowRecord.objects.filter(returned=False).count(), 2)
+        self.assertEqual(Book.objects.get(id=book.id).available_copies, 0)
+
+    def test_book_request_ids_validated(self):
+        for ids in ([], "1,2", ["1"], list(range(501))):
+            with self.subTest(ids=ids):
+                response = self.client.post(
+                    "/api/admin/book-requests/bulk-action/", {"action": "approve", "ids": ids}, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_entry_requests_approved_and_marked_present(self):
+        students = [CustomUser.objects.create_user(f"s{i}", "pw") for i in range(3)]
+        requests = [LibraryEntryRequest.objects.create(student=student) for student in students]
+        response = self.client.post(
+            "/api/entry-requests/bulk-action/", {"action": "approve", "ids": [r.id for r in requests]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(LibraryEntryRequest.objects.filter(status="APPROVED").count(), 3)
+        self.assertEqual(
+            LibraryAttendance.objects.filter(date=timezone.localdate(), status="PRESENT").count(), 3
+        )
+
+    def test_entry_request_ids_validated(self):
+        for ids in ("1,2", ["1"], list(range(501))):
+            with self.subTest(ids=ids):
+                response = self.client.post(
+                    "/api/entry-requests/bulk-action/", {"action": "approve", "ids": ids}, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CATALOG_CACHE_ENABLED=True, CATALOG_CACHE_LOCAL_TTL=60)
+class BorrowArchiveTests(TestCase):
+
+    def setUp(self):
+        self.student = CustomUser.objects.create_user("s", "pw")
+        book = make_book(copies=3)
+        self.old, self.recent, self.open = [
+            BorrowRecord.objects.create(student=self.student, book_copy=copy) for copy in book.copies.order_by("id")
+        ]
+        today = timezone.localdate()
+        BorrowRecord.objects.filter(id=self.old.id).update(
+            returned=True, borrow_date=today - timedelta(days=400), return_date=today - timedelta(days=390)
+        )
+        BorrowRecord.objects.filter(id=self.recent.id).update(returned=True, return_date=today)
+
+    def test_old_returned_loans_moved(self):
+        self.assertEqual(archive_returned_borrow_records(older_than_days=30, batch_size=1), 1)
+        self.assertEqual(archive_returned_borrow_records(older_than_days=30), 0)
+        self.assertEqual(
+            set(BorrowRecord.objects.values_list("id", flat=True)), {self.recent.id, self.open.id}
+        )
+        archived = ArchivedBorrowRecord.objects.get()
+        self.assertEqual((archived.original_id, archived.book_title), (self.old.id, "Book"))
+
+    def test_history_reads_both_tables(self):
+        archive_returned_borrow_records(older_than_days=30)
+        client = APIClient()
+        client.force_authenticate(self.student)
+        response = client.get("/api/my-borrows/")
+        self.assertEqual([row["id"] for row in response.json()], [self.old.id, self.recent.id, self.open.id])
+        response = client.get("/api/my-borrows/?include_archived=false")
+        self.assertEqual([row["id"] for row in response.json()], [self.recent.id, self.open.id])
+
+
+class AttendanceCalendarTests(TestCase):
+
+    def setUp(self):
+        caches["default"].clear()
+        self.student = CustomUser.objects.create_user("s", "pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def _present(self, day):
+        attendance = LibraryAttendance.objects.create(student=self.student, status="PRESENT")
+        LibraryAttendance.objects.filter(id=attendance.id).update(date=day)
+
+    def test_bitmap_per_month(self):
+        self._present(date(2025, 9, 1))
+        self._present(date(2025, 9, 3))
+        self._present(date(2025, 10, 31))
+        response = self.client.get("/api/my-attendance/calendar/?from=2025-09&to=2025-10")
+        self.assertEqual(response.status_code, 200)
+        months = response.json()["months"]
+        self.assertEqual([(m["month"], m["bitmap"]) for m in months], [("2025-09", 0b101), ("2025-10", 1 << 30)])
+        self.assertEqual(response.json()["total_present_days"], 3)
+        # Past months are served from the cache
+        with self.assertNumQueries(0):
+            self.client.get("/api/my-attendance/calendar/?from=2025-09&to=2025-10")
+
+    def test_month_bounds(self):
+        self.assertEqual(self.client.get("/api/my-attendance/calendar/?from=9999-12&to=9999-12").status_code, 200)
+        self.assertEqual(self.client.get("/api/my-attendance/calendar/?from=0001-01&to=0001-01").status_code, 200)
+        for query in ("from=0000-12&to=0001-01", "from=9999-12&to=10000-01", "from=2025-13",
+                      "from=2025-05&to=2025-04", "from=2024-01&to=2025-01", "from=June"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"/api/my-attendance/calendar/?{query}").status_code, 400)
+
+
+class OccupancyTests(TestCase):
+
+    def setUp(self):
+        occupancy._local.reset()
+        self.admin = CustomUser.objects.create_user("admin", "pw", role="ADMIN")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _enter(self, student):
+        LibraryAttendance.objects.create(student=student, status="PRESENT", check_in_time=timezone.now())
+
+    def test_reads_without_shared_cache_use_snapshot(self):
+        students = [CustomUser.objects.create_user(f"s{i}", "pw") for i in range(3)]
+        self._enter(students[0])
+        self.assertEqual(occupancy.current_occupancy(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/library/occupancy/").status_code, 200)
+            self.assertTrue(occupancy.is_inside(students[0].id))
+            self.assertEqual(occupancy.record_entries([students[0].id, students[1].id]), 1)
+            occupancy.record_exit(students[0].id)
+            self.assertEqual(occupancy.current_occupancy(), 1)
+        # Another worker's check-in shows up once the snapshot is reloaded
+        self._enter(students[2])
+        self.assertEqual(occupancy.reconcile_occupancy(), 2)
+
+    @override_settings(LIBRARY_CAPACITY=3)
+    def test_bulk_approval_admits_up_to_capacity(self):
+        inside = [CustomUser.objects.create_user(f"in{i}", "pw") for i in range(2)]
+        waiting = [CustomUser.objects.create_user(f"out{i}", "pw") for i in range(8)]
+        for student in inside:
+            self._enter(student)
+        requests = [LibraryEntryRequest.objects.create(student=student) for student in inside + waiting]
+        with assert_no_n_plus_one():
+            response = self.client.post(
+                "/api/entry-requests/bulk-action/",
+                {"action": "approve", "ids": [r.id for r in requests]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        # Both already inside are approved without taking a place; one place is left
+        self.assertEqual(response.json()["processed_ids"], [r.id for r in requests[:3]])
+        self.assertEqual(occupancy.current_occupancy(), 3)
+        self.assertEqual(occupancy.remaining_capacity(), 0)
+
+
+@override_settings(KIOSK_API_KEY="gate-key")
+class KioskTests(TestCase):
+
+    def setUp(self):
+        occupancy._local.reset()
+        self.student = CustomUser.objects.create_user("student", "pw")
+        self.gate = APIClient(HTTP_X_KIOSK_KEY="gate-key")
+
+    def _token(self, user=None):
+        client = APIClient()
+        client.force_authenticate(user or self.student)
+        return client.get("/api/kiosk/token/")
+
+    def _gate(self, action, token):
+        return self.gate.post(f"/api/kiosk/{action}/", {"token": token}, format="json")
+
+    def test_only_members_get_tokens(self):
+        self.assertEqual(self._token().status_code, 200)
+        admin = CustomUser.objects.create_user("admin", "pw", role="ADMIN")
+        self.assertEqual(self._token(admin).status_code, 403)
+
+    def test_token_is_single_use(self):
+        token = self._token().json()["token"]
+        self.assertEqual(self._gate("check-in", token).status_code, 200)
+        self.assertEqual(self._gate("check-in", token).status_code, 400)
+        self.assertEqual(self._gate("check-out", token).status_code, 400)
+        self.assertEqual(self._gate("check-out", self._token().json()["token"]).status_code, 200)
+        self.assertFalse(occupancy.is_inside(self.student.id))
+        self.assertEqual(self._gate("check-in", "forged").status_code, 400)
+
+    def test_failed_actions_leave_token_unspent(self):
+        token = self._token().json()["token"]
+        self.assertEqual(self._gate("check-out", token).status_code, 400)
+        other = CustomUser.objects.create_user("other", "pw")
+        LibraryAttendance.objects.create(student=other, status="PRESENT", check_in_time=timezone.now())
+        with override_settings(LIBRARY_CAPACITY=1):
+            self.assertEqual(self._gate("check-in", token).status_code, 409)
+        self.assertEqual(UsedKioskToken.objects.count(), 0)
+        self.assertEqual(self._gate("check-in", token).status_code, 200)
+        self.assertEqual(UsedKioskToken.objects.count(), 1)
+
+    def test_purge_drops_expired_nonces(self):
+        UsedKioskToken.objects.create(nonce="old", expires_at=timezone.now() - timedelta(seconds=1))
+        UsedKioskToken.objects.create(nonce="new", expires_at=timezone.now() + timedelta(seconds=60))
+        self.assertEqual(purge_used_kiosk_tokens(), 1)
+        self.assertEqual(list(UsedKioskToken.objects.values_list("nonce", flat=True)), ["new"])
+
+
+@override_settings(BULK_REGISTER_WORKERS=1, BULK_REGISTER_MAX_ROWS=5)
+class BulkRegisterTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user("admin", "pw", role="ADMIN"))
+
+    def _register(self, students):
+        return self.client.post(
+            "/api/users/bulk-register/", {"students": students, "default_password": "pw"}, format="json"
+        )
+
+    def test_per_row_report(self):
+        CustomUser.objects.create_user("CS2", "pw")
+        response = self._register(["CS1", "CS2", "CS1", "", {"username": "CS3", "password": "own"}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [row["status"] for row in response.json()["rows"]],
+            ["created", "exists", "duplicate", "invalid", "created"],
+        )
+        self.assertTrue(CustomUser.objects.get(username="CS3").check_password("own"))
+        self.assertEqual(self._register([f"CS{i}" for i in range(6)]).status_code, 400)
+
+    def test_username_taken_during_import_reported(self):
+        real_hash_passwords = onboarding.hash_passwords
+
+        def register_concurrently(passwords, **kwargs):
+            CustomUser.objects.create_user("CS2", "pw")
+            return real_hash_passwords(passwords, **kwargs)
+
+        with mock.patch.object(onboarding, "hash_passwords", register_concurrently):
+            response = self._register(["CS1", "CS2", "CS3"])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row["status"] for row in response.json()["rows"]], ["created", "exists", "created"])
+        self.assertEqual(CustomUser.objects.filter(username__startswith="CS").count(), 3)
+
+
+class CatalogCacheTests(TestCase):
+
+    def setUp(self):
+        caches["default"].clear()
+        self.student = CustomUser.objects.create_user("student", "pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+        make_book("First")
+
+    def test_etag_revalidation(self):
+        response = self.client.get("/api/books/available/")
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            with self.subTest(if_none_match=header):
+                self.assertEqual(self.client.get("/api/books/available/", HTTP_IF_NONE_MATCH=header).status_code, 304)
+        self.assertEqual(self.client.get("/api/books/available/", HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_write_invalidates_cached_list(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get("/api/books/available/")
+        etag = response["ETag"]
+        self.assertEqual(len(response.json()), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_book("Second")
+        response = self.client.get("/api/books/available/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.json()), 2)
+
+
+class CacheStatsTests(SimpleTestCase):
+
+    def test_bypass_only_endpoint_has_no_hit_ratio(self):
+        stats = CacheStats()
+        stats.incr("book_search", "bypass")
+        stats.incr("available_books", "hit")
+        stats.incr("available_books", "miss")
+        text = stats.render_prometheus()
+        self.assertIn('lms_catalog_cache_requests_total{endpoint="book_search",outcome="bypass"} 1', text)
+        self.assertIn('lms_catalog_cache_hit_ratio{endpoint="available_books"} 0.5000', text)
+        self.assertNotIn('lms_catalog_cache_hit_ratio{endpoint="book_search"}', text)
+
+
+@override_settings(CATALOG_CACHE_ENABLED=False)
+class FastListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = CustomUser.objects.create_user("student", "pw")
+        for i in range(3):
+            make_book(f"Book {i}", copies=i + 1)
+            Notification.objects.create(student=cls.student, message=f"Due “{i}” ✓", read=i == 1)
+        Book.objects.filter(title="Book 2").update(available_copies=1, publisher=None)
+
+    def setUp(self):
+        _state_memo.clear()
+
+    async def _async_body(self, view, path):
+        request = AsyncRequestFactory().get(
+            path, headers={"Authorization": f"Bearer {LibraryRefreshToken.for_user(self.student).access_token}"}
+        )
+        response = await view.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    async def test_async_views_match_sync_views(self):
+        client = APIClient()
+        client.force_authenticate(self.student)
+        endpoints = (
+            (async_views.AvailableBooksView, "/api/books/available/"),
+            (async_views.BookSearchView, "/api/books/search/?q=Book"),
+            (async_views.MyNotificationsView, "/api/my-notifications/"),
+        )
+        for fast in (True, False):
+            for view, path in endpoints:
+                with self.subTest(fast_lists=fast, path=path), override_settings(FAST_LIST_SERIALIZATION=fast):
+                    sync_body = (await sync_to_async(client.get)(path)).content
+                    self.assertEqual(await self._async_body(view, path), sync_body)
+
+    def test_fast_rows_match_serializers(self):
+        client = APIClient()
+        client.force_authenticate(self.student)
+        for path in ("/api/books/available/", "/api/books/search/?q=Book", "/api/my-notifications/"):
+            with self.subTest(path=path):
+                with override_settings(FAST_LIST_SERIALIZATION=True):
+                    fast = client.get(path).content
+                with override_settings(FAST_LIST_SERIALIZATION=False):
+                    slow = client.get(path).content
+                self.assertEqual(fast, slow)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def test_same_bytes_as_json_renderer(self):
+        for data in (
+            [{"id": 1, "title": "Café “quoted” ✓", "due": timezone.now(), "fine": Decimal("2.50"), "tags": []}],
+            {"rate": 1e-7, "nested": [{"score": 0.1}, {"big": 1e16}]},
+            {"line": "a\u2028b", "huge": 2 ** 70},
+        ):
+            with self.subTest(data=data):
+                self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class SchedulerTests(TestCase):
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.calls = []
+        self.job = PeriodicJob("test_job", self._work, every=60, lease=120)
+        PeriodicJobState.objects.create(name="test_job", next_run_at=self.now)
+
+    def _work(self):
+        self.calls.append(1)
+        if len(self.calls) > 1:
+            raise RuntimeError("boom")
+        return 7
+
+    def _state(self):
+        return PeriodicJobState.objects.values_list("running", "generation").get(name="test_job")
+
+    def test_no_overlap_until_due_again(self):
+        generation = scheduler.try_acquire(self.job, self.now)
+        self.assertEqual(generation, 0)
+        self.assertIsNone(scheduler.try_acquire(self.job, self.now))
+        # Due again, but the first run still holds the only slot
+        self.assertIsNone(scheduler.try_acquire(self.job, self.now + timedelta(seconds=61)))
+        scheduler.release(self.job, generation)
+        self.assertEqual(scheduler.try_acquire(self.job, self.now + timedelta(seconds=61)), 0)
+
+    def test_expired_lease_starts_new_generation(self):
+        stale = scheduler.try_acquire(self.job, self.now)
+        fresh = scheduler.try_acquire(self.job, self.now + timedelta(seconds=121))
+        self.assertEqual((stale, fresh), (0, 1))
+        # The written-off run finishing late must not free the new run's slot
+        scheduler.release(self.job, stale)
+        self.assertEqual(self._state(), (1, 1))
+        scheduler.release(self.job, fresh)
+        self.assertEqual(self._state(), (0, 1))
+
+    def test_runs_recorded(self):
+        for later in (0, 61):
+            generation = scheduler.try_acquire(self.job, self.now + timedelta(seconds=later))
+            with self.assertLogs("api.scheduler", "ERROR") if later else nullcontext():
+                scheduler.run_job(self.job, generation)
+        runs = list(JobRun.objects.filter(job_name="test_job").order_by("id").values_list("status", "rows_touched"))
+        self.assertEqual(runs, [("SUCCESS", 7), ("FAILED", 0)])
+        self.assertEqual(self._state(), (0, 0))
+
+
+class DueReminderTests(TestCase):
+
+    def setUp(self):
+        self.student = CustomUser.objects.create_user("s", "pw")
+        self.copies = list(make_book(copies=2).copies.order_by("id"))
+        self.loan = BorrowRecord.objects.create(student=self.student, book_copy=self.copies[0])
+
+    def _at(self, days_before_due):
+        day = self.loan.return_date - timedelta(days=days_before_due)
+        return timezone.make_aware(datetime.combine(day, time(settings.DUE_REMINDER_HOUR)))
+
+    def test_loan_queues_every_stage(self):
+        self.assertEqual(
+            set(self.loan.reminders.values_list("stage", flat=True)), set(settings.DUE_REMINDER_STAGES)
+        )
+
+    def test_only_latest_due_stage_sent(self):
+        self.assertEqual(process_due_reminders(self._at(3) - timedelta(minutes=1)), 0)
+        # Both pre-due stages are due, e.g. after the worker was down
+        self.assertEqual(process_due_reminders(self._at(1)), 1)
+        self.assertIn("is due on", Notification.objects.get().message)
+        self.assertTrue(BorrowRecord.objects.get(id=self.loan.id).due_soon_notified)
+        self.assertEqual(process_due_reminders(self._at(1)), 0)
+        self.assertEqual(process_due_reminders(self._at(-1)), 1)
+        self.assertIn("overdue", Notification.objects.latest("id").message)
+
+    def test_returned_loan_not_reminded(self):
+        self.loan.returned = True
+        self.loan.save()
+        self.assertFalse(self.loan.reminders.exists())
+        self.assertEqual(process_due_reminders(self._at(-1)), 0)
+
+    def test_backfill_queues_loans_created_without_signals(self):
+        BorrowRecord.objects.bulk_create([BorrowRecord(student=self.student, book_copy=self.copies[1])])
+        self.assertEqual(backfill_reminders(), 1)
+        self.assertEqual(backfill_reminders(), 0)
+        self.assertEqual(LoanReminder.objects.count(), 2 * len(settings.DUE_REMINDER_STAGES))
+
+
+class ShardingTests(TestCase):
+
+    def setUp(self):
+        student = CustomUser.objects.create_user("s", "pw")
+        Notification.objects.bulk_create([Notification(student=student, message=str(i)) for i in range(10)])
+        self.seen = []
+        self.fail_after = None
+
+    def _mark_read(self, pks):
+        if self.fail_after is not None and len(self.seen) >= self.fail_after:
+            raise RuntimeError("worker crashed")
+        self.seen += pks
+        return Notification.objects.filter(id__in=pks).update(read=True)
+
+    def _run(self):
+        return run_sharded("test_job", Notification.objects.all(), self._mark_read, workers=1, shards=2, chunk_size=2)
+
+    def test_crashed_run_resumes_without_reprocessing(self):
+        self.fail_after = 4
+        with self.assertRaises(RuntimeError):
+            self._run()
+        self.fail_after = None
+        self.assertEqual(self._run(), 6)
+        self.assertEqual(sorted(self.seen), sorted(Notification.objects.values_list("id", flat=True)))
+        self.assertFalse(Notification.objects.filter(read=False).exists())
+
+    @override_settings(SHARD_MAX_ATTEMPTS=2)
+    def test_failing_run_given_up_after_max_attempts(self):
+        self.fail_after = 0
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                self._run()
+        with self.assertRaises(ShardRunFailed):
+            self._run()
+        self.assertTrue(ShardCheckpoint.objects.filter(failed=True).exists())
+        # The next invocation starts a new run
+        self.fail_after = None
+        self.assertEqual(self._run(), 10)
+
+
+class ScheduledJobsViewTests(TestCase):
+
+    def test_registry_filled_in_fresh_process(self):
+        # Only app loading runs before the first (lazy) view import
+        code = "import django; django.setup(); from api.scheduler import registry; print(sorted(registry))"
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "lms_backend.settings"},
+        )
+        self.assertIn("update_fines_task", result.stdout)
+
+    def test_jobs_listed(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_user("admin", "pw", role="ADMIN"))
+        response = client.get("/api/admin/scheduler/jobs/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("update_fines_task", [job["name"] for job in response.json()])
+
+
+class LoginTests(TestCase):
+
+    def setUp(self):
+        username_limiter.reset()
+        ip_limiter.reset()
+        CustomUser.objects.create_user("CS2025001", "secret-pw")
+        self.client = APIClient()
+
+    def login(self, username, password="secret-pw"):
+        return self.client.post("/api/login/", {"username": username, "password": password}, format="json")
+
+    def test_login_returns_tokens(self):
+        response = self.login("CS2025001")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", response.json())
+
+    def test_wrong_password_rejected(self):
+        self.assertEqual(self.login("CS2025001", "wrong").status_code, 401)
+
+    def test_non_string_credentials_rejected(self):
+        for username, password in ((12345, "secret-pw"), (["CS2025001"], "secret-pw"), ("CS2025001", 123)):
+            with self.subTest(username=username, password=password):
+                self.assertEqual(self.login(username, password).status_code, 400)
+
+    def test_username_rate_limited(self):
+        for _ in range(10):
+            self.login("cs2025001", "wrong")
+        response = self.login("CS2025001")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+    @override_settings(LOGIN_HASH_QUEUE_TIMEOUT=0)
+    def test_busy_when_no_hashing_slot(self):
+        from . import login
+
+        slots = login._hash_slots
+        acquired = 0
+        while slots.acquire(blocking=False):
+            acquired += 1
+        try:
+            response = self.login("CS2025001")
+        finally:
+            for _ in range(acquired):
+                slots.release()
+        self.assertEqual(response.status_code, 503)
@@ -1,79 +1,95 @@
+from django.conf import settings
 from django.urls import path
-from .views import (
-    RegisterUserView,UserLoginView,BookCreateView,BookUpdateView,
-    BookDeleteView,BookBulkDeleteView,ReturnBookView,
-    BookRequestCreateView,AvailableBooksAPIView,
-    StudentBookRequestsListView,AdminBorrowRecordsAPIView,
-    AdminUserListAPIView,AdminUserDetailAPIView,BookCopyDeleteAPIView,
-    AdminBookRequestsListView,StudentBorrowRecordsAPIView,LogoutView,
-    BookRequestUpdateStatusView,BookSearchView,AdminBookListView,
-    scanner_borrow_api,scanner_return_api,
-    RequestBookNotification,MyNotifications,EBookCreateView,
-    EBookDetailView,EBookListView,AddEBookBookmarkView,
-    DeleteEBookBookmarkView,StudentEBookBookmarksView,ReadingStreakAPI,
-    CreateLibraryEntryRequestView,
-    ListLibraryEntryRequestsView,
-    HandleLibraryEntryRequestView,
-     MyAttendanceHistoryView,
-    StudentAttendanceHistoryView
-    )
-from . import views
+from .views import lazy
+
+
+if settings.ASYNC_VIEWS:
+    from . import async_views
+
+
+def _read_view(sync_view, async_view):
+    """The async port under the ASGI profile (ASYNC_VIEWS), the DRF view otherwise."""
+    if settings.ASYNC_VIEWS:
+        return getattr(async_views, async_view).as_view()
+    return lazy(sync_view)
+
 
 urlpatterns = [
-    path('register/', RegisterUserView.as_view(), name='register'),
-    path('login/', UserLoginView.as_view(), name='user-login'),
+    path('register/', lazy("accounts.RegisterUserView"), name='register'),
+    path('login/', lazy("accounts.UserLoginView"), name='user-login'),
 
 
     #only admin
-    path('books/add/', BookCreateView.as_view(), name='add-book'),
-    path('books/<int:id>/update/', BookUpdateView.as_view(), name='book-update'),
-    path('books/<int:id>/delete/', BookDeleteView.as_view(), name='book-delete'),
-    path('books/bulk-delete/', BookBulkDeleteView.as_view(), name='book-bulk-delete'),
-    path("admin/books/", AdminBookListView.as_view(), name="admin-book-list"),
+    path('books/add/', lazy("books.BookCreateView"), name='add-book'),
+    path('books/<int:id>/update/', lazy("books.BookUpdateView"), name='book-update'),
+    path('books/<int:id>/delete/', lazy("books.BookDeleteView"), name='book-delete'),
+    path('books/bulk-delete/', lazy("books.BookBulkDeleteView"), name='book-bulk-delete'),
+    path("admin/books/", lazy("books.AdminBookListView"), name="admin-book-list"),
+    path("deletion-jobs/<int:pk>/", lazy("books.DeletionJobDetailView"), name="deletion-job-detail"),
+    path("admin/scheduler/jobs/", lazy("operations.ScheduledJobsView"), name="scheduler-jobs"),
+    path("admin/scheduler/runs/", lazy("operations.JobRunListView"), name="scheduler-runs"),
+    path("admin/metrics/", lazy("operations.RequestMetricsView"), name="request-metrics"),
     
-    path('book-copy/<int:pk>/delete/', BookCopyDeleteAPIView.as_view(), name='book-copy-delete'),
-    path('admin/book-requests/', AdminBookRequestsListView.as_view(), name='admin-book-requests'),
-    path('book-requests/<int:pk>/update-status/', BookRequestUpdateStatusView.as_view(), name='book-request-update-status'),
-    path('users/', AdminUserListAPIView.as_view(), name='admin-users-list'),
-    path('users/<int:pk>/', AdminUserDetailAPIView.as_view(), name='admin-users-detail'),
-    path('borrow-records/', AdminBorrowRecordsAPIView.as_view(), name='admin-borrow-records'),
-    path("borrow-record/<int:id>/return/", ReturnBookView.as_view(), name="return-book"),
+    path('book-copy/<int:pk>/delete/', lazy("books.BookCopyDeleteAPIView"), name='book-copy-delete'),
+    path('admin/book-requests/', lazy("book_requests.AdminBookRequestsListView"), name='admin-book-requests'),
+    path('admin/book-requests/pending/', lazy("book_requests.PendingBookRequestsView"), name='admin-book-requests-pending'),
+    path('admin/book-requests/bulk-action/', lazy("book_requests.BulkHandleBookRequestsView"), name='admin-book-requests-bulk'),
+    path('book-requests/<int:pk>/update-status/', lazy("book_requests.BookRequestUpdateStatusView"), name='book-request-update-status'),
+    path('users/', lazy("accounts.AdminUserListAPIView"), name='admin-users-list'),
+    path('users/<int:pk>/', lazy("accounts.AdminUserDetailAPIView"), name='admin-users-detail'),
+    path('users/bulk-register/', lazy("accounts.BulkRegisterStudentsView"), name='admin-users-bulk-register'),
+    path('borrow-records/', lazy("circulation.AdminBorrowRecordsAPIView"), name='admin-borrow-records'),
+    path("borrow-record/<int:id>/return/", lazy("circulation.ReturnBookView"), name="return-book"),
    
 
     #both students
-    path('my-book-requests/', StudentBookRequestsListView.as_view(), name='student-book-requests'),
-    path('book-requests/', BookRequestCreateView.as_view(), name='book-request-create'),
-    path('books/available/', AvailableBooksAPIView.as_view(), name='available-books'),
-    path('my-borrows/', StudentBorrowRecordsAPIView.as_view(), name='student-borrow-records'),
-    path("books/search/", BookSearchView.as_view(), name="book-search"),
-    path('notify-book/<int:book_id>/', RequestBookNotification.as_view(), name='request-book-notify'),
-    path('my-notifications/', MyNotifications.as_view(), name='my-notifications'),
+    path('my-book-requests/', lazy("book_requests.StudentBookRequestsListView"), name='student-book-requests'),
+    path('book-requests/', lazy("book_requests.BookRequestCreateView"), name='book-request-create'),
+    path('books/available/', _read_view("books.AvailableBooksAPIView", "AvailableBooksView"), name='available-books'),
+    path('my-borrows/', lazy("circulation.StudentBorrowRecordsAPIView"), name='student-borrow-records'),
+    path("books/search/", _read_view("books.BookSearchView", "BookSearchView"), name="book-search"),
+    path('notify-book/<int:book_id>/', lazy("circulation.RequestBookNotification"), name='request-book-notify'),
+    path('books/<int:book_id>/reserve/', lazy("reservations.ReserveBookView"), name='reserve-book'),
+    path('books/<int:book_id>/waitlist/', lazy("reservations.BookWaitlistView"), name='book-waitlist'),
+    path('my-reservations/', lazy("reservations.MyReservationsView"), name='my-reservations'),
+    path('reservations/<int:pk>/cancel/', lazy("reservations.CancelReservationView"), name='cancel-reservation'),
+    path('my-notifications/', _read_view("circulation.MyNotifications", "MyNotificationsView"), name='my-notifications'),
 
 
-    path('scanner-borrow/', scanner_borrow_api, name='scanner-borrow'),
-    path('scanner-return/', scanner_return_api, name='scanner-return'),
+    path('scanner-borrow/', lazy("circulation.scanner_borrow_api"), name='scanner-borrow'),
+    path('scanner-return/', lazy("circulation.scanner_return_api"), name='scanner-return'),
 
 
     # ebooks
-    path("ebooks/", EBookListView.as_view()),
-    path("ebooks/<int:id>/", EBookDetailView.as_view()),
-    path("ebooks/create/", EBookCreateView.as_view()),
+    path("ebooks/", _read_view("ebooks.EBookListView", "EBookListView")),
+    path("ebooks/<int:id>/", lazy("ebooks.EBookDetailView")),
+    path("ebooks/create/", lazy("ebooks.EBookCreateView")),
 
     # bookmarks
-    path("ebooks/bookmarks/add/", AddEBookBookmarkView.as_view()),
-    path("ebooks/bookmarks/", StudentEBookBookmarksView.as_view()),
-    path("ebooks/bookmarks/<int:id>/delete/", DeleteEBookBookmarkView.as_view()),
+    path("ebooks/bookmarks/add/", lazy("ebooks.AddEBookBookmarkView")),
+    path("ebooks/bookmarks/", lazy("ebooks.StudentEBookBookmarksView")),
+    path("ebooks/bookmarks/grouped/", lazy("ebooks.StudentEBookBookmarkGroupsView")),
+    path("ebooks/bookmarks/<int:id>/delete/", lazy("ebooks.DeleteEBookBookmarkView")),
 
 
-    path("reading-streak/", ReadingStreakAPI.as_view()),
+    path("reading-streak/", lazy("circulation.ReadingStreakAPI")),
 
-    path("entry-request/", CreateLibraryEntryRequestView.as_view()),
-    path("entry-requests/", ListLibraryEntryRequestsView.as_view()),
-    path("entry-request/<int:pk>/action/", HandleLibraryEntryRequestView.as_view()),
-    path("my-attendance/", MyAttendanceHistoryView.as_view()),
-    path("attendance/<int:student_id>/", StudentAttendanceHistoryView.as_view()),
+    path("entry-request/", lazy("attendance.CreateLibraryEntryRequestView")),
+    path("entry-requests/", lazy("attendance.ListLibraryEntryRequestsView")),
+    path("entry-request/<int:pk>/action/", lazy("attendance.HandleLibraryEntryRequestView")),
+    path("entry-requests/pending/", lazy("attendance.PendingLibraryEntryRequestsView")),
+    path("entry-requests/bulk-action/", lazy("attendance.BulkHandleLibraryEntryRequestsView")),
+    path("attendance/hourly/", lazy("attendance.AttendanceHourlyRollupView")),
+    path("kiosk/token/", lazy("attendance.KioskTokenView")),
+    path("kiosk/check-in/", lazy("attendance.KioskCheckInView")),
+    path("kiosk/check-out/", lazy("attendance.KioskCheckOutView")),
+    path("library/occupancy/", lazy("attendance.LibraryOccupancyView")),
+    path("my-attendance/", lazy("attendance.MyAttendanceHistoryView")),
+    path("attendance/<int:student_id>/", lazy("attendance.StudentAttendanceHistoryView")),
+    path("my-attendance/calendar/", lazy("attendance.MyAttendanceCalendarView")),
+    path("attendance/calendar/", lazy("attendance.AttendanceCalendarBatchView")),
 
 
 
-     path("logout/", LogoutView.as_view(), name="logout"),
+     path("logout/", lazy("accounts.LogoutView"), name="logout"),
 ]
\ No newline at end of file
@@ -1,17 +1,23 @@
-from datetime import date
-from .models import BorrowRecord
+from datetime import date, datetime, time
+from .models import BorrowRecord, LibraryAttendance, LibraryAttendanceHourlyRollup
+from .archive import student_borrow_dates
 from datetime import timedelta,timezone
+from django.db import transaction
 from django.db.models import Count
+from django.db.models.functions import ExtractHour
+from django.utils import timezone as dj_timezone
+from django.conf import settings
+from django.core.cache import cache
+import calendar
 
 def calculate_reading_streak(student):
-    records = BorrowRecord.objects.filter(
-        student=student
-    ).order_by("-borrow_date")
+    # Includes loans already moved to the archive table
+    borrow_dates = student_borrow_dates(student)
 
     months = set()
 
-    for r in records:
-        months.add((r.borrow_date.year, r.borrow_date.month))
+    for borrow_date in borrow_dates:
+        months.add((borrow_date.year, borrow_date.month))
 
     months = sorted(months, reverse=True)
 
@@ -66,4 +72,191 @@ def get_trending_books():
         .order_by("-total_borrows")[:10]
     )
 
-    return trending
\ No newline at end of file
+    return trending
+
+
+
+def day_bounds(day):
+    """
+    Return the [start, end) datetimes of a calendar day.
+    Filtering a DateTimeField on this range can use an index,
+    unlike request_date__date=day.
+    """
+    start = dj_timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def mark_students_present(student_ids, check_in_time=None):
+    """
+    Upsert today's LibraryAttendance rows as PRESENT for all given
+    students in a single INSERT ... ON CONFLICT statement.
+    Re-entry after a check-out clears check_out_time.
+    """
+    check_in_time = check_in_time or dj_timezone.now()
+    today = dj_timezone.localdate(check_in_time)
+
+    rows = [
+        LibraryAttendance(
+            student_id=student_id,
+            date=today,
+            status="PRESENT",
+            check_in_time=check_in_time,
+            check_out_time=None,
+        )
+        for student_id in set(student_ids)
+    ]
+    LibraryAttendance.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["student", "date"],
+        update_fields=["status", "check_in_time", "check_out_time"],
+    )
+    return len(rows)
+
+
+def refresh_hourly_headcount(day):
+    """
+    Recompute the per-hour headcount roll-up of a day from LibraryAttendance
+    with one grouped query and one upsert; hours left without attendance
+    lose their rows.
+    """
+    counts = (
+        LibraryAttendance.objects
+        .filter(date=day, status="PRESENT", check_in_time__isnull=False)
+        .annotate(hour=ExtractHour("check_in_time"))
+        .values("hour")
+        .annotate(headcount=Count("id"))
+    )
+
+    rows = [
+        LibraryAttendanceHourlyRollup(date=day, hour=row["hour"], headcount=row["headcount"])
+        for row in counts
+    ]
+    with transaction.atomic():
+        LibraryAttendanceHourlyRollup.objects.filter(date=day).exclude(hour__in=[row.hour for row in rows]).delete()
+        LibraryAttendanceHourlyRollup.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["date", "hour"],
+            update_fields=["headcount"],
+        )
+    return rows
+
+
+
+MAX_CALENDAR_MONTHS = 12
+
+
+def parse_month(value):
+    """'2025-09' -> (2025, 9)"""
+    year, month = value.split("-")
+    year, month = int(year), int(month)
+    if not 1 <= year <= 9999:
+        raise ValueError("year must be 1-9999")
+    if not 1 <= month <= 12:
+        raise ValueError("month must be 1-12")
+    return year, month
+
+
+def month_range(start, end):
+    """All (year, month) pairs from start to end inclusive."""
+    if end < start:
+        raise ValueError("'to' month is before 'from' month")
+    months = []
+    year, month = start
+    while (year, month) <= end:
+        months.append((year, month))
+        month += 1
+        if month == 13:
+            month = 1
+            year += 1
+    if len(months) > MAX_CALENDAR_MONTHS:
+        raise ValueError(f"At most {MAX_CALENDAR_MONTHS} months per request")
+    return months
+
+
+def _bitmap_cache_key(student_id, year, month):
+    return f"attendance:bitmap:{student_id}:{year:04d}-{month:02d}"
+
+
+def attendance_bitmaps(student_ids, months):
+    """
+    Presence bitmaps per student per month: bit (day - 1) is set when the
+    student was PRESENT that day. Returns {student_id: {(year, month): bitmap}}.
+
+    Past months never change, so they are cached forever per (student, month).
+    Everything not in the cache is loaded with a single query over the
+    (student, date) unique index.
+    """
+    today = dj_timezone.localdate()
+    current = (today.year, today.month)
+
+    keys = {
+        (student_id, ym): _bitmap_cache_key(student_id, *ym)
+        for student_id in student_ids
+        for ym in months
+    }
+    cached = cache.get_many(keys.values())
+
+    result = {student_id: {} for student_id in student_ids}
+    missing = set()
+    for (student_id, ym), key in keys.items():
+        if key in cached:
+            result[student_id][ym] = cached[key]
+        else:
+            result[student_id][ym] = 0
+            missing.add((student_id, ym))
+
+    if missing:
+        first = min(ym for _, ym in missing)
+        last = max(ym for _, ym in missing)
+        start = date(first[0], first[1], 1)
+        end = date(last[0], last[1], calendar.monthrange(*last)[1])
+
+        rows = LibraryAttendance.objects.filter(
+            student_id__in={student_id for student_id, _ in missing},
+            date__gte=start,
+            date__lte=end,
+            status="PRESENT",
+        ).values_list("student_id", "date")
+
+        for student_id, day in rows:
+            ym = (day.year, day.month)
+            if (student_id, ym) in missing:
+                result[student_id][ym] |= 1 << (day.day - 1)
+
+        cache.set_many(
+            {keys[item]: result[item[0]][item[1]] for item in missing if item[1] < current},
+            timeout=None,
+        )
+
+    return result
+
+
+def attendance_calendar(student_id, bitmaps):
+    """Compact JSON shape for one student's calendar."""
+    months = []
+    for (year, month), bitmap in sorted(bitmaps.items()):
+        months.append({
+            "month": f"{year:04d}-{month:02d}",
+            "days_in_month": calendar.monthrange(year, month)[1],
+            "bitmap": bitmap,
+            "present_days": bin(bitmap).count("1"),
+        })
+    return {
+        "student_id": student_id,
+        "months": months,
+        "total_present_days": sum(m["present_days"] for m in months),
+    }
+
+
+# Cache backends whose entries only the current process sees
+_PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def cache_is_shared(alias="default"):
+    """Whether every worker process reads and writes the same entries in this cache."""
+    return settings.CACHES[alias]["BACKEND"] not in _PROCESS_LOCAL_CACHES
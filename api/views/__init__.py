@@ -0,0 +1,60 @@
+"""
+API views, one module per domain:
+
+    accounts       registration, login/logout, admin user directory
+    attendance     entry requests, kiosk, occupancy, attendance history
+    book_requests  student book requests and admin approval
+    books          catalog management, listing and search
+    circulation    scanner borrow/return, returns, borrow records, notifications
+    ebooks         e-books and bookmarks
+    operations     scheduler status and request metrics
+    reservations   waitlist
+
+The URLconf refers to views as lazy("module.Name"), so a worker imports a
+domain (and the serializers and helpers it needs) only when a request for
+it arrives. preload() imports everything up front for servers that fork
+workers from a warm master (gunicorn.conf.py). `from api.views import X`
+keeps working.
+"""
+from importlib import import_module
+
+DOMAINS = (
+    "accounts", "attendance", "book_requests", "books", "circulation", "ebooks", "operations", "reservations",
+)
+
+
+def lazy(target):
+    """URLconf entry for the view "module.Name" in this package, imported on its first request."""
+    module_name, name = target.rsplit(".", 1)
+    resolved = None
+
+    def view(request, *args, **kwargs):
+        nonlocal resolved
+        if resolved is None:
+            obj = getattr(import_module(f"{__name__}.{module_name}"), name)
+            # Class-based views need as_view(); @api_view functions are views already
+            resolved = obj.as_view() if isinstance(obj, type) else obj
+        return resolved(request, *args, **kwargs)
+
+    # Like every DRF view
+    view.csrf_exempt = True
+    view.__name__ = view.__qualname__ = name
+    view.__module__ = f"{__name__}.{module_name}"
+    return view
+
+
+def preload():
+    """Build the URLconf and import every view module (call before forking workers)."""
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    for domain in DOMAINS:
+        import_module(f"{__name__}.{domain}")
+
+
+def __getattr__(name):
+    for domain in DOMAINS:
+        module = import_module(f"{__name__}.{domain}")
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
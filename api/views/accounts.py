@@ -0,0 +1,212 @@
+"""Registration, login/logout and the admin user directory."""
+import math
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..authentication import LibraryRefreshToken
+from ..login import LoginBusy, authenticate_credentials, check_login_rate, client_ip
+from ..models import BorrowRecord, CustomUser, DeletionJob, LibraryAttendance
+from ..onboarding import bulk_register_students, parse_student_rows, shared_pool
+from ..pagination import AdminUserDirectoryPagination
+from ..permissions import IsAdminUser
+from ..revocation import revocation_list
+from ..serializers import AdminUserDirectorySerializer, UserRegisterSerializer, UserSerializer
+from .helpers import is_true, start_deletion
+
+
+class RegisterUserView(generics.CreateAPIView):
+    queryset = CustomUser.objects.all()
+    serializer_class = UserRegisterSerializer
+
+
+class UserLoginView(APIView):
+    def post(self, request):
+        username = request.data.get("username")   # roll_no for students, username for admins
+        password = request.data.get("password")
+
+        if not isinstance(username, str) or not isinstance(password, str) or not username or not password:
+            return Response(
+                {"error": "Username and password are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        retry_after = check_login_rate(username, client_ip(request))
+        if retry_after:
+            return Response(
+                {"error": "Too many login attempts. Try again later."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+        try:
+            user = authenticate_credentials(request, username, password)
+        except LoginBusy as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"},
+            )
+
+        if user is None:
+            return Response(
+                {"error": "Invalid credentials"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        # generate JWT tokens
+        refresh = LibraryRefreshToken.for_user(user)
+
+        return Response(
+            {
+                "message": "Login successful",
+                "role": user.role,
+                "username": user.username,
+                "access": str(refresh.access_token),
+                "refresh": str(refresh),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+# List all users
+class AdminUserListAPIView(generics.ListAPIView):
+    """
+    Paginated user directory with loan/fine/attendance summaries.
+    Filters: ?role=MEMBER&is_active=true&username=CS2025 (prefix)
+    Summary columns are correlated subqueries, so each page is one query.
+    """
+    serializer_class = AdminUserDirectorySerializer
+    permission_classes = [IsAdminUser]  # Only admins can access
+    pagination_class = AdminUserDirectoryPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        users = CustomUser.objects.all()
+
+        if params.get("role"):
+            users = users.filter(role=params["role"].upper())
+        if params.get("is_active") in ("true", "false"):
+            users = users.filter(is_active=params["is_active"] == "true")
+        if params.get("username"):
+            users = users.filter(username__startswith=params["username"])
+
+        open_loans = BorrowRecord.objects.filter(student=OuterRef("pk"), returned=False)
+        last_attendance = LibraryAttendance.objects.filter(student=OuterRef("pk"), status="PRESENT").order_by("-date")
+
+        return users.annotate(
+            open_loans=Coalesce(
+                Subquery(open_loans.values("student").annotate(c=Count("id")).values("c")),
+                0,
+            ),
+            # Fines on books not yet returned
+            outstanding_fine=Coalesce(
+                Subquery(open_loans.values("student").annotate(total=Sum("fine")).values("total")),
+                Value(Decimal("0.00")),
+                output_field=DecimalField(max_digits=8, decimal_places=2),
+            ),
+            last_attendance=Subquery(last_attendance.values("date")[:1]),
+        ).order_by("id")
+
+
+class BulkRegisterStudentsView(APIView):
+    """
+    Admin: register many students at once.
+    JSON: { "students": [{"username": "CS2025001", "password": "..."}, "CS2025002"], "default_password": "..." }
+    or a multipart "file" (.csv with username/roll_no,password columns, or .json)
+    Returns a per-row report. Up to BULK_REGISTER_MAX_ROWS students, hashed on
+    the shared onboarding pool; larger lists go through the
+    bulk_register_students command.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        try:
+            if upload:
+                fmt = "json" if upload.name.lower().endswith(".json") else "csv"
+                rows = parse_student_rows(upload.read().decode("utf-8-sig"), fmt)
+            else:
+                rows = parse_student_rows(request.data.get("students", []), "json")
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({"error": f"Could not parse input: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not rows:
+            return Response({"error": "No students provided."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.BULK_REGISTER_MAX_ROWS:
+            return Response(
+                {"error": f"At most {settings.BULK_REGISTER_MAX_ROWS} students per request; "
+                          "use the bulk_register_students command for larger lists."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        workers = settings.BULK_REGISTER_WORKERS
+        result = bulk_register_students(
+            rows,
+            default_password=request.data.get("default_password"),
+            workers=workers,
+            pool=shared_pool() if workers > 1 else None,
+        )
+        created = result["summary"].get("created", 0)
+        return Response(result, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+# Update or Delete a user
+class AdminUserDetailAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get_object(self, pk):
+        try:
+            return CustomUser.objects.get(pk=pk)
+        except CustomUser.DoesNotExist:
+            return None
+
+    def put(self, request, pk):
+        user = self.get_object(pk)
+        if not user:
+            return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+        serializer = UserSerializer(user, data=request.data, partial=True)  # partial=True allows partial updates
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk):
+        """?mode=archive deactivates instead of deleting; ?async=true runs in the background."""
+        if not CustomUser.objects.filter(pk=pk).exists():
+            return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        counts, response = start_deletion(
+            request,
+            DeletionJob.KIND_USER,
+            [int(pk)],
+            request.query_params.get("mode"),
+            is_true(request.query_params.get("async")),
+        )
+        if response:
+            return response
+        return Response({"detail": "User deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
+
+
+class LogoutView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        try:
+            refresh_token = request.data.get("refresh")
+            if refresh_token is None:
+                return Response({"error": "Refresh token required"}, status=status.HTTP_400_BAD_REQUEST)
+
+            token = RefreshToken(refresh_token)
+            # invalidate the refresh token and the access token used for this call
+            revocation_list.revoke([t for t in (token, request.auth) if t is not None])
+            return Response({"message": "Successfully logged out"}, status=status.HTTP_205_RESET_CONTENT)
+
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,354 @@
+"""Library entry requests, kiosk check-in/out, occupancy and attendance history."""
+from datetime import date
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..approvals import MAX_BATCH as MAX_BULK_REQUESTS
+from ..db_routing import ReplicaReadMixin
+from ..kiosk import (IsKioskDevice, InvalidKioskToken, issue_checkin_token,
+                     kiosk_check_in, kiosk_check_out, read_checkin_token)
+from ..models import LibraryAttendance, LibraryAttendanceHourlyRollup, LibraryEntryRequest
+from ..occupancy import (current_occupancy, is_inside, record_entries, record_exit, remaining_capacity,
+                         students_inside)
+from ..pagination import EntryRequestQueuePagination
+from ..permissions import IsAdminUser
+from ..serializers import (LibraryAttendanceHourlyRollupSerializer, LibraryAttendanceSerializer,
+                           LibraryEntryRequestSerializer)
+from ..utils import (attendance_bitmaps, attendance_calendar, day_bounds, mark_students_present,
+                     month_range, parse_month, refresh_hourly_headcount)
+
+
+class CreateLibraryEntryRequestView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        # Prevent multiple requests per day (optional but recommended)
+        start, end = day_bounds(timezone.localdate())
+        existing = LibraryEntryRequest.objects.filter(
+            student=request.user,
+            request_date__gte=start,
+            request_date__lt=end
+        ).exists()
+
+        if existing:
+            return Response(
+                {"error": "You already requested today."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entry_request = LibraryEntryRequest.objects.create(
+            student=request.user
+        )
+
+        serializer = LibraryEntryRequestSerializer(entry_request)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ListLibraryEntryRequestsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        requests = LibraryEntryRequest.objects.select_related("student").order_by("-request_date")
+        serializer = LibraryEntryRequestSerializer(requests, many=True)
+        return Response(serializer.data)
+
+
+class HandleLibraryEntryRequestView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, pk):
+        try:
+            entry_request = LibraryEntryRequest.objects.get(id=pk)
+        except LibraryEntryRequest.DoesNotExist:
+            return Response({"error": "Request not found"}, status=404)
+
+        action = request.data.get("action")  # "approve" or "reject"
+
+        if action == "approve":
+            if remaining_capacity() == 0 and not is_inside(entry_request.student_id):
+                return Response({"error": "Library is at full capacity."}, status=status.HTTP_409_CONFLICT)
+
+            entry_request.status = "APPROVED"
+            entry_request.save()
+
+            # Create attendance record
+            mark_students_present([entry_request.student_id])
+            record_entries([entry_request.student_id])
+            refresh_hourly_headcount(timezone.localdate())
+
+            return Response({"message": "Approved & marked PRESENT"})
+
+        elif action == "reject":
+            entry_request.status = "REJECTED"
+            entry_request.admin_comment = request.data.get("comment", "")
+            entry_request.save()
+
+            return Response({"message": "Request rejected"})
+
+        return Response({"error": "Invalid action"}, status=400)
+
+
+# -----------------------------
+# Kiosk: self-service QR check-in / check-out at the gate
+# -----------------------------
+class KioskTokenView(APIView):
+    """Student fetches a short-lived signed token to display as a QR code."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != "MEMBER":
+            return Response({"error": "Only members can use the library gate."}, status=status.HTTP_403_FORBIDDEN)
+        return Response({
+            "token": issue_checkin_token(request.user),
+            "expires_in": settings.KIOSK_TOKEN_MAX_AGE,
+        })
+
+
+class KioskCheckInView(APIView):
+    permission_classes = [IsKioskDevice]
+
+    def post(self, request):
+        try:
+            student_id, nonce = read_checkin_token(request.data.get("token", ""))
+        except InvalidKioskToken as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if remaining_capacity() == 0 and not is_inside(student_id):
+            return Response({"error": "Library is at full capacity."}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            check_in_time = kiosk_check_in(student_id, nonce)
+        except InvalidKioskToken as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            return Response({"error": "Student not found."}, status=status.HTTP_404_NOT_FOUND)
+        record_entries([student_id])
+
+        return Response({
+            "message": "Checked in",
+            "student_id": student_id,
+            "check_in_time": check_in_time,
+        })
+
+
+class KioskCheckOutView(APIView):
+    permission_classes = [IsKioskDevice]
+
+    def post(self, request):
+        try:
+            student_id, nonce = read_checkin_token(request.data.get("token", ""))
+            check_out_time = kiosk_check_out(student_id, nonce)
+        except InvalidKioskToken as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if check_out_time is None:
+            return Response({"error": "Student is not checked in."}, status=status.HTTP_400_BAD_REQUEST)
+        record_exit(student_id)
+
+        return Response({
+            "message": "Checked out",
+            "student_id": student_id,
+            "check_out_time": check_out_time,
+        })
+
+
+class LibraryOccupancyView(APIView):
+    """
+    How many students are inside right now, without authentication, so
+    displays can poll it. Served from the shared cache, or without one from
+    the worker's snapshot, which costs one query per OCCUPANCY_LOCAL_TTL.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        return Response({
+            "date": timezone.localdate(),
+            "occupancy": current_occupancy(),
+            "capacity": settings.LIBRARY_CAPACITY or None,
+            "remaining": remaining_capacity(),
+        })
+
+
+class PendingLibraryEntryRequestsView(generics.ListAPIView):
+    """Admin queue of PENDING entry requests, oldest first, cursor-paginated."""
+    serializer_class = LibraryEntryRequestSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = EntryRequestQueuePagination
+
+    def get_queryset(self):
+        return LibraryEntryRequest.objects.filter(status="PENDING").select_related("student")
+
+
+class BulkHandleLibraryEntryRequestsView(APIView):
+    """
+    Approve or reject many entry requests at once.
+    Accepts either explicit IDs or every pending request made today:
+    { "action": "approve", "ids": [1, 2, 3] }
+    { "action": "reject", "all_pending_today": true, "comment": "Library closed" }
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        action = request.data.get("action")
+        ids = request.data.get("ids") or []
+        all_pending_today = request.data.get("all_pending_today", False)
+
+        if action not in ("approve", "reject"):
+            return Response({"error": "Invalid action"}, status=400)
+        if not all_pending_today:
+            if not ids:
+                return Response({"error": "Provide ids or all_pending_today."}, status=400)
+            if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+                return Response({"error": "ids must be a non-empty list of request IDs."}, status=400)
+            if len(ids) > MAX_BULK_REQUESTS:
+                return Response({"error": f"At most {MAX_BULK_REQUESTS} requests per call."}, status=400)
+
+        pending = LibraryEntryRequest.objects.filter(status="PENDING")
+        if all_pending_today:
+            start, end = day_bounds(timezone.localdate())
+            pending = pending.filter(request_date__gte=start, request_date__lt=end)
+        else:
+            pending = pending.filter(id__in=ids)
+
+        with transaction.atomic():
+            rows = list(pending.select_for_update().order_by("request_date").values_list("id", "student_id"))
+            fetched_ids = [request_id for request_id, _ in rows]
+
+            if action == "approve":
+                # Admit oldest requests first while there is room; the rest stay PENDING
+                remaining = remaining_capacity()
+                if remaining is not None:
+                    already_inside = students_inside([student_id for _, student_id in rows])
+                    admitted = []
+                    for row in rows:
+                        if row[1] in already_inside:
+                            admitted.append(row)
+                        elif remaining > 0:
+                            admitted.append(row)
+                            remaining -= 1
+                    rows = admitted
+
+            request_ids = [request_id for request_id, _ in rows]
+
+            if action == "approve":
+                LibraryEntryRequest.objects.filter(id__in=request_ids).update(status="APPROVED")
+                mark_students_present([student_id for _, student_id in rows])
+            else:
+                LibraryEntryRequest.objects.filter(id__in=request_ids).update(
+                    status="REJECTED",
+                    admin_comment=request.data.get("comment", ""),
+                )
+
+        if action == "approve" and rows:
+            record_entries([student_id for _, student_id in rows])
+            refresh_hourly_headcount(timezone.localdate())
+
+        processed = set(request_ids)
+        skipped = [i for i in (ids or fetched_ids) if i not in processed]
+        return Response({
+            "message": f"{len(request_ids)} request(s) {'approved' if action == 'approve' else 'rejected'}.",
+            "processed_ids": request_ids,
+            "skipped_ids": skipped,
+        })
+
+
+class AttendanceHourlyRollupView(ReplicaReadMixin, APIView):
+    """Per-hour headcount for a day (?date=YYYY-MM-DD, defaults to today)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        day = request.query_params.get("date")
+        try:
+            day = date.fromisoformat(day) if day else timezone.localdate()
+        except ValueError:
+            return Response({"error": "date must be YYYY-MM-DD"}, status=400)
+
+        if request.query_params.get("refresh") == "true" or day == timezone.localdate():
+            refresh_hourly_headcount(day)
+
+        rows = LibraryAttendanceHourlyRollup.objects.filter(date=day).order_by("hour")
+        serializer = LibraryAttendanceHourlyRollupSerializer(rows, many=True)
+        return Response(serializer.data)
+
+
+
+class MyAttendanceHistoryView(ReplicaReadMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        records = LibraryAttendance.objects.filter(
+            student=request.user
+        ).select_related("student").order_by("-date")
+
+        serializer = LibraryAttendanceSerializer(records, many=True)
+        return Response(serializer.data)
+
+class StudentAttendanceHistoryView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, student_id):
+        records = LibraryAttendance.objects.filter(
+            student_id=student_id
+        ).select_related("student").order_by("-date")
+
+        serializer = LibraryAttendanceSerializer(records, many=True)
+        return Response(serializer.data)
+
+
+def _calendar_months(request):
+    """Month range from ?from=YYYY-MM&to=YYYY-MM (both default to the current month)."""
+    today = timezone.localdate()
+    current = f"{today.year:04d}-{today.month:02d}"
+    start = parse_month(request.query_params.get("from", current))
+    end = parse_month(request.query_params.get("to", current))
+    return month_range(start, end)
+
+
+class MyAttendanceCalendarView(ReplicaReadMixin, APIView):
+    """
+    Student's attendance as one presence bitmap per month
+    (bit 0 = day 1), for calendar heatmaps and term totals.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            months = _calendar_months(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        bitmaps = attendance_bitmaps([request.user.id], months)
+        return Response(attendance_calendar(request.user.id, bitmaps[request.user.id]))
+
+
+class AttendanceCalendarBatchView(ReplicaReadMixin, APIView):
+    """
+    Admin: attendance bitmaps for many students at once.
+    ?students=1,2,3&from=2025-06&to=2025-10
+    """
+    permission_classes = [IsAdminUser]
+    max_students = 500
+
+    def get(self, request):
+        try:
+            months = _calendar_months(request)
+            student_ids = [int(i) for i in request.query_params.get("students", "").split(",") if i]
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not student_ids:
+            return Response({"error": "students is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(student_ids) > self.max_students:
+            return Response(
+                {"error": f"At most {self.max_students} students per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        bitmaps = attendance_bitmaps(student_ids, months)
+        return Response([attendance_calendar(student_id, bitmaps[student_id]) for student_id in bitmaps])
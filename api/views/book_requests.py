@@ -0,0 +1,218 @@
+"""Book requests: students ask for a copy, admins approve or reject."""
+from rest_framework import generics, permissions, serializers, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..approvals import MAX_BATCH as MAX_BULK_REQUESTS, bulk_handle_book_requests
+from ..models import BookRequest, BorrowRecord
+from ..pagination import BookRequestQueuePagination
+from ..permissions import IsAdminUser
+from ..reservations import fulfil_hold, hold_for
+from ..serializers import BookRequestSerializer
+
+
+# -----------------------------
+# Student: Request a book copy
+# -----------------------------
+class BookRequestCreateView(generics.CreateAPIView):
+    queryset = BookRequest.objects.all()
+    serializer_class = BookRequestSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_create(self, serializer):
+        book_copy = serializer.validated_data['book_copy']
+
+        # Check if the copy is already borrowed
+        if BorrowRecord.objects.filter(book_copy=book_copy, returned=False).exists():
+            raise serializers.ValidationError("This copy is already borrowed.")
+
+        # Check if the copy is on hold for someone else
+        hold = hold_for(book_copy)
+        if hold and hold.student_id != self.request.user.id:
+            raise serializers.ValidationError("This copy is on hold for another student.")
+
+        # Set current user as student
+        serializer.save(student=self.request.user)
+
+
+# -----------------------------
+# Student: List their own requests
+# -----------------------------
+class StudentBookRequestsListView(generics.ListAPIView):
+    serializer_class = BookRequestSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return BookRequest.objects.filter(student=self.request.user).select_related('book_copy__book').order_by('-request_date')
+
+
+# -----------------------------
+# Admin: List all pending requests
+# -----------------------------
+class AdminBookRequestsListView(generics.ListAPIView):
+    serializer_class = BookRequestSerializer
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        return BookRequest.objects.select_related('book_copy__book').order_by('-request_date')
+
+
+# -----------------------------
+# Admin: Pending request queue and bulk approve/reject
+# -----------------------------
+class PendingBookRequestsView(generics.ListAPIView):
+    """PENDING book requests, oldest first, cursor-paginated."""
+    serializer_class = BookRequestSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = BookRequestQueuePagination
+
+    def get_queryset(self):
+        return BookRequest.objects.filter(status="PENDING").select_related("book_copy__book")
+
+
+class BulkHandleBookRequestsView(APIView):
+    """
+    Approve or reject many book requests in one transaction:
+    { "action": "approve", "ids": [1, 2, 3], "comment": "" }
+    Requests are approved oldest first while copies last; each id gets a result.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        action = request.data.get("action")
+        ids = request.data.get("ids") or []
+
+        if action not in ("approve", "reject"):
+            return Response({"error": "Invalid action"}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids) or not ids:
+            return Response({"error": "ids must be a non-empty list of request IDs."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > MAX_BULK_REQUESTS:
+            return Response(
+                {"error": f"At most {MAX_BULK_REQUESTS} requests per call."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = bulk_handle_book_requests(ids, action, request.data.get("comment", ""))
+        summary = {}
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        return Response({"summary": summary, "results": results}, status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# Admin: Approve or reject a request
+# -----------------------------
+class BookRequestUpdateStatusView(generics.UpdateAPIView):
+    queryset = BookRequest.objects.all()
+    serializer_class = BookRequestSerializer
+    permission_classes = [IsAdminUser]
+    http_method_names = ['patch']  # only allow PATCH
+
+    def patch(self, request, *args, **kwargs):
+        instance = self.get_object()
+        status_value = request.data.get('status')
+        admin_comment = request.data.get('admin_comment', '')
+
+        if status_value not in ['APPROVED', 'REJECTED']:
+            return Response(
+                {"error": "Status must be APPROVED or REJECTED."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Approve
+        if status_value == 'APPROVED':
+            # Check available copies
+            book_copy = instance.book_copy
+            book = book_copy.book
+            hold = hold_for(book_copy)
+            if hold and hold.student_id != instance.student_id:
+                return Response(
+                    {"error": "This copy is on hold for another student."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not hold and book.available_copies < 1:
+                return Response(
+                    {"error": "No available copies to borrow."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Create BorrowRecord
+            BorrowRecord.objects.create(student=instance.student, book_copy=book_copy)
+
+            # Decrease available copies (a held copy was already taken off the shelf)
+            if hold:
+                fulfil_hold(hold)
+            else:
+                book.available_copies -= 1
+                book.save()
+
+        # Update request status
+        instance.status = status_value
+        instance.admin_comment = admin_comment
+        instance.save()
+
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+
+class ApproveBookRequestView(generics.UpdateAPIView):
+    queryset = BookRequest.objects.all()
+    serializer_class = BookRequestSerializer
+    permission_classes = [permissions.IsAuthenticated]  # Only admins should access
+    lookup_field = 'id'
+
+    def patch(self, request, *args, **kwargs):
+        book_request = self.get_object()
+
+        # Only admins can approve
+        if request.user.role != "ADMIN":
+            return Response(
+                {"error": "Only admins can approve requests."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if book_request.status != "PENDING":
+            return Response(
+                {"error": "This request has already been processed."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Check if the book copy is still available
+        hold = hold_for(book_request.book_copy)
+        if hold and hold.student_id != book_request.student_id:
+            return Response(
+                {"error": "This copy is on hold for another student."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not hold and book_request.book_copy.book.available_copies < 1:
+            return Response(
+                {"error": "No copies available to borrow."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Create BorrowRecord
+        BorrowRecord.objects.create(
+            student=book_request.student,
+            book_copy=book_request.book_copy
+        )
+
+        # Decrease available copies (a held copy was already taken off the shelf)
+        book = book_request.book_copy.book
+        if hold:
+            fulfil_hold(hold)
+        else:
+            book.available_copies -= 1
+            book.save()
+
+        # Save details for response before deletion
+        response_data = {
+            "message": "Book request approved and moved to borrow records.",
+            "student": book_request.student.username,
+            "book": book_request.book_copy.book.title,
+            "accession_no": book_request.book_copy.accession_no,
+        }
+
+        # ✅ Delete the BookRequest after approval
+        book_request.delete()
+
+        return Response(response_data, status=status.HTTP_200_OK)
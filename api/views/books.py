@@ -0,0 +1,262 @@
+"""Catalog: adding, updating and deleting books and copies, listing and search."""
+from rest_framework import generics, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..catalog_cache import catalog_cached
+from ..db_routing import ReplicaReadMixin
+from ..fast_lists import FastListMixin, serialize_list
+from ..models import Book, BookCopy, DeletionJob
+from ..permissions import IsAdminUser
+from ..serializers import BookSerializer, DeletionJobSerializer
+from .helpers import is_true, start_deletion
+
+
+class BookCreateView(generics.CreateAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAdminUser]
+
+    def generate_accession_no(self):
+        """Generate a unique accession number across all books"""
+        total_copies = BookCopy.objects.count() + 1
+        return f"ACC{total_copies:05d}"  # e.g., ACC00001, ACC00002 ...
+
+    def create(self, request, *args, **kwargs):
+        isbn = request.data.get("isbn")
+        existing_book = Book.objects.filter(isbn=isbn).first()
+
+        if existing_book:
+            # If book already exists → just add ONE new copy
+            accession_no = self.generate_accession_no()
+            BookCopy.objects.create(book=existing_book, accession_no=accession_no)
+
+            # Update book counts
+            existing_book.total_copies += 1
+            existing_book.available_copies += 1
+            existing_book.save()
+
+            serializer = self.get_serializer(existing_book)
+            return Response(
+                {
+                    "message": "Existing book found. Added a new copy.",
+                    "book": serializer.data,
+                    "new_accession_no": accession_no,
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        # New book → create it + user-defined copies
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        book = serializer.save()
+
+        # Get requested copies (default 1 if not provided)
+        total_copies = int(request.data.get("total_copies", 1))
+        available_copies = int(request.data.get("available_copies", total_copies))
+
+        # Create BookCopy objects for each copy
+        accession_numbers = []
+        for _ in range(total_copies):
+            accession_no = self.generate_accession_no()
+            accession_numbers.append(accession_no)
+            BookCopy.objects.create(book=book, accession_no=accession_no)
+
+        # Update counts
+        book.total_copies = total_copies
+        book.available_copies = available_copies
+        book.save()
+
+        return Response(
+            {
+                "message": f"New book created with {total_copies} copies.",
+                "book": serializer.data,
+                "accession_numbers": accession_numbers,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+# ---------------- Update book (PUT/PATCH)
+class BookUpdateView(generics.RetrieveUpdateAPIView):
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAdminUser]
+    lookup_field = 'id'
+
+    def generate_accession_no(self):
+        """Generate a guaranteed unique accession number"""
+        last_copy = BookCopy.objects.order_by("-id").first()
+        if last_copy and last_copy.accession_no.startswith("ACC"):
+            try:
+                last_num = int(last_copy.accession_no.replace("ACC", ""))
+            except ValueError:
+                last_num = BookCopy.objects.count()
+            next_num = last_num + 1
+        else:
+            next_num = 1
+        return f"ACC{next_num:05d}"
+
+    def update(self, request, *args, **kwargs):
+        book = self.get_object()
+        old_total = book.total_copies
+        old_available = book.available_copies
+
+        serializer = self.get_serializer(book, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+
+        new_total = serializer.validated_data.get("total_copies", old_total)
+
+        # Block decreasing copies
+        if new_total < old_total:
+            return Response(
+                {"warning": "You cannot decrease total copies. Only increasing is allowed."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        book = serializer.save()
+
+        # Add missing copies
+        if new_total > old_total:
+            copies_to_add = new_total - old_total
+            new_copies = []
+            for _ in range(copies_to_add):
+                accession_no = self.generate_accession_no()
+                new_copies.append(BookCopy(book=book, accession_no=accession_no))
+
+            BookCopy.objects.bulk_create(new_copies)
+
+            book.available_copies = old_available + copies_to_add
+            book.save()
+
+        return Response(self.get_serializer(book).data)
+
+
+# ---------------- Delete single book
+class BookDeleteView(generics.DestroyAPIView):
+    """
+    ?mode=archive keeps the book's copies and borrow history but hides it
+    from the catalog; ?async=true runs the job in the background.
+    """
+    queryset = Book.objects.all()
+    permission_classes = [IsAdminUser]
+    lookup_field = 'id'
+
+    def destroy(self, request, *args, **kwargs):
+        book = self.get_object()
+        counts, response = start_deletion(
+            request,
+            DeletionJob.KIND_BOOK,
+            [book.id],
+            request.query_params.get("mode"),
+            is_true(request.query_params.get("async")),
+        )
+        return response or Response(status=status.HTTP_204_NO_CONTENT)
+
+# ---------------- Bulk delete books
+class BookBulkDeleteView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        """
+        Accepts JSON array of book IDs to delete:
+        { "ids": [1, 2, 5] }
+        Optional: "mode": "archive" to keep circulation history,
+        "async": true to run in the background (poll deletion-jobs/<id>/).
+        """
+        ids = request.data.get('ids', [])
+        if not ids:
+            return Response({"error": "No book IDs provided."}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = list(Book.objects.filter(id__in=ids).values_list("id", flat=True))
+        mode = request.data.get("mode") or "delete"
+        counts, response = start_deletion(
+            request,
+            DeletionJob.KIND_BOOK,
+            ids,
+            mode,
+            is_true(request.data.get("async", False)),
+        )
+        if response:
+            return response
+
+        verb = "archived" if mode.lower() == "archive" else "deleted"
+        return Response(
+            {"message": f"{counts.get(Book._meta.label, 0)} book(s) {verb} successfully.", "rows": counts},
+            status=status.HTTP_200_OK
+        )
+
+
+class DeletionJobDetailView(generics.RetrieveAPIView):
+    queryset = DeletionJob.objects.all()
+    serializer_class = DeletionJobSerializer
+    permission_classes = [IsAdminUser]
+
+
+class AvailableBooksAPIView(ReplicaReadMixin, FastListMixin, APIView):
+    @catalog_cached("available_books")
+    def get(self, request):
+        books = BookSerializer.prefetch(Book.objects.filter(is_archived=False))  # only available books
+        return Response(serialize_list(BookSerializer, books, {'request': request}), status=status.HTTP_200_OK)
+
+
+class BookCopyDeleteAPIView(APIView):
+    permission_classes = [IsAdminUser]  # Only admins can delete
+
+    def delete(self, request, pk):
+        try:
+            book_copy = BookCopy.objects.get(pk=pk)
+            book = book_copy.book  # Related book
+        except BookCopy.DoesNotExist:
+            return Response({"detail": "Book copy not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        # Delete the copy
+        book_copy.delete()
+
+        # Update book's total and available copies
+        if book.total_copies > 0:
+            book.total_copies -= 1
+
+        if book.available_copies > 0:
+            book.available_copies -= 1
+
+        book.save()
+
+        return Response({"detail": "Book copy deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
+
+
+class BookSearchView(ReplicaReadMixin, FastListMixin, generics.ListAPIView):
+    serializer_class = BookSerializer
+
+    @catalog_cached("book_search")
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = Book.objects.filter(available_copies__gt=0, is_archived=False)  # ✅ only books with available copies
+
+        query = self.request.query_params.get("q", None)
+        if query:
+            queryset = queryset.filter(
+                title__icontains=query
+            ) | queryset.filter(
+                author__icontains=query
+            ) | queryset.filter(
+                category__icontains=query
+            ) | queryset.filter(
+                isbn__icontains=query
+            ) | queryset.filter(
+                publisher__icontains=query
+            )
+
+        return BookSerializer.prefetch(queryset)
+
+
+class AdminBookListView(ReplicaReadMixin, FastListMixin, generics.ListAPIView):
+    serializer_class = BookSerializer
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        # ?archived=true lists withdrawn books instead
+        archived = is_true(self.request.query_params.get("archived"))
+        return BookSerializer.prefetch(Book.objects.filter(is_archived=archived).order_by("title"))
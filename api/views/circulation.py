@@ -0,0 +1,231 @@
+"""Loans: scanner borrow/return, returns, borrow records, notifications and reading streaks."""
+from datetime import date
+
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.generics import ListAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..archive import student_borrow_history
+from ..db_routing import ReplicaReadMixin
+from ..fast_lists import FastListMixin, serialize_list
+from ..models import Book, BookCopy, BookNotificationRequest, BookRequest, BorrowRecord, CustomUser, Notification
+from ..permissions import IsAdminUser
+from ..reservations import fulfil_hold, hold_for, place_hold
+from ..serializers import (BookNotificationRequestSerializer, BorrowHistorySerializer,
+                           BorrowRecordSerializer, NotificationSerializer)
+from ..utils import calculate_reading_streak, get_badge
+
+
+class RequestBookNotification(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, book_id):
+        student = request.user
+        try:
+            book = Book.objects.get(id=book_id)
+        except Book.DoesNotExist:
+            return Response({"detail": "Book not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        obj, created = BookNotificationRequest.objects.get_or_create(student=student, book=book)
+        if not created:
+            return Response({"detail": "You already requested notification for this book"}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = BookNotificationRequestSerializer(obj)
+        return Response(serializer.data)
+
+
+class ReturnBookView(generics.UpdateAPIView):
+    queryset = BorrowRecord.objects.all()
+    serializer_class = BorrowRecordSerializer
+    permission_classes = [permissions.IsAuthenticated]  # you can also use IsAdminUser for admin-only
+    lookup_field = 'id'
+
+    def patch(self, request, *args, **kwargs):
+        borrow_record = self.get_object()
+
+        # Ensure not already returned
+        if borrow_record.returned:
+            return Response({"error": "This book is already returned."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Mark as returned
+        borrow_record.returned = True
+        borrow_record.return_date = date.today()   # ✅ set return date to current date
+        borrow_record.save()
+
+        # Hold the copy for the next student in the waitlist, else increase available copies
+        book = borrow_record.book_copy.book
+        if place_hold(borrow_record.book_copy) is None:
+            book.available_copies += 1
+            book.save()
+
+        serializer = self.get_serializer(borrow_record)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AdminBorrowRecordsAPIView(ReplicaReadMixin, FastListMixin, APIView):
+    permission_classes = [IsAdminUser]  # Only admins can access
+
+    def get(self, request):
+        records = BorrowRecord.objects.select_related('student', 'book_copy', 'book_copy__book').all()
+        return Response(serialize_list(BorrowRecordSerializer, records), status=status.HTTP_200_OK)
+
+
+class StudentBorrowRecordsAPIView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]  # Only logged-in users can access their records
+
+    def get(self, request):
+        student = request.user
+        # Reads through to archived loans; ?include_archived=false for active/recent only
+        include_archived = request.query_params.get("include_archived", "true") != "false"
+        records = student_borrow_history(student, include_archived=include_archived)
+        serializer = BorrowHistorySerializer(records, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def scanner_borrow_api(request):
+    """
+    API for scanner workflow:
+    1. Takes accession_no and student_username
+    2. Creates BookRequest + BorrowRecord
+    3. Decreases available copies
+    """
+    accession_no = request.data.get('accession_no')
+    student_username = request.data.get('student_username')
+
+    # 1️⃣ Validate student
+    try:
+        student = CustomUser.objects.get(username=student_username, role='MEMBER')
+    except CustomUser.DoesNotExist:
+        return Response({"error": "Student not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    # 2️⃣ Validate book copy
+    try:
+        book_copy = BookCopy.objects.get(accession_no=accession_no)
+    except BookCopy.DoesNotExist:
+        return Response({"error": "Book copy not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    # 3️⃣ Check if already borrowed or on hold for someone else
+    if BorrowRecord.objects.filter(book_copy=book_copy, returned=False).exists():
+        return Response({"error": "This book copy is already borrowed."}, status=status.HTTP_400_BAD_REQUEST)
+    hold = hold_for(book_copy)
+    if hold and hold.student_id != student.id:
+        return Response({"error": "This book copy is on hold for another student."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # 4️⃣ Create BookRequest (directly approved)
+    book_request = BookRequest.objects.create(
+        student=student,
+        book_copy=book_copy,
+        status='APPROVED',  # Direct approval
+        admin_comment="Issued via scanner."
+    )
+
+    # 5️⃣ Create BorrowRecord
+    borrow_record = BorrowRecord.objects.create(
+        student=student,
+        book_copy=book_copy
+    )
+
+    # 6️⃣ Decrease available copies (a held copy was already taken off the shelf)
+    book = book_copy.book
+    if hold:
+        fulfil_hold(hold)
+    elif book.available_copies > 0:
+        book.available_copies -= 1
+        book.save()
+    else:
+        return Response({"error": "No available copies left."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # 7️⃣ Return response
+    return Response({
+        "message": "Book issued successfully via scanner.",
+        "student": student.username,
+        "book_title": book.title,
+        "accession_no": book_copy.accession_no,
+        "borrow_id": borrow_record.id,
+        "request_id": book_request.id,
+        "available_copies": book.available_copies
+    })
+
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def scanner_return_api(request):
+    """
+    API for marking a borrowed book as returned.
+    Accepts:
+    - accession_no
+    - student_username
+    """
+    accession_no = request.data.get('accession_no')
+    student_username = request.data.get('student_username')
+
+    # 1️⃣ Validate student
+    try:
+        student = CustomUser.objects.get(username=student_username, role='MEMBER')
+    except CustomUser.DoesNotExist:
+        return Response({"error": "Student not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    # 2️⃣ Validate book copy
+    try:
+        book_copy = BookCopy.objects.get(accession_no=accession_no)
+    except BookCopy.DoesNotExist:
+        return Response({"error": "Book copy not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    # 3️⃣ Find active borrow record
+    try:
+        borrow_record = BorrowRecord.objects.get(student=student, book_copy=book_copy, returned=False)
+    except BorrowRecord.DoesNotExist:
+        return Response({"error": "No active borrow record found for this student and book."},
+                        status=status.HTTP_404_NOT_FOUND)
+
+    # 4️⃣ Mark as returned
+    borrow_record.returned = True
+    borrow_record.save()
+
+    # 5️⃣ Hold the copy for the next student in the waitlist, else increase available copies
+    book = book_copy.book
+    if place_hold(book_copy) is None:
+        book.available_copies += 1
+        book.save()
+
+    # 6️⃣ Return response
+    return Response({
+        "message": "Book returned successfully via scanner.",
+        "student": student.username,
+        "book_title": book.title,
+        "accession_no": book_copy.accession_no,
+        "available_copies": book.available_copies
+    })
+
+
+class MyNotifications(FastListMixin, ListAPIView):
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Notification.objects.filter(student=self.request.user).order_by('-created_at')
+
+
+class ReadingStreakAPI(ReplicaReadMixin, APIView):
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+
+        student = request.user
+
+        streak = calculate_reading_streak(student)
+
+        badge = get_badge(streak)
+
+        return Response({
+            "student": student.username,
+            "reading_streak_months": streak,
+            "badge": badge
+        })
@@ -0,0 +1,92 @@
+"""E-books and student bookmarks."""
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from rest_framework import generics, permissions
+from rest_framework.exceptions import PermissionDenied
+
+from ..catalog_cache import catalog_cached
+from ..db_routing import ReplicaReadMixin
+from ..models import EBook, EBookBookmark
+from ..pagination import BookmarkGroupCursorPagination
+from ..permissions import IsAdminUser
+from ..serializers import EBookBookmarkGroupSerializer, EBookBookmarkSerializer, EBookSerializer
+
+
+class EBookCreateView(generics.CreateAPIView):
+    queryset = EBook.objects.all()
+    serializer_class = EBookSerializer
+    permission_classes = [IsAdminUser]
+
+
+class EBookListView(ReplicaReadMixin, generics.ListAPIView):
+    queryset = EBook.objects.filter(is_active=True)
+    serializer_class = EBookSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    @catalog_cached("ebook_list")
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class EBookDetailView(ReplicaReadMixin, generics.RetrieveAPIView):
+    queryset = EBook.objects.filter(is_active=True)
+    serializer_class = EBookSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = "id"
+
+class AddEBookBookmarkView(generics.CreateAPIView):
+    serializer_class = EBookBookmarkSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_create(self, serializer):
+        serializer.save(student=self.request.user)
+
+
+class StudentEBookBookmarksView(generics.ListAPIView):
+    serializer_class = EBookBookmarkSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        ebook_id = self.request.query_params.get("ebook")
+        qs = EBookBookmark.objects.filter(student=self.request.user)
+        if ebook_id:
+            qs = qs.filter(ebook_id=ebook_id)
+        return qs.order_by("-created_at")
+
+
+class StudentEBookBookmarkGroupsView(generics.ListAPIView):
+    """
+    "My library" listing: every e-book the student has bookmarked, with the
+    bookmark count and latest bookmark, computed in one grouped query.
+    """
+    serializer_class = EBookBookmarkGroupSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BookmarkGroupCursorPagination
+
+    def get_queryset(self):
+        bookmarks = EBookBookmark.objects.filter(student=self.request.user)
+        latest = bookmarks.filter(ebook=OuterRef("ebook")).order_by("-created_at", "-id")
+
+        return (
+            bookmarks
+            .values("ebook")
+            .annotate(
+                ebook_title=F("ebook__title"),
+                ebook_format=F("ebook__format"),
+                bookmark_count=Count("id"),
+                last_bookmarked_at=Max("created_at"),
+                latest_bookmark_id=Subquery(latest.values("id")[:1]),
+                latest_page_number=Subquery(latest.values("page_number")[:1]),
+                latest_location=Subquery(latest.values("location")[:1]),
+            )
+        )
+
+class DeleteEBookBookmarkView(generics.DestroyAPIView):
+    queryset = EBookBookmark.objects.all()
+    serializer_class = EBookBookmarkSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = "id"
+
+    def perform_destroy(self, instance):
+        if instance.student != self.request.user:
+            raise PermissionDenied("You cannot delete this bookmark")
+        instance.delete()
@@ -0,0 +1,43 @@
+"""Helpers shared by the book and account views."""
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..deletion import DeletionBlocked, DeletionTooLarge, run_deletion
+from ..models import DeletionJob
+from ..serializers import DeletionJobSerializer
+from ..tasks import run_deletion_job_task
+
+
+def start_deletion(request, kind, ids, mode, run_async):
+    """
+    Delete or archive books/users through the batched deletion engine.
+    Returns (counts, None) when done inline, or (None, Response) for
+    async jobs (202 + job) and errors. Async jobs need a
+    `manage.py process_tasks` runner (BACKGROUND_TASKS_RUNNER); inline
+    deletes are limited to INLINE_DELETE_MAX_ROWS rows.
+    """
+    mode = (mode or DeletionJob.MODE_DELETE).upper()
+    if mode not in (DeletionJob.MODE_DELETE, DeletionJob.MODE_ARCHIVE):
+        return None, Response({"error": "mode must be delete or archive."}, status=status.HTTP_400_BAD_REQUEST)
+
+    if run_async:
+        if not settings.BACKGROUND_TASKS_RUNNER:
+            return None, Response(
+                {"error": "Background jobs are not enabled on this server; retry without async."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        job = DeletionJob.objects.create(kind=kind, mode=mode, target_ids=list(ids), requested_by=request.user)
+        run_deletion_job_task(job.id)
+        return None, Response(DeletionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    try:
+        return run_deletion(kind, ids, mode), None
+    except DeletionBlocked as e:
+        return None, Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+    except DeletionTooLarge as e:
+        return None, Response({"error": f"{e} Retry with async=true."}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def is_true(value):
+    return str(value).lower() in ("1", "true", "yes")
@@ -0,0 +1,83 @@
+"""Admin operations: scheduler status and request metrics."""
+from django.db.models import Avg, Count, Max, Q
+from django.http import HttpResponse
+from rest_framework import generics
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..catalog_cache import stats as catalog_cache_stats
+from ..db_routing import render_pool_prometheus
+from ..metrics import registry as request_metrics
+from ..models import JobRun, PeriodicJobState
+from ..pagination import JobRunPagination
+from ..permissions import IsAdminUser
+from ..scheduler import registry
+from ..serializers import JobRunSerializer, PeriodicJobStateSerializer
+
+
+# -----------------------------
+# Admin: periodic scheduler status and run metrics
+# -----------------------------
+class ScheduledJobsView(APIView):
+    """Each registered job with its schedule state and aggregate run metrics."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        states = {state.name: state for state in PeriodicJobState.objects.all()}
+        stats = {
+            row["job_name"]: row
+            for row in JobRun.objects.values("job_name").annotate(
+                runs=Count("id"),
+                failures=Count("id", filter=Q(status="FAILED")),
+                avg_duration_ms=Avg("duration_ms"),
+                max_duration_ms=Max("duration_ms"),
+                avg_query_count=Avg("query_count"),
+                last_started_at=Max("started_at"),
+            )
+        }
+
+        jobs = []
+        for name, job in sorted(registry.items()):
+            state = states.get(name)
+            jobs.append({
+                "name": name,
+                "interval_seconds": job.interval,
+                "max_concurrency": job.max_concurrency,
+                "state": PeriodicJobStateSerializer(state).data if state else None,
+                "metrics": {k: v for k, v in stats.get(name, {}).items() if k != "job_name"},
+            })
+        return Response(jobs)
+
+
+class JobRunListView(generics.ListAPIView):
+    """Individual runs, newest first. ?job=<name> to filter."""
+    serializer_class = JobRunSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = JobRunPagination
+
+    def get_queryset(self):
+        runs = JobRun.objects.all()
+        job = self.request.query_params.get("job")
+        if job:
+            runs = runs.filter(job_name=job)
+        return runs
+
+
+# -----------------------------
+# Admin: per-route request metrics (Prometheus text format)
+# -----------------------------
+class RequestMetricsView(APIView):
+    """Latency / query / serializer histograms per route; POST resets them."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        body = (
+            request_metrics.render_prometheus()
+            + catalog_cache_stats.render_prometheus()
+            + render_pool_prometheus()
+        )
+        return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    def post(self, request):
+        request_metrics.reset()
+        return Response({"message": "Request metrics reset."})
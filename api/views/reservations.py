@@ -0,0 +1,94 @@
+"""Waitlist views (queue logic lives in api/reservations.py)."""
+from django.db.models import Case, Count, IntegerField, OuterRef, Subquery, Value, When
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..db_routing import ReplicaReadMixin
+from ..models import Book, BookReservation
+from ..permissions import IsAdminUser
+from ..reservations import ReservationError, cancel_reservation, queue_position, reserve
+from ..serializers import BookReservationSerializer
+
+
+# -----------------------------
+# Waitlist: reserve a book, see and cancel reservations
+# -----------------------------
+def _with_queue_position(queryset):
+    ahead = (
+        BookReservation.objects.filter(
+            book=OuterRef("book"), status=BookReservation.STATUS_WAITING, id__lte=OuterRef("id")
+        )
+        .order_by()
+        .values("book")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return queryset.annotate(
+        position=Case(When(status=BookReservation.STATUS_WAITING, then=Subquery(ahead)), default=None)
+    )
+
+
+class ReserveBookView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, book_id):
+        try:
+            book = Book.objects.get(id=book_id, is_archived=False)
+        except Book.DoesNotExist:
+            return Response({"detail": "Book not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            reservation = reserve(request.user, book)
+        except ReservationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = BookReservationSerializer(reservation, context={"position": queue_position(reservation)})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class MyReservationsView(generics.ListAPIView):
+    serializer_class = BookReservationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = BookReservation.objects.filter(
+            student=self.request.user, status__in=BookReservation.ACTIVE_STATUSES
+        ).select_related("student", "book", "book_copy").order_by("created_at")
+        return _with_queue_position(queryset)
+
+
+class CancelReservationView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        try:
+            reservation = BookReservation.objects.select_related("book_copy__book").get(
+                id=pk, student=request.user, status__in=BookReservation.ACTIVE_STATUSES
+            )
+        except BookReservation.DoesNotExist:
+            return Response({"error": "Reservation not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        cancel_reservation(reservation)
+        return Response({"message": "Reservation cancelled."}, status=status.HTTP_200_OK)
+
+
+class BookWaitlistView(ReplicaReadMixin, generics.ListAPIView):
+    """Admin: the active queue of a book, holds first."""
+    serializer_class = BookReservationSerializer
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        queryset = BookReservation.objects.filter(
+            book_id=self.kwargs["book_id"], status__in=BookReservation.ACTIVE_STATUSES
+        ).select_related("student", "book", "book_copy").order_by(
+            Case(
+                When(status=BookReservation.STATUS_HELD, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            ),
+            "created_at",
+            "id",
+        )
+        return _with_queue_position(queryset)
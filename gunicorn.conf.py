@@ -0,0 +1,28 @@
+"""
+gunicorn settings, picked up from the working directory:
+
+    gunicorn lms_backend.wsgi
+
+With GUNICORN_PRELOAD (default on) the master loads the app and every view
+module once (api.views.preload) before forking, so workers start warm and
+share those pages copy-on-write instead of each importing on first request.
+Database connections opened while preloading are closed in every worker so
+no socket is shared across processes.
+"""
+import os
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") == "True"
+
+
+def when_ready(server):
+    if preload_app:
+        from api.views import preload
+
+        preload()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from django.db import connections
+
+        connections.close_all()
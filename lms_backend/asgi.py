@@ -3,6 +3,19 @@ ASGI config for lms_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Loading this module selects the "asgi" server profile (SERVER_PROFILE): the
+catalog, search, notifications and e-book list endpoints are served by the
+async views in api/async_views.py, and static files by Django's ASGI static
+handler since WhiteNoise is WSGI-only. Run it with uvicorn workers:
+
+    uvicorn lms_backend.asgi:application --host 0.0.0.0 --port $PORT --workers 2 --lifespan off
+
+Sync ORM work runs on one thread per request, so connections are not kept
+between requests; on Postgres enable DATABASE_POOL alongside this profile.
+
+`manage.py benchmark_asgi` compares this profile with gunicorn (WSGI) at the
+same worker count.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +25,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lms_backend.settings')
+os.environ.setdefault('SERVER_PROFILE', 'asgi')
+
+django_application = get_asgi_application()
+
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler  # noqa: E402  (needs settings)
 
-application = get_asgi_application()
+application = ASGIStaticFilesHandler(django_application)
@@ -1,6 +1,7 @@
 from datetime import timedelta
 from pathlib import Path
 import os
+import sys
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -27,6 +28,9 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 # Whitenoise for static files
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.RequestMetricsMiddleware',  # per-route latency / query metrics
+    'api.middleware.NPlusOneGuardMiddleware',  # repeated-query detection (DEBUG / tests)
+    'api.db_routing.DatabaseRoutingMiddleware',  # replica reads + read-your-writes pinning
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # 👈 Whitenoise
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -53,6 +57,12 @@ INSTALLED_APPS = [
     'cloudinary',
     'cloudinary_storage'
 ]
+# Django admin (with jazzmin) at /admin/; API-only deployments can drop it to
+# boot faster (`manage.py profile_startup --env ADMIN_ENABLED=False`)
+ADMIN_ENABLED = os.environ.get("ADMIN_ENABLED", "True") == "True"
+if not ADMIN_ENABLED:
+    INSTALLED_APPS.remove('django.contrib.admin')
+    INSTALLED_APPS.remove('jazzmin')
 
 ROOT_URLCONF = 'lms_backend.urls'
 
@@ -72,16 +82,52 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'lms_backend.wsgi.application'
+ASGI_APPLICATION = 'lms_backend.asgi.application'
+# "wsgi" (gunicorn) or "asgi" (uvicorn; set by lms_backend/asgi.py)
+SERVER_PROFILE = os.environ.get("SERVER_PROFILE", "wsgi")
+# Serve catalog / search / notifications / e-book list from api/async_views.py
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", str(SERVER_PROFILE == "asgi")) == "True"
+if SERVER_PROFILE == "asgi":
+    # WhiteNoise is WSGI-only; asgi.py serves static files instead
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
 
 # Database from .env
 DATABASE_URL = os.environ.get("DATABASE_URL")
-DATABASES = {
-    'default': dj_database_url.parse(
-        DATABASE_URL,
-        conn_max_age=600,
-        ssl_require=True  # required for Render / production
+# Optional read replica for catalog / history / analytics reads (api/db_routing.py)
+DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+DATABASE_REPLICA_ALIAS = "replica"
+# SSL is required on Render; set DATABASE_SSL_REQUIRE=False for local SQLite / Postgres
+DATABASE_SSL_REQUIRE = os.environ.get("DATABASE_SSL_REQUIRE", "True") == "True"
+# psycopg connection pool per process (Postgres only, needs psycopg[pool] 3.x)
+DATABASE_POOL = os.environ.get("DATABASE_POOL", "False") == "True"
+DATABASE_POOL_MIN_SIZE = int(os.environ.get("DATABASE_POOL_MIN_SIZE", "2"))
+DATABASE_POOL_MAX_SIZE = int(os.environ.get("DATABASE_POOL_MAX_SIZE", "10"))
+DATABASE_POOL_TIMEOUT = float(os.environ.get("DATABASE_POOL_TIMEOUT", "10"))  # seconds to wait for a connection
+
+
+def _database(url):
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=0 if DATABASE_POOL else 600,  # pooled connections are returned after each request
+        ssl_require=DATABASE_SSL_REQUIRE,
     )
-}
+    if DATABASE_POOL and config["ENGINE"] == "django.db.backends.postgresql":
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DATABASE_POOL_MIN_SIZE,
+            "max_size": DATABASE_POOL_MAX_SIZE,
+            "timeout": DATABASE_POOL_TIMEOUT,
+        }
+    return config
+
+
+DATABASES = {'default': _database(DATABASE_URL)}
+if DATABASE_REPLICA_URL:
+    DATABASES[DATABASE_REPLICA_ALIAS] = _database(DATABASE_REPLICA_URL)
+    # Tests run against one database; the replica mirrors it
+    DATABASES[DATABASE_REPLICA_ALIAS]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["api.db_routing.PrimaryReplicaRouter"]
+# Seconds a user keeps reading from the primary after a write (covers replication lag)
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", "10"))
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -96,6 +142,34 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',},
 ]
 
+# Password hashing: PASSWORD_HASH_ALGORITHM=argon2 (needs argon2-cffi) or pbkdf2 with tunable cost.
+# Hashes made with a non-preferred algorithm/cost are upgraded on the next login.
+PASSWORD_HASH_ALGORITHM = os.environ.get("PASSWORD_HASH_ALGORITHM", "pbkdf2")
+# `manage.py test` creates many users; production cost there would only slow the suite down
+TESTING = sys.argv[1:2] == ["test"]
+PBKDF2_ITERATIONS = int(os.environ.get("PBKDF2_ITERATIONS", 1_000 if TESTING else 1_000_000))
+PASSWORD_HASHERS = [
+    "api.hashers.ConfigurablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if PASSWORD_HASH_ALGORITHM == "argon2":
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(2))
+
+# Login throughput
+LOGIN_HASH_WORKERS = int(os.environ.get("LOGIN_HASH_WORKERS", os.cpu_count() or 2))  # concurrent password checks
+LOGIN_HASH_QUEUE_TIMEOUT = float(os.environ.get("LOGIN_HASH_QUEUE_TIMEOUT", 2))  # seconds to wait for a hashing slot
+LOGIN_RATE_LIMIT_USERNAME = os.environ.get("LOGIN_RATE_LIMIT_USERNAME", "10/60")  # attempts/seconds
+LOGIN_RATE_LIMIT_IP = os.environ.get("LOGIN_RATE_LIMIT_IP", "600/60")  # generous: campus NAT shares one IP
+LOGIN_TRUST_X_FORWARDED_FOR = os.environ.get("LOGIN_TRUST_X_FORWARDED_FOR", "False") == "True"
+
+# Students per bulk-register API request (each password hash takes ~0.5s); more via the management command
+BULK_REGISTER_MAX_ROWS = int(os.environ.get("BULK_REGISTER_MAX_ROWS", 200))
+# Hashing processes shared by all bulk-register API requests (api/onboarding.py)
+BULK_REGISTER_WORKERS = int(os.environ.get("BULK_REGISTER_WORKERS", os.cpu_count() or 1))
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -108,7 +182,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework + JWT
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ),
 }
 
@@ -117,6 +191,12 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
+
+# Authenticate from token claims (role, is_active) without loading the user row
+JWT_STATELESS_AUTH = os.environ.get("JWT_STATELESS_AUTH", "True") == "True"
+AUTH_USER_CACHE_TTL = int(os.environ.get("AUTH_USER_CACHE_TTL", 30))  # seconds
+# How often each process pulls newly revoked tokens (logout) from the DB
+TOKEN_REVOCATION_REFRESH_SECONDS = int(os.environ.get("TOKEN_REVOCATION_REFRESH_SECONDS", 5))
 # Cloudinary configuration
 CLOUDINARY_STORAGE = {
     "CLOUD_NAME": os.environ.get("CLOUDINARY_CLOUD_NAME"),
@@ -125,3 +205,82 @@ CLOUDINARY_STORAGE = {
 }
 
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
+
+# Library gate kiosk
+KIOSK_API_KEY = os.environ.get("KIOSK_API_KEY")  # sent by kiosk devices as X-Kiosk-Key
+KIOSK_TOKEN_MAX_AGE = int(os.environ.get("KIOSK_TOKEN_MAX_AGE", 120))  # seconds a QR token stays valid
+
+# Maximum students allowed inside the library at once (0 = unlimited)
+LIBRARY_CAPACITY = int(os.environ.get("LIBRARY_CAPACITY", 0))
+# Without a shared cache, how often each worker reloads who is inside (api/occupancy.py)
+OCCUPANCY_LOCAL_TTL = int(os.environ.get("OCCUPANCY_LOCAL_TTL", 5))  # seconds
+
+# Cache (live occupancy counter etc.). Local memory per process unless Redis is configured.
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# async=true deletions are queued for django-background-tasks. Nothing here
+# starts its runner: set this only where `manage.py process_tasks` is running.
+BACKGROUND_TASKS_RUNNER = os.environ.get("BACKGROUND_TASKS_RUNNER", "False") == "True"
+# Inline deletes run in one transaction; larger cascades must use async=true
+INLINE_DELETE_MAX_ROWS = int(os.environ.get("INLINE_DELETE_MAX_ROWS", 10_000))
+
+# Returned loans older than this move from BorrowRecord to ArchivedBorrowRecord
+BORROW_ARCHIVE_AFTER_DAYS = int(os.environ.get("BORROW_ARCHIVE_AFTER_DAYS", 365))
+
+# Periodic scheduler (manage.py run_scheduler)
+SCHEDULER_WORKERS = int(os.environ.get("SCHEDULER_WORKERS", 4))
+SCHEDULER_TICK_SECONDS = int(os.environ.get("SCHEDULER_TICK_SECONDS", 5))
+SCHEDULER_INTERVALS = {
+    # job name: seconds, overrides the interval given in @periodic_job
+}
+
+# Processes used by sharded circulation jobs (fines)
+SHARD_WORKERS = int(os.environ.get("SHARD_WORKERS", os.cpu_count() or 1))
+# Invocations a sharded run may take before it is marked failed and a new run starts
+SHARD_MAX_ATTEMPTS = int(os.environ.get("SHARD_MAX_ATTEMPTS", 3))
+
+# Due-date reminder stages: name -> days before the due date (negative = after it)
+DUE_REMINDER_STAGES = {
+    "DUE_IN_3_DAYS": 3,
+    "DUE_IN_1_DAY": 1,
+    "OVERDUE": -1,
+}
+# Local hour of the day at which reminders become due
+DUE_REMINDER_HOUR = int(os.environ.get("DUE_REMINDER_HOUR", 9))
+
+# How long a returned copy is held for the next student in a book's waitlist
+RESERVATION_HOLD_HOURS = int(os.environ.get("RESERVATION_HOLD_HOURS", 48))
+
+# Per-route request metrics (api/metrics.py), exposed at /api/admin/metrics/
+REQUEST_METRICS_ENABLED = os.environ.get("REQUEST_METRICS_ENABLED", "True") == "True"
+METRICS_WINDOW_SECONDS = int(os.environ.get("METRICS_WINDOW_SECONDS", 300))
+# Requests slower than this are logged with their top query fingerprints
+SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", 500))
+
+# N+1 query guard (api/nplusone.py): "raise" under manage.py test, "log" with DEBUG
+NPLUSONE_GUARD = os.environ.get("NPLUSONE_GUARD", "raise" if TESTING else ("log" if DEBUG else "off"))
+# A statement repeated this many times in one request is reported
+NPLUSONE_THRESHOLD = int(os.environ.get("NPLUSONE_THRESHOLD", 5))
+
+# Catalog response cache (api/catalog_cache.py): book list/search and e-book list
+CATALOG_CACHE_ENABLED = os.environ.get("CATALOG_CACHE_ENABLED", "True") == "True"
+CATALOG_CACHE_ALIAS = os.environ.get("CATALOG_CACHE_ALIAS", "default")
+CATALOG_CACHE_TTL = int(os.environ.get("CATALOG_CACHE_TTL", 60 * 60))  # seconds
+# TTL when the alias is per-process (LocMem): other workers' bumps are not seen
+CATALOG_CACHE_LOCAL_TTL = int(os.environ.get("CATALOG_CACHE_LOCAL_TTL", 5))  # seconds
+
+# Build large read-only lists from values_list() rows instead of DRF serializers (api/fast_lists.py)
+FAST_LIST_SERIALIZATION = os.environ.get("FAST_LIST_SERIALIZATION", "True") == "True"